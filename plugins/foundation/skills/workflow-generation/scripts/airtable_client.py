@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+"""
+airtable_client.py
+Shared Airtable REST client for the workflow generation scripts.
+
+Keeps one pooled requests.Session per client so every call reuses the same
+TCP/TLS connection, throttles to Airtable's 5 requests/second per base, and
+retries 429/5xx responses with jittered exponential backoff.
+
+list_records() follows Airtable's offset pagination to the last page, and
+get_records_by_id() deduplicates IDs and fetches them in RECORD_ID() batches
+that run concurrently under the shared rate limit.
+
+Used by:
+  plugins/foundation/skills/workflow-generation/scripts/generate-workflow-doc.py
+  plugins/planning/skills/feature-workflow-generation/scripts/generate-feature-workflow.py
+"""
+
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# AIRTABLE_ENDPOINT_URL points at scripts/airtable-standin.py for offline runs
+API_URL = os.getenv("AIRTABLE_ENDPOINT_URL", "https://api.airtable.com") + "/v0"
+
+# Airtable allows 5 requests per second per base
+REQUESTS_PER_SECOND = 5
+MAX_WORKERS = 5
+MAX_RETRIES = 5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+REQUEST_TIMEOUT = 30
+
+# Record IDs per OR(RECORD_ID()=...) formula; keeps the GET URL well under Airtable's limit
+ID_BATCH_SIZE = 100
+PAGE_SIZE = 100
+
+
+class RateLimiter:
+    """Token bucket shared by all threads sending requests to one base
+
+    Also paces scripts/airtable_writer.py's batch writes.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class AirtableClient:
+    """Pooled, rate-limited Airtable client for a single base"""
+
+    def __init__(self, token, base_id, max_workers=MAX_WORKERS, requests_per_second=REQUESTS_PER_SECOND):
+        self.base_id = base_id
+        self.max_workers = max_workers
+        self.limiter = RateLimiter(requests_per_second)
+
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {token}"
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+
+    def request(self, method, path, params=None):
+        """Send a request, retrying rate limits and server errors"""
+        url = f"{API_URL}/{self.base_id}/{path}"
+
+        for attempt in range(MAX_RETRIES + 1):
+            self.limiter.acquire()
+            response = self.session.request(method, url, params=params, timeout=REQUEST_TIMEOUT)
+
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                response.raise_for_status()
+                return response.json()
+
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                delay = float(retry_after)
+            else:
+                # Full jitter: spreads concurrent retries instead of stampeding together
+                delay = random.uniform(0, min(30, 2 ** attempt))
+            time.sleep(delay)
+
+    def get(self, table, params=None):
+        """Fetch one page of records from a table"""
+        return self.request("GET", table, params=params)
+
+    def list_records(self, table, params=None):
+        """Fetch every page of records matching params, following offset"""
+        params = dict(params or {}, pageSize=PAGE_SIZE)
+        records = []
+        while True:
+            data = self.get(table, params=params)
+            records.extend(data.get("records", []))
+            if not data.get("offset"):
+                return records
+            params["offset"] = data["offset"]
+
+    def get_records_by_id(self, table, record_ids, fields=None):
+        """Fetch records by ID in concurrent batches, returning {record_id: record}
+
+        Each ID is requested once however often it repeats; IDs that no
+        longer exist are simply absent from the result.
+        """
+        unique_ids = list(dict.fromkeys(record_ids))
+        batches = [unique_ids[i:i + ID_BATCH_SIZE] for i in range(0, len(unique_ids), ID_BATCH_SIZE)]
+
+        def fetch(batch):
+            id_conditions = [f'RECORD_ID()="{record_id}"' for record_id in batch]
+            params = {"filterByFormula": f'OR({",".join(id_conditions)})'}
+            if fields:
+                params["fields[]"] = fields
+            return self.list_records(table, params=params)
+
+        return {record["id"]: record for batch in self.map(fetch, batches) for record in batch}
+
+    def get_record(self, table, record_id):
+        """Fetch a single record by ID"""
+        return self.request("GET", f"{table}/{record_id}")
+
+    def map(self, func, items):
+        """Run func over items concurrently, returning results in input order"""
+        items = list(items)
+        if len(items) <= 1:
+            return [func(item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+            return list(executor.map(func, items))
@@ -9,7 +9,8 @@ Usage: python3 generate-workflow-doc.py "AI Tech Stack 1" --json-only
 import os
 import sys
 import json
-import requests
+
+from airtable_client import AirtableClient
 
 # Configuration
 AIRTABLE_TOKEN = os.getenv("AIRTABLE_TOKEN") or os.getenv("MCP_AIRTABLE_TOKEN")
@@ -23,48 +24,27 @@ COMMANDS_TABLE = "tblWKaSceuRJrBFC1"
 AGENTS_TABLE = "tblNngn8hglFXZKnl"
 SKILLS_TABLE = "tblWJSyghUzEiV1Cc"
 
+# One pooled, rate-limited session for every request this script makes
+client = AirtableClient(AIRTABLE_TOKEN, BASE_ID)
+
 def get_tech_stack(stack_name):
     """Query tech stack by name"""
-    url = f"https://api.airtable.com/v0/{BASE_ID}/{TECH_STACKS_TABLE}"
-    headers = {"Authorization": f"Bearer {AIRTABLE_TOKEN}"}
     params = {"filterByFormula": f'{{Stack Name}}="{stack_name}"'}
 
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
-
-    data = response.json()
+    data = client.get(TECH_STACKS_TABLE, params=params)
     if not data.get("records"):
         return None
 
     return data["records"][0]
 
-def get_plugin(plugin_id):
-    """Get plugin details by ID"""
-    url = f"https://api.airtable.com/v0/{BASE_ID}/{PLUGINS_TABLE}/{plugin_id}"
-    headers = {"Authorization": f"Bearer {AIRTABLE_TOKEN}"}
-
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-
-    return response.json()
-
-def get_commands_batch(command_ids):
-    """Get multiple command details in batch using filterByFormula"""
-    if not command_ids:
-        return []
-
-    # Build OR formula for batch query
-    id_conditions = [f'RECORD_ID()="{cmd_id}"' for cmd_id in command_ids[:100]]  # Airtable limit
-    formula = f'OR({",".join(id_conditions)})'
-
-    url = f"https://api.airtable.com/v0/{BASE_ID}/{COMMANDS_TABLE}"
-    headers = {"Authorization": f"Bearer {AIRTABLE_TOKEN}"}
-    params = {"filterByFormula": formula}
-
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
+def get_plugins(plugin_ids):
+    """Get plugin details for several IDs in batched requests, in input order"""
+    plugins = client.get_records_by_id(PLUGINS_TABLE, plugin_ids)
+    return [plugins[plugin_id] for plugin_id in plugin_ids if plugin_id in plugins]
 
-    return response.json().get("records", [])
+def get_commands(command_ids):
+    """Get command details by ID, following pagination; shared IDs are fetched once"""
+    return client.get_records_by_id(COMMANDS_TABLE, command_ids, fields=["Command Name", "Description"])
 
 def extract_plugin_ids(tech_stack_record):
     """Extract all plugin IDs from tech stack record"""
@@ -145,8 +125,7 @@ def get_workflow_data(tech_stack_name):
     # Query plugins table to get plugin details
     plugins_data = []
 
-    for plugin_id in plugin_ids:
-        plugin = get_plugin(plugin_id)
+    for plugin in get_plugins(plugin_ids):
         plugin_name = plugin.get("fields", {}).get("Name")
         command_ids = plugin.get("fields", {}).get("Commands", [])
         agent_ids = plugin.get("fields", {}).get("Agents", [])
@@ -163,18 +142,12 @@ def get_workflow_data(tech_stack_name):
         }
         plugins_data.append(plugin_entry)
 
-    # Get ALL command details using batch queries
+    # Get ALL command details using concurrent batch queries
     all_command_ids = []
     for plugin_data in plugins_data:
         all_command_ids.extend(plugin_data["command_ids"])
 
-    # Fetch in batches of 100 (Airtable limit)
-    all_commands = {}
-    for i in range(0, len(all_command_ids), 100):
-        batch_ids = all_command_ids[i:i+100]
-        batch_commands = get_commands_batch(batch_ids)
-        for cmd in batch_commands:
-            all_commands[cmd["id"]] = cmd
+    all_commands = get_commands(all_command_ids)
 
     # Map commands back to plugins
     for plugin_data in plugins_data:
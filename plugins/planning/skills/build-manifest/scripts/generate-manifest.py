@@ -10,6 +10,13 @@ This script:
 5. Detects gaps (tech mentioned but no plugin exists)
 6. Generates both .json and .md files
 
+Inputs are fingerprinted in <output>.cache.json (architecture doc hashes,
+the keyword catalog, matched plugins and their command links). On the next
+run unchanged docs are not rescanned, only commands modified since the last
+run are fetched, only layers whose plugins changed are rebuilt, and the
+output files are left untouched when nothing in them would change.
+Pass --force to ignore the cache.
+
 Usage:
     python generate-manifest.py --architecture docs/architecture/README.md --output BUILD-GUIDE
 """
@@ -17,11 +24,15 @@ Usage:
 import os
 import sys
 import json
+import hashlib
 import argparse
-from datetime import datetime
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from pyairtable import Api
 
+from tech_detector import TechDetector, markdown_files
+
 # Airtable configuration
 AIRTABLE_TOKEN = os.getenv("AIRTABLE_TOKEN")
 if not AIRTABLE_TOKEN:
@@ -30,90 +41,145 @@ if not AIRTABLE_TOKEN:
     sys.exit(1)
 
 BASE_ID = "appHbSB7WhT1TxEQb"
+AIRTABLE_ENDPOINT_URL = os.getenv("AIRTABLE_ENDPOINT_URL", "https://api.airtable.com")
 
 # Initialize Airtable API
-api = Api(AIRTABLE_TOKEN)
-
-
-def read_architecture_docs(arch_path):
-    """Extract tech stack from architecture documentation"""
-    import os
-
+api = Api(AIRTABLE_TOKEN, endpoint_url=AIRTABLE_ENDPOINT_URL)
+
+# dev-lifecycle-marketplace plugins included in every manifest
+CORE_PLUGINS = ["foundation", "planning", "supervisor", "iterate", "quality", "deployment", "versioning"]
+
+# Plugins each lifecycle layer draws its commands from; layers 2 and 3 use the tech plugins
+LAYER_SOURCES = {
+    "layer1": ["foundation", "planning", "supervisor", "iterate"],
+    "layer4": ["quality", "deployment", "versioning"],
+}
+
+# Bump when the cache layout or manifest structure changes
+CACHE_VERSION = 1
+
+# Overlap between runs so clock skew never hides a modified command
+SYNC_MARGIN = timedelta(minutes=5)
+
+
+# Tech keyword -> plugin; extend with --keywords for larger catalogs
+TECH_KEYWORDS = {
+    "Next.js": "nextjs-frontend",
+    "FastAPI": "fastapi-backend",
+    "Supabase": "supabase",
+    "Vercel AI SDK": "vercel-ai-sdk",
+    "OpenRouter": "openrouter",
+    "Mem0": "mem0",
+    "Redis": "redis",
+    "PostgreSQL": "supabase",
+    "MongoDB": "mongodb"
+}
+
+
+def load_tech_keywords(keywords_path=None):
+    """Default keyword catalog, extended by a {keyword: plugin} JSON file"""
+    keywords = dict(TECH_KEYWORDS)
+    if keywords_path:
+        with open(keywords_path, 'r') as f:
+            keywords.update(json.load(f))
+    return keywords
+
+
+def read_architecture_docs(arch_path, keywords=None):
+    """Extract tech stack from architecture documentation
+
+    Files are streamed one at a time through a single keyword automaton.
+    Returns (tech_stack, locations), where locations records the file and
+    line each technology was found on.
+    """
     print(f"📖 Reading architecture docs: {arch_path}")
 
-    tech_stack = []
-    content = ""
-
-    # Check if path is a directory or file
-    if os.path.isdir(arch_path):
-        # Walk through directory and read all .md files
-        print(f"   📂 Scanning directory for markdown files...")
-        for root, dirs, files in os.walk(arch_path):
-            for file in files:
-                if file.endswith('.md'):
-                    file_path = os.path.join(root, file)
-                    print(f"      📄 Reading: {file}")
-                    with open(file_path, 'r') as f:
-                        content += f.read() + "\n"
-    else:
-        # Read single file
-        with open(arch_path, 'r') as f:
-            content = f.read()
-
-    # Simple tech detection (can be enhanced with better parsing)
-    tech_keywords = {
-        "Next.js": "nextjs-frontend",
-        "FastAPI": "fastapi-backend",
-        "Supabase": "supabase",
-        "Vercel AI SDK": "vercel-ai-sdk",
-        "OpenRouter": "openrouter",
-        "Mem0": "mem0",
-        "Redis": "redis",
-        "PostgreSQL": "supabase",
-        "MongoDB": "mongodb"
-    }
+    detector = TechDetector(keywords or TECH_KEYWORDS)
 
-    for keyword, plugin in tech_keywords.items():
-        if keyword in content:
-            if plugin not in tech_stack:
-                tech_stack.append(plugin)
-
-    print(f"   ✓ Detected technologies: {', '.join(tech_stack)}")
-    return tech_stack
+    def files():
+        if os.path.isdir(arch_path):
+            print(f"   📂 Scanning directory for markdown files...")
+        for file_path in markdown_files(arch_path):
+            if os.path.isdir(arch_path):
+                print(f"      📄 Reading: {os.path.basename(file_path)}")
+            yield file_path
 
+    tech_stack, locations = detector.detect(files())
 
-def query_plugins_for_tech(tech_stack):
+    print(f"   ✓ Detected technologies: {', '.join(tech_stack)}")
+    for tech in tech_stack:
+        found = locations[tech][0]
+        print(f"      • {tech}: \"{found['keyword']}\" in {found['file']}:{found['line']}")
+    return tech_stack, locations
+
+
+class PluginResolver:
+    """Match plugin names locally against a single fetch of the Plugins table
+
+    Replaces one Airtable round trip (and table scan) per core plugin and
+    per detected technology with dictionary lookups:
+    - by_name: lowercase name -> plugins, for exact matches
+    - by_substring: every substring of each lowercase name -> plugins,
+      for the fuzzy FIND(tech, LOWER({Name})) match
+    Plugins keep the table's record order in every bucket.
+    """
+
+    def __init__(self, records):
+        self.by_name = defaultdict(list)
+        self.by_substring = defaultdict(list)
+        self.command_ids = {}
+
+        for record in records:
+            name = record['fields'].get('Name')
+            if not name:
+                continue
+            self.command_ids[record['id']] = record['fields'].get('Commands', [])
+            plugin = (name, record['id'])
+            lowered = name.lower()
+            self.by_name[lowered].append(plugin)
+
+            substrings = {lowered[start:end] for start in range(len(lowered))
+                          for end in range(start + 1, len(lowered) + 1)}
+            for substring in substrings:
+                self.by_substring[substring].append(plugin)
+
+    @classmethod
+    def fetch(cls, plugins_table):
+        """One API call: every plugin, with its name and linked command IDs"""
+        return cls(plugins_table.all(fields=['Name', 'Commands']))
+
+    def exact(self, name):
+        return self.by_name.get(name.lower(), [])
+
+    def containing(self, text):
+        return self.by_substring.get(text.lower(), [])
+
+
+def query_plugins_for_tech(tech_stack, resolver=None):
     """Query Airtable for plugins matching detected tech stack"""
     print(f"\n🔍 Querying Airtable for plugins...")
 
-    plugins_table = api.table(BASE_ID, "Plugins")
+    if resolver is None:
+        resolver = PluginResolver.fetch(api.table(BASE_ID, "Plugins"))
     matched_plugins = {}
 
     # ALWAYS include dev-lifecycle-marketplace core plugins
-    core_plugins = ["foundation", "planning", "supervisor", "iterate", "quality", "deployment", "versioning"]
-
     print(f"   📦 Adding core dev-lifecycle plugins...")
-    for core_plugin in core_plugins:
-        formula = f"LOWER({{Name}})='{core_plugin}'"
-        records = plugins_table.all(formula=formula)
-        if records:
-            for record in records:
-                plugin_name = record['fields'].get('Name')
-                matched_plugins[plugin_name] = record['id']
-                print(f"   ✓ Found core plugin: {plugin_name}")
-
-    # Query for detected tech stack plugins
+    for core_plugin in CORE_PLUGINS:
+        for plugin_name, plugin_id in resolver.exact(core_plugin):
+            matched_plugins[plugin_name] = plugin_id
+            print(f"   ✓ Found core plugin: {plugin_name}")
+
+    # Match detected tech stack plugins
     print(f"   📦 Adding detected tech stack plugins...")
     for tech in tech_stack:
-        # Query for plugin by name (fuzzy match)
-        formula = f"FIND('{tech}', LOWER({{Name}}))"
-        records = plugins_table.all(formula=formula)
+        # Match plugin by name (fuzzy match)
+        plugins = resolver.containing(tech)
 
-        if records:
-            for record in records:
-                plugin_name = record['fields'].get('Name')
+        if plugins:
+            for plugin_name, plugin_id in plugins:
                 if plugin_name not in matched_plugins:  # Avoid duplicates
-                    matched_plugins[plugin_name] = record['id']
+                    matched_plugins[plugin_name] = plugin_id
                     print(f"   ✓ Found tech plugin: {plugin_name}")
         else:
             print(f"   ⚠️  No plugin found for: {tech}")
@@ -121,42 +187,119 @@ def query_plugins_for_tech(tech_stack):
     return matched_plugins
 
 
-def query_commands_for_plugins(plugin_ids):
+# Only the columns the manifest uses
+COMMAND_FIELDS = ["Command Name", "Description", "Plugin"]
+
+
+def formula_string(value):
+    """Quote a value as an Airtable formula string literal"""
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def linked_plugin_formula(plugin_names):
+    """Formula matching records whose linked Plugin is one of plugin_names
+
+    Linked records appear in formulas as their primary field (the plugin
+    Name), so each name is matched as a whole list item.
+    """
+    linked = "', ' & ARRAYJOIN({Plugin}, ', ') & ','"
+    return "OR(" + ", ".join(
+        f"FIND({formula_string(', ' + name + ',')}, {linked})" for name in plugin_names
+    ) + ")"
+
+
+def query_commands_for_plugins(plugin_ids, formula=None):
     """Query Airtable for all commands in matched plugins"""
     print(f"\n📋 Querying commands for plugins...")
 
     commands_table = api.table(BASE_ID, "Commands")
 
-    # Fetch all commands at once (more efficient than per-plugin queries)
-    all_records = commands_table.all()
-
     # Group commands by plugin
     all_commands = {plugin_name: [] for plugin_name in plugin_ids.keys()}
+    if not plugin_ids:
+        return all_commands
+
+    # One filtered fetch: only commands of matched plugins, only the needed columns
+    records = commands_table.all(
+        formula=formula or linked_plugin_formula(plugin_ids.keys()),
+        fields=COMMAND_FIELDS,
+    )
+
+    # The API returns linked record IDs, grouped here through an id -> name lookup
+    plugin_names = {plugin_id: plugin_name for plugin_name, plugin_id in plugin_ids.items()}
+
+    for record in records:
+        for plugin_id in record['fields'].get('Plugin', []):
+            plugin_name = plugin_names.get(plugin_id)
+            if plugin_name is None:
+                continue
+            cmd = {
+                "command": record['fields'].get('Command Name'),
+                "plugin": plugin_name,
+                "description": record['fields'].get('Description'),
+                "airtableId": record['id'],
+                "available": True
+            }
+            all_commands[plugin_name].append(cmd)
 
-    for record in all_records:
-        # Get the linked plugin IDs (array of record IDs)
-        plugin_links = record['fields'].get('Plugin', [])
-
-        # Check if this command belongs to any of our target plugins
-        for plugin_name, plugin_id in plugin_ids.items():
-            if plugin_id in plugin_links:
-                cmd = {
-                    "command": record['fields'].get('Command Name'),
-                    "plugin": plugin_name,
-                    "description": record['fields'].get('Description'),
-                    "airtableId": record['id'],
-                    "available": True
-                }
-                all_commands[plugin_name].append(cmd)
-
-    # Print summary
-    for plugin_name in plugin_ids.keys():
-        count = len(all_commands[plugin_name])
-        print(f"   ✓ {plugin_name}: {count} commands")
+    if formula is None:
+        print_command_counts(all_commands)
 
     return all_commands
 
 
+def print_command_counts(all_commands):
+    for plugin_name, commands in all_commands.items():
+        print(f"   ✓ {plugin_name}: {len(commands)} commands")
+
+
+def refresh_commands(matched_plugins, resolver, cache):
+    """Commands per matched plugin, fetching only what changed since the cached run
+
+    Returns (all_commands, changed plugin names, plugin state to cache).
+    A plugin is refetched in full when it is new to the manifest or its
+    linked command IDs (from the Plugins fetch) differ from the cache, which
+    catches deleted and unlinked commands. For every other plugin only
+    commands modified since the last run come back from Airtable.
+    """
+    plugin_state = {name: [plugin_id, sorted(resolver.command_ids.get(plugin_id, []))]
+                    for name, plugin_id in matched_plugins.items()}
+    cached_state = cache.get("plugins", {})
+
+    if not cache.get("synced_at"):
+        return query_commands_for_plugins(matched_plugins), set(matched_plugins), plugin_state
+
+    known = {name: plugin_id for name, plugin_id in matched_plugins.items()
+             if cached_state.get(name) == plugin_state[name]}
+    refetch = {name: plugin_id for name, plugin_id in matched_plugins.items() if name not in known}
+
+    since = (datetime.fromisoformat(cache["synced_at"]) - SYNC_MARGIN).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+    clauses = []
+    if refetch:
+        clauses.append(linked_plugin_formula(refetch.keys()))
+    if known:
+        clauses.append(f"AND({linked_plugin_formula(known.keys())}, IS_AFTER(LAST_MODIFIED_TIME(), '{since}'))")
+    fetched = query_commands_for_plugins(matched_plugins, formula=f"OR({', '.join(clauses)})")
+
+    all_commands, changed = {}, set(refetch) | (set(cached_state) - set(matched_plugins))
+    for name in matched_plugins:
+        if name in refetch:
+            all_commands[name] = fetched[name]
+            continue
+
+        # Modified commands replace their cached entry in place; newly linked ones go last
+        modified = {cmd["airtableId"]: cmd for cmd in fetched[name]}
+        commands = [modified.pop(cmd["airtableId"], cmd) for cmd in cache["commands"].get(name, [])]
+        commands.extend(modified.values())
+        all_commands[name] = commands
+        if fetched[name]:
+            changed.add(name)
+
+    print_command_counts(all_commands)
+    print(f"   ✓ {len(changed)} plugins changed since last run")
+    return all_commands, changed, plugin_state
+
+
 def detect_gaps(detected_tech, matched_plugins):
     """Detect technologies mentioned in arch docs but no plugin exists"""
     print(f"\n🔎 Detecting gaps...")
@@ -176,10 +319,24 @@ def detect_gaps(detected_tech, matched_plugins):
     return gaps
 
 
-def organize_into_layers(all_commands):
-    """Organize commands into execution layers"""
+def layer_affected(layer_key, changed_plugins):
+    """Whether a change to these plugins can alter a layer"""
+    if layer_key in LAYER_SOURCES:
+        return bool(set(LAYER_SOURCES[layer_key]) & changed_plugins)
+    return any(plugin not in CORE_PLUGINS for plugin in changed_plugins)
+
+
+def organize_into_layers(all_commands, previous=None, changed_plugins=None):
+    """Organize commands into execution layers
+
+    With previous layers from the cache, only layers fed by a changed
+    plugin are rebuilt.
+    """
     print(f"\n📊 Organizing commands into layers...")
 
+    def rebuild(layer_key):
+        return previous is None or changed_plugins is None or layer_affected(layer_key, changed_plugins)
+
     layers = {
         "layer1": {
             "name": "Infrastructure Foundation",
@@ -203,35 +360,44 @@ def organize_into_layers(all_commands):
         }
     }
 
+    # Unaffected layers are carried over from the cached run
+    for layer_key in layers:
+        if not rebuild(layer_key):
+            layers[layer_key] = previous[layer_key]
+
     # Layer 1: Foundation, planning, supervisor commands
-    for plugin in ["foundation", "planning", "supervisor", "iterate"]:
-        if plugin in all_commands:
-            for cmd in all_commands[plugin]:
-                layers["layer1"]["commands"].append(cmd)
+    if rebuild("layer1"):
+        for plugin in LAYER_SOURCES["layer1"]:
+            if plugin in all_commands:
+                for cmd in all_commands[plugin]:
+                    layers["layer1"]["commands"].append(cmd)
 
     # Layer 2: Init commands from tech stack plugins
-    for plugin, commands in all_commands.items():
-        if plugin not in ["foundation", "planning", "supervisor", "iterate", "quality", "deployment", "versioning"]:
-            for cmd in commands:
-                if ':init' in cmd['command']:
-                    if plugin not in layers["layer2"]["plugins"]:
-                        layers["layer2"]["plugins"].append(plugin)
-                    layers["layer2"]["commands"].append(cmd)
+    if rebuild("layer2"):
+        for plugin, commands in all_commands.items():
+            if plugin not in CORE_PLUGINS:
+                for cmd in commands:
+                    if ':init' in cmd['command']:
+                        if plugin not in layers["layer2"]["plugins"]:
+                            layers["layer2"]["plugins"].append(plugin)
+                        layers["layer2"]["commands"].append(cmd)
 
     # Layer 3: All other tech stack commands (non-init, non-lifecycle)
-    for plugin, commands in all_commands.items():
-        if plugin not in ["foundation", "planning", "supervisor", "iterate", "quality", "deployment", "versioning"]:
-            for cmd in commands:
-                if ':init' not in cmd['command']:
-                    if plugin not in layers["layer3"]["plugins"]:
-                        layers["layer3"]["plugins"].append(plugin)
-                    layers["layer3"]["commands"].append(cmd)
+    if rebuild("layer3"):
+        for plugin, commands in all_commands.items():
+            if plugin not in CORE_PLUGINS:
+                for cmd in commands:
+                    if ':init' not in cmd['command']:
+                        if plugin not in layers["layer3"]["plugins"]:
+                            layers["layer3"]["plugins"].append(plugin)
+                        layers["layer3"]["commands"].append(cmd)
 
     # Layer 4: Quality, deployment, versioning commands
-    for plugin in ["quality", "deployment", "versioning"]:
-        if plugin in all_commands:
-            for cmd in all_commands[plugin]:
-                layers["layer4"]["commands"].append(cmd)
+    if rebuild("layer4"):
+        for plugin in LAYER_SOURCES["layer4"]:
+            if plugin in all_commands:
+                for cmd in all_commands[plugin]:
+                    layers["layer4"]["commands"].append(cmd)
 
     print(f"   ✓ Layer 1: {len(layers['layer1']['commands'])} commands")
     print(f"   ✓ Layer 2: {len(layers['layer2']['commands'])} commands")
@@ -241,7 +407,7 @@ def organize_into_layers(all_commands):
     return layers
 
 
-def generate_json(project_name, tech_stack, layers, gaps, output_path):
+def generate_json(project_name, tech_stack, layers, gaps, output_path, locations=None):
     """Generate BUILD-GUIDE.json"""
     print(f"\n📝 Generating BUILD-GUIDE.json...")
 
@@ -251,6 +417,7 @@ def generate_json(project_name, tech_stack, layers, gaps, output_path):
         "techStack": {
             "detected": tech_stack,
             "source": "docs/architecture/README.md",
+            "locations": locations or {},
             "marketplaces": [
                 "dev-lifecycle-marketplace",
                 "ai-dev-marketplace",
@@ -353,11 +520,53 @@ def _format_layer(layer):
 """
 
 
+def content_key(value):
+    """Stable hash of any JSON-serializable value"""
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+
+def fingerprint_docs(arch_path, cached_docs):
+    """{path: [mtime_ns, size, sha256]} for every architecture doc
+
+    Files whose mtime and size match the cache keep their cached hash
+    instead of being read again.
+    """
+    docs = {}
+    for file_path in markdown_files(arch_path):
+        stat = os.stat(file_path)
+        cached = cached_docs.get(file_path)
+        if cached and cached[:2] == [stat.st_mtime_ns, stat.st_size]:
+            docs[file_path] = cached
+            continue
+        with open(file_path, 'rb') as f:
+            docs[file_path] = [stat.st_mtime_ns, stat.st_size, hashlib.sha256(f.read()).hexdigest()]
+    return docs
+
+
+def load_cache(cache_path):
+    try:
+        with open(cache_path, 'r') as f:
+            cache = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return cache if cache.get("version") == CACHE_VERSION else {}
+
+
+def save_cache(cache_path, cache):
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, cache_path)
+
+
 def main():
     parser = argparse.ArgumentParser(description='Generate BUILD-GUIDE from Airtable')
     parser.add_argument('--architecture', required=True, help='Path to architecture docs')
     parser.add_argument('--output', default='BUILD-GUIDE', help='Output file prefix')
     parser.add_argument('--project', default='my-project', help='Project name')
+    parser.add_argument('--keywords', help='JSON file of extra {"keyword": "plugin"} tech mappings')
+    parser.add_argument('--cache', help='Input fingerprint cache (default: <output>.cache.json)')
+    parser.add_argument('--force', action='store_true', help='Ignore the cache and rebuild everything')
 
     args = parser.parse_args()
 
@@ -365,26 +574,54 @@ def main():
     print("🏗️  BUILD-GUIDE Generator")
     print("="*80)
 
-    # Step 1: Read architecture docs
-    tech_stack = read_architecture_docs(args.architecture)
+    cache_path = args.cache or f"{args.output}.cache.json"
+    cache = {} if args.force else load_cache(cache_path)
+    started = datetime.now(timezone.utc)
+
+    # Step 1: Read architecture docs (skipped when no doc or keyword changed)
+    keywords = load_tech_keywords(args.keywords)
+    docs = fingerprint_docs(args.architecture, cache.get("docs", {}))
+    docs_key = content_key([{path: doc[2] for path, doc in docs.items()}, keywords])
+    if cache.get("docs_key") == docs_key:
+        tech_stack, locations = cache["tech_stack"], cache["locations"]
+        print(f"⏭️  Architecture docs unchanged ({len(docs)} files), reusing detected technologies")
+    else:
+        tech_stack, locations = read_architecture_docs(args.architecture, keywords)
 
     # Step 2: Query Airtable for plugins
-    matched_plugins = query_plugins_for_tech(tech_stack)
+    resolver = PluginResolver.fetch(api.table(BASE_ID, "Plugins"))
+    matched_plugins = query_plugins_for_tech(tech_stack, resolver)
 
-    # Step 3: Query commands for matched plugins
-    all_commands = query_commands_for_plugins(matched_plugins)
+    # Step 3: Query commands for matched plugins (only changes when cached)
+    all_commands, changed_plugins, plugin_state = refresh_commands(matched_plugins, resolver, cache)
 
     # Step 4: Detect gaps
     gaps = detect_gaps(tech_stack, matched_plugins)
 
     # Step 5: Organize into layers
-    layers = organize_into_layers(all_commands)
-
-    # Step 6: Generate JSON
-    manifest = generate_json(args.project, tech_stack, layers, gaps, args.output)
+    layers = organize_into_layers(all_commands, cache.get("layers"), changed_plugins)
 
-    # Step 7: Generate Markdown
-    generate_markdown(manifest, args.output)
+    # Steps 6-7: Generate JSON and Markdown, unless their content is unchanged
+    manifest_key = content_key([args.project, args.output, tech_stack, locations, layers, gaps])
+    outputs_exist = os.path.exists(f"{args.output}.json") and os.path.exists(f"{args.output}.md")
+    if cache.get("manifest_key") == manifest_key and outputs_exist:
+        print(f"\n⏭️  BUILD-GUIDE is up to date, nothing to write")
+    else:
+        manifest = generate_json(args.project, tech_stack, layers, gaps, args.output, locations)
+        generate_markdown(manifest, args.output)
+
+    save_cache(cache_path, {
+        "version": CACHE_VERSION,
+        "synced_at": started.isoformat(),
+        "docs": docs,
+        "docs_key": docs_key,
+        "tech_stack": tech_stack,
+        "locations": locations,
+        "plugins": plugin_state,
+        "commands": all_commands,
+        "layers": layers,
+        "manifest_key": manifest_key,
+    })
 
     print("\n" + "="*80)
     print("✅ BUILD-GUIDE generation complete!")
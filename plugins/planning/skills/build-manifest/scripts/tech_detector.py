@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+"""
+tech_detector.py
+Streaming multi-keyword tech detection for architecture docs.
+
+Builds one Aho-Corasick automaton over every tech keyword, then feeds it
+the docs a line at a time, so the cost is one pass over the text however
+many keywords the catalog holds, and no file is ever held in memory with
+the others. Matching is case-sensitive, like the substring checks it
+replaces.
+
+Used by:
+  plugins/planning/skills/build-manifest/scripts/generate-manifest.py
+"""
+
+import os
+from collections import deque
+
+
+class TechDetector:
+    """Aho-Corasick automaton mapping tech keywords to plugin names"""
+
+    def __init__(self, keywords):
+        """keywords maps each keyword (e.g. "Next.js") to a plugin name"""
+        self.keywords = dict(keywords)
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        for keyword in self.keywords:
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].append(keyword)
+
+        # Breadth-first, so every fail target is finished before it is used
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def scan_lines(self, lines):
+        """Yield (line number, keyword) for every keyword occurrence"""
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        for line_number, line in enumerate(lines, start=1):
+            for char in line:
+                while state and char not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(char, 0)
+                if output[state]:
+                    for keyword in output[state]:
+                        yield line_number, keyword
+
+    def detect(self, paths):
+        """Scan files one at a time and record where each keyword was found
+
+        Returns (tech_stack, locations): plugins in catalog order, and
+        {plugin: [{"keyword", "file", "line"}]} with the first line each
+        keyword appears on in each file.
+        """
+        found = {}
+        for path in paths:
+            seen = set()
+            with open(path, 'r') as f:
+                for line_number, keyword in self.scan_lines(f):
+                    if keyword not in seen:
+                        seen.add(keyword)
+                        found.setdefault(keyword, []).append({"keyword": keyword, "file": path, "line": line_number})
+
+        tech_stack, locations = [], {}
+        for keyword, plugin in self.keywords.items():
+            if keyword not in found:
+                continue
+            if plugin not in tech_stack:
+                tech_stack.append(plugin)
+            locations.setdefault(plugin, []).extend(found[keyword])
+        return tech_stack, locations
+
+
+def markdown_files(arch_path):
+    """Yield the architecture doc itself, or every .md file under a directory"""
+    if not os.path.isdir(arch_path):
+        yield arch_path
+        return
+    for root, dirs, files in os.walk(arch_path):
+        for file in files:
+            if file.endswith('.md'):
+                yield os.path.join(root, file)
@@ -2,14 +2,30 @@
 """
 Bulk Worktree Registration
 Creates and registers worktrees for ALL specs at once
+
+Creation runs in two stages with separately sized pools: `git worktree add`
+calls contend on the repository's locks, so they run one or two at a time,
+while dependency installs are disk- and CPU-bound and get a pool sized from
+the core count. Each worktree moves to the install pool as soon as git has
+created it, and progress is printed as results complete.
 """
 
 import os
 import sys
 import subprocess
+import time
 from pathlib import Path
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Concurrent `git worktree add` calls; more mostly waits on .git locks
+GIT_WORKERS = 2
+
+# Installs are themselves multi-threaded and disk-bound, so half the cores is plenty
+INSTALL_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))
+
+# Retries for git commands that lost a race for a .lock file
+GIT_LOCK_RETRIES = 5
 
 try:
     from mem0 import Memory
@@ -17,11 +33,15 @@ except ImportError:
     print("❌ Mem0 not installed")
     sys.exit(1)
 
+from worktree_deps import DEPS_MODES, DependencyInstaller
+
 
 class BulkWorktreeRegistry:
-    def __init__(self, project_root: str | Path):
-        self.project_root = Path(project_root)
+    def __init__(self, project_root: str | Path, deps_mode: str = "install"):
+        self.project_root = Path(project_root).resolve()
         self.project_name = self._detect_project_name()
+        # Worktrees with identical lockfiles share one install in "shared" mode
+        self.installer = DependencyInstaller(self.project_root, mode=deps_mode)
 
         # Initialize Mem0
         storage_path = Path.home() / ".claude" / "mem0-chroma"
@@ -97,13 +117,28 @@ class BulkWorktreeRegistry:
 
         return sorted(list(agents))
 
-    def create_worktree(self, spec_num: str, spec_name: str, agent: str) -> dict:
-        """Create single worktree for agent"""
+    def existing_worktrees(self) -> set[Path]:
+        """Resolved paths of every worktree git already knows about"""
+        output = subprocess.check_output(
+            ["git", "worktree", "list", "--porcelain"], cwd=self.project_root, text=True
+        )
+        return {
+            Path(line[len("worktree "):]).resolve()
+            for line in output.splitlines() if line.startswith("worktree ")
+        }
+
+    def add_worktree(self, spec_num: str, spec_name: str, agent: str, existing: set[Path] | None = None) -> dict:
+        """Run `git worktree add` for one agent, without installing dependencies
+
+        existing is the result of existing_worktrees(), so bulk runs list
+        worktrees once instead of once per agent.
+        """
         branch = f"agent-{agent}-{spec_num}"
         worktree_path = f"../{self.project_name}-{spec_num}-{agent}"
 
         result = {
             "spec": spec_name,
+            "spec_num": spec_num,
             "agent": agent,
             "branch": branch,
             "path": worktree_path,
@@ -114,19 +149,22 @@ class BulkWorktreeRegistry:
 
         try:
             # Check if worktree already exists
-            check_cmd = ["git", "worktree", "list"]
-            output = subprocess.check_output(check_cmd, cwd=self.project_root, text=True)
-            if worktree_path in output:
+            if existing is None:
+                existing = self.existing_worktrees()
+            if (self.project_root / worktree_path).resolve() in existing:
                 result["error"] = "Worktree already exists"
                 return result
 
-            # Create worktree
+            # Create worktree, retrying when another git process holds a lock
             cmd = ["git", "worktree", "add", worktree_path, "-b", branch]
-            subprocess.run(cmd, cwd=self.project_root, check=True, capture_output=True)
-
-            # Install dependencies
-            deps_success = self.setup_dependencies(worktree_path)
-            result["deps_installed"] = deps_success
+            for attempt in range(GIT_LOCK_RETRIES + 1):
+                try:
+                    subprocess.run(cmd, cwd=self.project_root, check=True, capture_output=True)
+                    break
+                except subprocess.CalledProcessError as e:
+                    if attempt == GIT_LOCK_RETRIES or b".lock" not in (e.stderr or b""):
+                        raise
+                    time.sleep(0.2 * 2 ** attempt)
 
             result["success"] = True
             return result
@@ -135,6 +173,21 @@ class BulkWorktreeRegistry:
             result["error"] = e.stderr.decode() if e.stderr else str(e)
             return result
 
+    def create_worktree(self, spec_num: str, spec_name: str, agent: str) -> dict:
+        """Create single worktree for agent"""
+        result = self.add_worktree(spec_num, spec_name, agent)
+        if result["success"]:
+            # Install dependencies
+            result["deps_installed"] = self.setup_dependencies(result["path"])
+        return result
+
+    def install_worktree(self, result: dict) -> dict:
+        """Install dependencies for a worktree created by add_worktree"""
+        started = time.monotonic()
+        result["deps_installed"] = self.setup_dependencies(result["path"])
+        result["install_seconds"] = round(time.monotonic() - started, 1)
+        return result
+
     def setup_dependencies(self, worktree_path: str) -> bool:
         """Install dependencies in worktree"""
         worktree = Path(self.project_root.parent / worktree_path.replace("../", ""))
@@ -142,52 +195,23 @@ class BulkWorktreeRegistry:
         if not worktree.exists():
             return False
 
-        # Node.js project
-        if (worktree / "package.json").exists():
-            # Detect package manager
-            if (worktree / "pnpm-lock.yaml").exists():
-                result = subprocess.run(["pnpm", "install"], cwd=worktree, capture_output=True)
-                pkg_mgr = "pnpm"
-            elif (worktree / "yarn.lock").exists():
-                result = subprocess.run(["yarn", "install"], cwd=worktree, capture_output=True)
-                pkg_mgr = "yarn"
-            else:
-                result = subprocess.run(["npm", "install"], cwd=worktree, capture_output=True)
-                pkg_mgr = "npm"
-
-            if result.returncode == 0:
-                # Register in Mem0
-                memory_text = f"""
-                Dependencies installed in worktree {worktree.name}.
-                Project type: Node.js
-                Package manager: {pkg_mgr}
-                Status: ready
-                Installed: {datetime.now().isoformat()}
-                """
-                self.memory.add(memory_text, user_id=f"{self.project_name}-worktrees")
-                return True
+        setup = self.installer.setup(worktree)
+        if setup["manager"] is None:
+            # No dependencies needed
+            return True
+        if not setup["ok"]:
             return False
 
-        # Python project
-        elif (worktree / "requirements.txt").exists():
-            result = subprocess.run(
-                ["pip", "install", "-r", "requirements.txt"],
-                cwd=worktree,
-                capture_output=True
-            )
-            if result.returncode == 0:
-                memory_text = f"""
-                Dependencies installed in worktree {worktree.name}.
-                Project type: Python
-                Package manager: pip
-                Status: ready
-                Installed: {datetime.now().isoformat()}
-                """
-                self.memory.add(memory_text, user_id=f"{self.project_name}-worktrees")
-                return True
-            return False
-
-        # No dependencies needed
+        project_type = "Python" if setup["manager"].startswith("pip") else "Node.js"
+        memory_text = f"""
+        Dependencies installed in worktree {worktree.name}.
+        Project type: {project_type}
+        Package manager: {setup['manager']}
+        Setup: {setup['strategy']}{f" from {setup['seed']}" if setup['seed'] else ""}
+        Status: ready
+        Installed: {datetime.now().isoformat()}
+        """
+        self.memory.add(memory_text, user_id=f"{self.project_name}-worktrees")
         return True
 
     def register_in_mem0(self, spec_num: str, spec_name: str, agent: str, worktree_path: str, branch: str):
@@ -203,77 +227,76 @@ class BulkWorktreeRegistry:
 
         self.memory.add(memory_text, user_id=f"{self.project_name}-worktrees")
 
-    def bulk_create(self, specs: list[dict], parallel: bool = True) -> dict:
-        """Create worktrees for all specs"""
-        total_worktrees = sum(len(spec["agents"]) for spec in specs)
+    def bulk_create(self, specs: list[dict], parallel: bool = True,
+                    git_workers: int | None = None, install_workers: int | None = None) -> dict:
+        """Create worktrees for all specs
+
+        Stage one runs `git worktree add` in a small pool; every worktree it
+        creates is handed straight to the install pool, so installs start
+        while later worktrees are still being added.
+        """
+        jobs = [(spec, agent) for spec in specs for agent in spec["agents"]]
+        total_worktrees = len(jobs)
+        git_workers = 1 if not parallel else (git_workers or GIT_WORKERS)
+        install_workers = 1 if not parallel else (install_workers or INSTALL_WORKERS)
 
         print(f"\n🚀 Bulk Worktree Creation")
         print(f"📊 Specs: {len(specs)}")
         print(f"🤖 Total Worktrees: {total_worktrees}")
-        print(f"⚙️  Mode: {'Parallel' if parallel else 'Sequential'}\n")
+        print(f"⚙️  Mode: {'Parallel' if parallel else 'Sequential'} "
+              f"(git: {git_workers}, installs: {install_workers})\n")
 
         results = {
             "success": [],
             "failed": [],
             "skipped": []
         }
-
-        if parallel:
-            # Create worktrees in parallel
-            with ThreadPoolExecutor(max_workers=10) as executor:
-                futures = []
-                for spec in specs:
-                    for agent in spec["agents"]:
-                        future = executor.submit(
-                            self.create_worktree,
-                            spec["number"],
-                            spec["name"],
-                            agent
-                        )
-                        futures.append((future, spec, agent))
-
-                for future, spec, agent in futures:
+        started = time.monotonic()
+        done = 0
+
+        def report(result, marker, message):
+            nonlocal done
+            done += 1
+            elapsed = time.monotonic() - started
+            print(f"{marker} [{done}/{total_worktrees} {elapsed:.0f}s] {result['spec']}/{result['agent']}{message}")
+
+        existing = self.existing_worktrees()
+
+        with ThreadPoolExecutor(max_workers=git_workers) as git_pool, \
+                ThreadPoolExecutor(max_workers=install_workers) as install_pool:
+            pending = {
+                git_pool.submit(self.add_worktree, spec["number"], spec["name"], agent, existing)
+                for spec, agent in jobs
+            }
+
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
                     result = future.result()
-                    if result["success"]:
+
+                    if "install_seconds" in result:
                         # Register in Mem0
                         self.register_in_mem0(
-                            spec["number"],
-                            spec["name"],
-                            agent,
-                            result["path"],
-                            result["branch"]
-                        )
-                        results["success"].append(result)
-                        deps_marker = "📦" if result.get("deps_installed") else ""
-                        print(f"✅ {spec['name']}/{agent} → {result['path']} {deps_marker}")
-                    elif "already exists" in result.get("error", ""):
-                        results["skipped"].append(result)
-                        print(f"⏭️  {spec['name']}/{agent} (already exists)")
-                    else:
-                        results["failed"].append(result)
-                        print(f"❌ {spec['name']}/{agent}: {result['error']}")
-        else:
-            # Sequential creation
-            for spec in specs:
-                for agent in spec["agents"]:
-                    result = self.create_worktree(spec["number"], spec["name"], agent)
-                    if result["success"]:
-                        self.register_in_mem0(
-                            spec["number"],
-                            spec["name"],
-                            agent,
+                            result["spec_num"],
+                            result["spec"],
+                            result["agent"],
                             result["path"],
                             result["branch"]
                         )
                         results["success"].append(result)
-                        print(f"✅ {spec['name']}/{agent} → {result['path']}")
-                    elif "already exists" in result.get("error", ""):
+                        deps_marker = f" 📦 {result['install_seconds']}s" if result.get("deps_installed") else ""
+                        report(result, "✅", f" → {result['path']}{deps_marker}")
+                    elif result["success"]:
+                        # Worktree exists; install in the second stage
+                        pending.add(install_pool.submit(self.install_worktree, result))
+                    elif "already exists" in (result.get("error") or ""):
                         results["skipped"].append(result)
-                        print(f"⏭️  {spec['name']}/{agent} (already exists)")
+                        report(result, "⏭️ ", " (already exists)")
                     else:
                         results["failed"].append(result)
-                        print(f"❌ {spec['name']}/{agent}: {result['error']}")
+                        report(result, "❌", f": {result['error']}")
 
+        print(f"\n⏱️  {total_worktrees} worktrees in {time.monotonic() - started:.1f}s")
         return results
 
     def print_summary(self, results: dict):
@@ -299,11 +322,18 @@ def main():
     parser = argparse.ArgumentParser(description="Bulk Worktree Creation with Mem0")
     parser.add_argument("--project", default=".", help="Project root path")
     parser.add_argument("--sequential", action="store_true", help="Create sequentially (default: parallel)")
+    parser.add_argument("--git-workers", type=int, default=GIT_WORKERS,
+                        help=f"Concurrent git worktree adds (default: {GIT_WORKERS})")
+    parser.add_argument("--install-workers", type=int, default=INSTALL_WORKERS,
+                        help=f"Concurrent dependency installs (default: {INSTALL_WORKERS}, from CPU count)")
+    parser.add_argument("--deps-mode", choices=DEPS_MODES, default="install",
+                        help="install: full install in every worktree (default); "
+                             "shared: install once per identical lockfiles and clone the rest from a read-only store")
     parser.add_argument("--dry-run", action="store_true", help="Show what would be created without creating")
 
     args = parser.parse_args()
 
-    registry = BulkWorktreeRegistry(args.project)
+    registry = BulkWorktreeRegistry(args.project, deps_mode=args.deps_mode)
 
     # Find all specs
     print("🔍 Scanning for specs...")
@@ -334,7 +364,12 @@ def main():
         sys.exit(0)
 
     # Create all worktrees
-    results = registry.bulk_create(specs, parallel=not args.sequential)
+    results = registry.bulk_create(
+        specs,
+        parallel=not args.sequential,
+        git_workers=max(1, args.git_workers),
+        install_workers=max(1, args.install_workers)
+    )
 
     # Print summary
     registry.print_summary(results)
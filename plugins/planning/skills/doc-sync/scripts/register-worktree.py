@@ -15,11 +15,22 @@ except ImportError:
     print("❌ Mem0 not installed")
     sys.exit(1)
 
+from worktree_clone import clone_file, clone_tree, new_stats
+from worktree_deps import DEPS_MODES, DependencyInstaller
+
+# Build caches whose files are never modified in place, so worktrees may
+# share them through hardlinks when reflinks are unavailable. webpack writes
+# each pack file to a temporary name and renames it over the old one; the
+# ESLint, Prettier and babel caches elsewhere under .next/cache and
+# node_modules/.cache are rewritten in place and always byte-copied.
+LINKABLE_CACHES = (".next/cache/webpack/",)
+
 
 class WorktreeRegistry:
-    def __init__(self, project_root: str | Path):
+    def __init__(self, project_root: str | Path, deps_mode: str = "install"):
         self.project_root = Path(project_root)
         self.project_name = self._detect_project_name()
+        self.deps_mode = deps_mode
 
         # Initialize Mem0 (shared global storage)
         storage_path = Path.home() / ".claude" / "mem0-chroma"
@@ -153,9 +164,12 @@ class WorktreeRegistry:
                 print(f"  {memory}\n")
 
     def setup_dependencies(self, worktree_path: str):
-        """Install dependencies in worktree after creation"""
-        import subprocess
+        """Install dependencies in worktree after creation
 
+        The default "install" mode runs a full install every time; in
+        "shared" mode, worktrees with identical lockfiles reuse one install
+        (see worktree_deps.py).
+        """
         worktree = Path(worktree_path)
 
         if not worktree.exists():
@@ -164,109 +178,53 @@ class WorktreeRegistry:
 
         print(f"\n📦 Setting up dependencies for {worktree.name}...")
 
-        # Node.js project
-        if (worktree / "package.json").exists():
-            print("   Detected Node.js project")
-
-            # Detect package manager
-            if (worktree / "pnpm-lock.yaml").exists():
-                print("   Using pnpm...")
-                result = subprocess.run(["pnpm", "install"], cwd=worktree, capture_output=True)
-                pkg_mgr = "pnpm"
-            elif (worktree / "yarn.lock").exists():
-                print("   Using yarn...")
-                result = subprocess.run(["yarn", "install"], cwd=worktree, capture_output=True)
-                pkg_mgr = "yarn"
-            else:
-                print("   Using npm...")
-                result = subprocess.run(["npm", "install"], cwd=worktree, capture_output=True)
-                pkg_mgr = "npm"
-
-            if result.returncode == 0:
-                print(f"   ✅ Node dependencies installed ({pkg_mgr})")
-
-                # Register in Mem0
-                memory_text = f"""
-                Dependencies installed in worktree {worktree.name}.
-                Project type: Node.js
-                Package manager: {pkg_mgr}
-                Status: ready
-                Installed: {datetime.now().isoformat()}
-                """
-                self.memory.add(memory_text, user_id=f"{self.project_name}-worktrees")
-                return True
-            else:
-                print(f"   ❌ Failed to install Node dependencies")
-                print(f"   Error: {result.stderr.decode()[:200]}")
-                return False
-
-        # Python project
-        elif (worktree / "requirements.txt").exists():
-            print("   Detected Python project")
-            print("   Using pip...")
-
-            result = subprocess.run(
-                ["pip", "install", "-r", "requirements.txt"],
-                cwd=worktree,
-                capture_output=True
-            )
-
-            if result.returncode == 0:
-                print(f"   ✅ Python dependencies installed")
-
-                # Register in Mem0
-                memory_text = f"""
-                Dependencies installed in worktree {worktree.name}.
-                Project type: Python
-                Package manager: pip
-                Status: ready
-                Installed: {datetime.now().isoformat()}
-                """
-                self.memory.add(memory_text, user_id=f"{self.project_name}-worktrees")
-                return True
-            else:
-                print(f"   ❌ Failed to install Python dependencies")
-                print(f"   Error: {result.stderr.decode()[:200]}")
-                return False
-
-        # Python project with pyproject.toml
-        elif (worktree / "pyproject.toml").exists():
-            print("   Detected Python project (pyproject.toml)")
-            print("   Using pip...")
-
-            result = subprocess.run(
-                ["pip", "install", "-e", "."],
-                cwd=worktree,
-                capture_output=True
-            )
-
-            if result.returncode == 0:
-                print(f"   ✅ Python dependencies installed")
-
-                # Register in Mem0
-                memory_text = f"""
-                Dependencies installed in worktree {worktree.name}.
-                Project type: Python
-                Package manager: pip (pyproject.toml)
-                Status: ready
-                Installed: {datetime.now().isoformat()}
-                """
-                self.memory.add(memory_text, user_id=f"{self.project_name}-worktrees")
-                return True
-            else:
-                print(f"   ❌ Failed to install Python dependencies")
-                print(f"   Error: {result.stderr.decode()[:200]}")
-                return False
+        installer = DependencyInstaller(self.project_root, mode=self.deps_mode)
+        setup = installer.setup(worktree)
+        manager = setup["manager"]
 
-        else:
+        if manager is None:
             print("   ℹ️  No dependency file found (package.json, requirements.txt)")
             print("   ✅ Worktree ready (no dependencies needed)")
             return True
 
+        project_type = "Python" if manager.startswith("pip") else "Node.js"
+        pkg_mgr = "pip (pyproject.toml)" if manager == "pip-editable" else manager
+        print(f"   Detected {project_type} project, using {pkg_mgr}...")
+
+        if not setup["ok"]:
+            print(f"   ❌ Failed to install {project_type} dependencies")
+            print(f"   Error: {(setup['error'] or '')[:200]}")
+            return False
+
+        if setup["strategy"] == "cloned":
+            mb_saved = setup["bytes_saved"] / 1024 / 1024
+            print(f"   ✅ Cloned node_modules from {setup['seed']} ({setup['reflinked']} reflinked, "
+                  f"{setup['linked']} linked, {setup['copied']} copied; {mb_saved:.0f} MB not copied)")
+        elif setup["strategy"] == "cached":
+            print(f"   ✅ Dependencies already installed for identical lockfiles ({setup['seed']})")
+        else:
+            print(f"   ✅ {project_type} dependencies installed ({pkg_mgr})")
+
+        # Register in Mem0
+        memory_text = f"""
+        Dependencies installed in worktree {worktree.name}.
+        Project type: {project_type}
+        Package manager: {pkg_mgr}
+        Setup: {setup['strategy']}{f" from {setup['seed']}" if setup['seed'] else ""}
+        Status: ready
+        Installed: {datetime.now().isoformat()}
+        """
+        self.memory.add(memory_text, user_id=f"{self.project_name}-worktrees")
+        return True
+
     def copy_gitignored_build_files(self, worktree_path: str):
-        """Copy git-ignored files/directories that are needed for build"""
-        import subprocess
-        import shutil
+        """Copy git-ignored files/directories that are needed for build
+
+        Items are cloned in parallel. Files are reflinked where the
+        filesystem supports it, webpack's pack files fall back to
+        hardlinks, and everything else is byte-copied.
+        """
+        from concurrent.futures import ThreadPoolExecutor
 
         worktree = Path(worktree_path)
         main_repo = self.project_root
@@ -290,31 +248,48 @@ class WorktreeRegistry:
             "node_modules/.cache/",  # Build caches
         ]
 
-        copied = []
-        for item in ignored_items:
+        def clone_item(item):
             source = main_repo / item
             dest = worktree / item
+            if source.is_dir():
+                # Hardlinks are only allowed under caches that are never written in place
+                prefixes = tuple(
+                    cache[len(item):] for cache in LINKABLE_CACHES if cache.startswith(item)
+                )
+                return clone_tree(source, dest, link_prefixes=prefixes)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            stats = new_stats()
+            clone_file(str(source), dest, stats)
+            return stats
+
+        pending = [
+            item for item in ignored_items
+            if (main_repo / item).exists() and not (worktree / item).exists()
+        ]
 
-            if source.exists():
+        copied = []
+        totals = new_stats()
+        with ThreadPoolExecutor(max_workers=max(1, len(pending))) as executor:
+            futures = [(item, executor.submit(clone_item, item)) for item in pending]
+            for item, future in futures:
                 try:
-                    if source.is_dir():
-                        # Copy directory
-                        if not dest.exists():
-                            shutil.copytree(source, dest, symlinks=True)
-                            copied.append(item)
-                            print(f"   ✅ Copied directory: {item}")
-                    else:
-                        # Copy file
-                        if not dest.exists():
-                            dest.parent.mkdir(parents=True, exist_ok=True)
-                            shutil.copy2(source, dest)
-                            copied.append(item)
-                            print(f"   ✅ Copied file: {item}")
+                    stats = future.result()
                 except Exception as e:
                     print(f"   ⚠️  Failed to copy {item}: {e}")
+                    continue
+
+                copied.append(item)
+                for key, value in stats.items():
+                    totals[key] += value
+                kind = "directory" if item.endswith("/") else "file"
+                print(f"   ✅ Copied {kind}: {item} ({stats['reflinked']} reflinked, "
+                      f"{stats['linked']} linked, {stats['copied']} copied)")
 
         if copied:
+            mb_saved = totals["bytes_saved"] / 1024 / 1024
+            mb_copied = totals["bytes_copied"] / 1024 / 1024
             print(f"\n   Copied {len(copied)} git-ignored items needed for build")
+            print(f"   💾 {mb_saved:.1f} MB shared via reflinks/hardlinks, {mb_copied:.1f} MB byte-copied")
 
             # Register in Mem0
             memory_text = f"""
@@ -430,10 +405,13 @@ def main():
     parser.add_argument("--reason", help="Dependency reason")
     parser.add_argument("--query", help="Search query")
     parser.add_argument("--project", default=".", help="Project root path")
+    parser.add_argument("--deps-mode", choices=DEPS_MODES, default="install",
+                        help="install: full install in every worktree (default); "
+                             "shared: install once per identical lockfiles and clone the rest from a read-only store")
 
     args = parser.parse_args()
 
-    registry = WorktreeRegistry(args.project)
+    registry = WorktreeRegistry(args.project, deps_mode=args.deps_mode)
 
     if args.action == "register":
         if not all([args.spec, args.path, args.branch]):
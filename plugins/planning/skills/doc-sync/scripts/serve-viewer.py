@@ -4,11 +4,18 @@ Documentation Viewer API Server
 Serves Mem0 data to web viewer
 """
 
+import argparse
+import base64
+import gzip
+import hashlib
 import json
 import os
 import re
+import sqlite3
+import threading
+import time
 from pathlib import Path
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import HTTPServer, ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 
 try:
@@ -18,156 +25,380 @@ except ImportError:
     exit(1)
 
 
+STORAGE_PATH = Path.home() / ".claude" / "mem0-chroma"
+DEFAULT_PROJECT = "dev-lifecycle-marketplace"
+
+# Responses smaller than this are sent uncompressed
+GZIP_MIN_BYTES = 1024
+
 # Global memory instance
 _memory_instance = None
+_memory_lock = threading.Lock()
 
 def get_memory():
     global _memory_instance
-    if _memory_instance is None:
-        storage_path = Path.home() / ".claude" / "mem0-chroma"
-        config = {
-            "llm": {"provider": "openai", "config": {"model": "gpt-4o-mini", "temperature": 0.1}},
-            "vector_store": {"provider": "chroma", "config": {"collection_name": "documentation", "path": str(storage_path)}},
-            "embedder": {"provider": "openai", "config": {"model": "text-embedding-3-small"}}
-        }
-        _memory_instance = Memory.from_config(config)
+    with _memory_lock:
+        if _memory_instance is None:
+            config = {
+                "llm": {"provider": "openai", "config": {"model": "gpt-4o-mini", "temperature": 0.1}},
+                "vector_store": {"provider": "chroma", "config": {"collection_name": "documentation", "path": str(STORAGE_PATH)}},
+                "embedder": {"provider": "openai", "config": {"model": "text-embedding-3-small"}}
+            }
+            _memory_instance = Memory.from_config(config)
     return _memory_instance
 
 
-class ViewerAPI(BaseHTTPRequestHandler):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+def store_version():
+    """Fingerprint of the Chroma store on disk.
+
+    sync-to-mem0.py writes through the same SQLite file, so any sync bumps
+    the mtime/size of chroma.sqlite3 (or its WAL) and invalidates the cache.
+    """
+    version = []
+    for name in ("chroma.sqlite3", "chroma.sqlite3-wal"):
+        try:
+            st = (STORAGE_PATH / name).stat()
+            version.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            version.append(None)
+    return tuple(version)
+
+
+class CachedResponse:
+    """Encoded JSON body with its ETag and a lazily gzipped copy"""
+
+    def __init__(self, payload):
+        self.body = json.dumps(payload).encode()
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest() + '"'
+        self._gzipped = None
+
+    @property
+    def gzipped(self):
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6)
+        return self._gzipped
+
+
+class ResponseCache:
+    """Thread-safe per-key cache with TTL, invalidated when the store changes"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries = {}  # key -> (expires_at, store_version, value)
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, builder):
+        """Return the cached value for key, building it at most once per expiry"""
+        version = store_version()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic() and entry[1] == version:
+                return entry[2]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Only one thread rebuilds a given key; others wait and reuse its result
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and entry[0] > time.monotonic() and entry[1] == version:
+                    return entry[2]
+            value = builder()
+            with self._lock:
+                now = time.monotonic()
+                # Drop expired entries so per-page keys don't pile up
+                for stale_key in [k for k, e in self._entries.items() if e[0] <= now]:
+                    del self._entries[stale_key]
+                    self._key_locks.pop(stale_key, None)
+                self._entries[key] = (now + self.ttl, version, value)
+            return value
+
+
+response_cache = ResponseCache(ttl=60)
+
+
+# Doc groups in the order the viewer renders them
+DOC_TYPES = ("specs", "architecture", "adrs", "roadmap")
+DOC_TYPE_ALIASES = {
+    "spec": "specs", "specs": "specs",
+    "architecture": "architecture", "arch": "architecture",
+    "adr": "adrs", "adrs": "adrs",
+    "roadmap": "roadmap",
+}
+DOC_FIELDS = ("id", "memories", "memory_count")
+DEFAULT_DOC_FIELDS = ("id", "memories")
+MAX_PAGE_SIZE = 500
+
+
+def classify_memory(mem_text: str):
+    """Return (doc_id, doc_type) for a memory, or (None, None) if unmatched"""
+    # Check for Specification
+    spec_match = re.match(r'Specification (\d+)', mem_text)
+    if spec_match:
+        return f"spec-{spec_match.group(1)}", "specs"
+    # Check for spec references
+    if "specification" in mem_text.lower():
+        ref_match = re.search(r'specification (\d+)', mem_text, re.IGNORECASE)
+        if ref_match:
+            return f"spec-{ref_match.group(1)}", "specs"
+
+    # Check for Architecture
+    if "Architecture" in mem_text or "architecture" in mem_text.lower():
+        # Extract filename
+        arch_match = re.search(r'([a-z-]+\.md)', mem_text)
+        if arch_match:
+            return f"arch-{arch_match.group(1)}", "architecture"
+        return "arch-general", "architecture"
+
+    # Check for ADR
+    if "ADR" in mem_text:
+        adr_match = re.search(r'ADR-?(\d+|[a-z-]+)', mem_text, re.IGNORECASE)
+        if adr_match:
+            return f"adr-{adr_match.group(1)}", "adrs"
+
+    # Check for Roadmap
+    if "Phase" in mem_text or "roadmap" in mem_text.lower():
+        return "roadmap", "roadmap"
+
+    return None, None
+
+
+class DocIndex:
+    """Memories of one project grouped by document, built once per cache entry
+
+    Docs are kept in one list ordered by DOC_TYPES so a page is a slice and
+    a cursor is an offset into the (optionally type-filtered) list. version
+    fingerprints the grouped docs, so cursors from an index with different
+    contents can be rejected instead of skipping or repeating docs.
+    """
+
+    def __init__(self, docs_by_type):
+        self.docs_by_type = docs_by_type
+        digest = hashlib.sha1()
+        for doc_type in DOC_TYPES:
+            for doc in docs_by_type[doc_type]:
+                digest.update(json.dumps([doc["id"], doc["memories"]]).encode())
+        self.version = digest.hexdigest()[:12]
+
+    @classmethod
+    def build(cls, project):
+        memory = get_memory()
+        results = memory.get_all(user_id=project)
 
+        # Group memories by document
+        doc_groups = {}
+        for result in results.get("results", []):
+            mem_text = result.get("memory", "")
+            doc_id, doc_type = classify_memory(mem_text)
+            if doc_id and doc_type:
+                if doc_id not in doc_groups:
+                    doc_groups[doc_id] = {
+                        "type": doc_type,
+                        "id": doc_id,
+                        "memories": []
+                    }
+                doc_groups[doc_id]["memories"].append(mem_text)
+
+        docs_by_type = {doc_type: [] for doc_type in DOC_TYPES}
+        for group in doc_groups.values():
+            group["memory_count"] = len(group["memories"])
+            docs_by_type[group["type"]].append(group)
+        return cls(docs_by_type)
+
+    def count(self, types):
+        return sum(len(self.docs_by_type[t]) for t in types)
+
+    def page(self, types, offset, limit):
+        """Return (docs, next_offset) for the selected types; next_offset is None on the last page"""
+        docs = []
+        skip = offset
+        for doc_type in types:
+            group = self.docs_by_type[doc_type]
+            if skip >= len(group):
+                skip -= len(group)
+                continue
+            take = group[skip:] if limit is None else group[skip:skip + limit - len(docs)]
+            docs.extend(take)
+            skip = 0
+            if limit is not None and len(docs) >= limit:
+                break
+
+        next_offset = offset + len(docs)
+        if limit is None or next_offset >= self.count(types):
+            next_offset = None
+        return docs, next_offset
+
+
+def parse_doc_types(value):
+    if not value:
+        return DOC_TYPES
+    requested = set()
+    for name in value.split(","):
+        name = name.strip().lower()
+        if name not in DOC_TYPE_ALIASES:
+            raise ValueError(f"Unknown doc type: {name}")
+        requested.add(DOC_TYPE_ALIASES[name])
+    return tuple(t for t in DOC_TYPES if t in requested)
+
+
+def parse_doc_fields(value):
+    if not value:
+        return DEFAULT_DOC_FIELDS
+    fields = tuple(f.strip() for f in value.split(",") if f.strip())
+    unknown = [f for f in fields if f not in DOC_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return fields
+
+
+def parse_limit(value):
+    if value is None:
+        return None
+    limit = int(value)
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return limit
+
+
+def encode_cursor(version: str, offset: int) -> str:
+    return base64.urlsafe_b64encode(f"{version}:{offset}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return (index version, offset); (None, 0) when there is no cursor"""
+    if not cursor:
+        return None, 0
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        version, offset = raw.split(":", 1)
+        if not version or int(offset) < 0:
+            raise ValueError
+        return version, int(offset)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+class ViewerAPI(BaseHTTPRequestHandler):
     def do_GET(self):
         parsed = urlparse(self.path)
         path = parsed.path
 
-        # CORS headers
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-
         # Route API calls
         if path == '/api/projects':
-            self.serve_projects()
+            response = response_cache.get(("projects",), self.serve_projects)
         elif path.startswith('/api/docs/'):
             project = path.split('/')[-1]
-            self.serve_docs(project)
+            response, status = self.serve_docs(project, parse_qs(parsed.query))
+            self.send_json(response, status=status)
+            return
         elif path.startswith('/api/graph/'):
             project = path.split('/')[-1]
-            self.serve_graph(project)
+            response = response_cache.get(("graph", project), lambda: self.serve_graph(project))
         else:
-            self.wfile.write(json.dumps({"error": "Not found"}).encode())
+            self.send_json(CachedResponse({"error": "Not found"}), status=404)
+            return
+
+        self.send_json(response)
+
+    def send_json(self, response: CachedResponse, status: int = 200):
+        """Write a cached response, honouring If-None-Match and gzip"""
+        if status == 200 and self.headers.get('If-None-Match') == response.etag:
+            self.send_response(304)
+            self.send_header('ETag', response.etag)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        body = response.body
+        accepts_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+        use_gzip = accepts_gzip and len(body) >= GZIP_MIN_BYTES
+        if use_gzip:
+            body = response.gzipped
+
+        # CORS headers
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Expose-Headers', 'ETag')
+        self.send_header('ETag', response.etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
 
     def serve_projects(self):
         """List all projects in registry"""
-        # Scan ChromaDB to find all unique project user_ids
-        import sqlite3
-
-        storage_path = Path.home() / ".claude" / "mem0-chroma"
-        db_path = storage_path / "chroma.sqlite3"
+        # Every memory is stored with its project as the user_id, so the
+        # distinct user_id values in Chroma's metadata table are the projects
+        db_path = STORAGE_PATH / "chroma.sqlite3"
 
-        projects = []
+        projects = set()
 
         if db_path.exists():
             try:
-                # Query ChromaDB's metadata table for unique user_ids
-                # This is a hack but ChromaDB doesn't expose this API easily
-                # For now, use known projects
-                projects = ["dev-lifecycle-marketplace"]
-
-                # Try to detect from directory names in ~/Projects or current workspace
-                for proj_dir in [Path.home() / "Projects", Path.cwd().parent]:
-                    if proj_dir.exists():
-                        for subdir in proj_dir.iterdir():
-                            if subdir.is_dir() and (subdir / ".claude").exists():
-                                projects.append(subdir.name)
-
-                projects = list(set(projects))  # Remove duplicates
-            except Exception as e:
-                projects = ["dev-lifecycle-marketplace"]
-        else:
-            projects = ["dev-lifecycle-marketplace"]
-
-        self.wfile.write(json.dumps({"projects": projects}).encode())
-
-    def serve_docs(self, project):
-        """Get all docs for a project, grouped by document"""
-        memory = get_memory()
-        results = memory.get_all(user_id=project)
-
-        # Group memories by document
-        doc_groups = {}
-
-        for result in results.get("results", []):
-            mem_text = result.get("memory", "")
-
-            # Extract document identifier
-            doc_id = None
-            doc_type = None
-
-            # Check for Specification
-            spec_match = re.match(r'Specification (\d+)', mem_text)
-            if spec_match:
-                doc_id = f"spec-{spec_match.group(1)}"
-                doc_type = "specs"
-            # Check for spec references
-            elif "specification" in mem_text.lower():
-                ref_match = re.search(r'specification (\d+)', mem_text, re.IGNORECASE)
-                if ref_match:
-                    doc_id = f"spec-{ref_match.group(1)}"
-                    doc_type = "specs"
-
-            # Check for Architecture
-            if not doc_id and ("Architecture" in mem_text or "architecture" in mem_text.lower()):
-                # Extract filename
-                arch_match = re.search(r'([a-z-]+\.md)', mem_text)
-                if arch_match:
-                    doc_id = f"arch-{arch_match.group(1)}"
-                    doc_type = "architecture"
-                else:
-                    doc_id = "arch-general"
-                    doc_type = "architecture"
-
-            # Check for ADR
-            if not doc_id and "ADR" in mem_text:
-                adr_match = re.search(r'ADR-?(\d+|[a-z-]+)', mem_text, re.IGNORECASE)
-                if adr_match:
-                    doc_id = f"adr-{adr_match.group(1)}"
-                    doc_type = "adrs"
-
-            # Check for Roadmap
-            if not doc_id and ("Phase" in mem_text or "roadmap" in mem_text.lower()):
-                doc_id = "roadmap"
-                doc_type = "roadmap"
-
-            # Group memories
-            if doc_id and doc_type:
-                if doc_id not in doc_groups:
-                    doc_groups[doc_id] = {
-                        "type": doc_type,
-                        "id": doc_id,
-                        "memories": []
-                    }
-                doc_groups[doc_id]["memories"].append(mem_text)
-
-        # Format for frontend
-        docs = {
-            "specs": [],
-            "architecture": [],
-            "adrs": [],
-            "roadmap": []
-        }
-
-        for doc_id, group in doc_groups.items():
-            doc_type = group["type"]
-            docs[doc_type].append({
-                "id": doc_id,
-                "memories": group["memories"]
-            })
-
-        self.wfile.write(json.dumps(docs).encode())
+                conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+                try:
+                    rows = conn.execute(
+                        "SELECT DISTINCT string_value FROM embedding_metadata "
+                        "WHERE key = 'user_id' AND string_value IS NOT NULL"
+                    ).fetchall()
+                finally:
+                    conn.close()
+                projects.update(row[0] for row in rows)
+            except sqlite3.Error:
+                pass
+
+        if not projects:
+            projects.add(DEFAULT_PROJECT)
+
+        return CachedResponse({"projects": sorted(projects)})
+
+    def serve_docs(self, project, query):
+        """Get docs for a project, grouped by document type
+
+        Query parameters (all optional, no parameters returns everything):
+          type    comma-separated doc types: spec, architecture, adr, roadmap
+          fields  comma-separated doc fields: id, memories, memory_count
+          limit   max docs per page; enables cursor pagination
+          cursor  next_cursor value from the previous page
+
+        A cursor from before the docs changed gets a 409; the client
+        restarts from the first page. Each distinct page is encoded once
+        per index version and served from the response cache.
+        """
+        try:
+            types = parse_doc_types(query.get('type', [None])[0])
+            fields = parse_doc_fields(query.get('fields', [None])[0])
+            limit = parse_limit(query.get('limit', [None])[0])
+            cursor_version, offset = decode_cursor(query.get('cursor', [None])[0])
+        except ValueError as e:
+            return CachedResponse({"error": str(e)}), 400
+
+        index = response_cache.get(("doc-index", project), lambda: DocIndex.build(project))
+        if cursor_version is not None and cursor_version != index.version:
+            return CachedResponse({
+                "error": "Stale cursor: the docs changed since it was issued, restart from the first page"
+            }), 409
+
+        def build():
+            # Format for frontend
+            docs = {doc_type: [] for doc_type in DOC_TYPES}
+            page, next_offset = index.page(types, offset, limit)
+            for doc in page:
+                docs[doc["type"]].append({field: doc[field] for field in fields})
+
+            if limit is not None or offset:
+                docs["next_cursor"] = encode_cursor(index.version, next_offset) if next_offset is not None else None
+                docs["total"] = index.count(types)
+
+            return CachedResponse(docs)
+
+        key = ("docs", project, index.version, types, fields, offset, limit)
+        return response_cache.get(key, build), 200
 
     def serve_graph(self, project):
         """Generate graph data for visualization"""
@@ -243,21 +474,44 @@ class ViewerAPI(BaseHTTPRequestHandler):
             "edges": edges
         }
 
-        self.wfile.write(json.dumps(graph_data).encode())
+        return CachedResponse(graph_data)
 
     def log_message(self, format, *args):
         pass  # Suppress logs
 
 
+class KeepAliveViewerAPI(ViewerAPI):
+    """ViewerAPI over HTTP/1.1 keep-alive connections
+
+    An idle keep-alive connection occupies its handler until it times out,
+    so this is only used when each connection gets its own thread.
+    """
+    protocol_version = "HTTP/1.1"
+
+
 def main():
-    port = 8766
+    parser = argparse.ArgumentParser(description="Documentation Viewer API Server")
+    parser.add_argument("--port", type=int, default=8766, help="Port to listen on (default: 8766)")
+    parser.add_argument("--cache-ttl", type=float, default=60,
+                        help="Seconds to cache per-project responses (default: 60, 0 disables)")
+    parser.add_argument("--single-threaded", action="store_true",
+                        help="Serve one request at a time instead of a thread per request")
+    args = parser.parse_args()
+
+    port = args.port
+    response_cache.ttl = args.cache_ttl
+
     print(f"🌐 Documentation Viewer API")
     print(f"📡 Server running on http://localhost:{port}")
     print(f"🔗 Open viewer: file://{Path.home()}/.claude/doc-viewer.html")
     print(f"⏹️  Press Ctrl+C to stop")
     print()
 
-    server = HTTPServer(('localhost', port), ViewerAPI)
+    if args.single_threaded:
+        server = HTTPServer(('localhost', port), ViewerAPI)
+    else:
+        server = ThreadingHTTPServer(('localhost', port), KeepAliveViewerAPI)
+    server.daemon_threads = True
     try:
         server.serve_forever()
     except KeyboardInterrupt:
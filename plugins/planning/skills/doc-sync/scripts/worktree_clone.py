@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Tree cloning for worktree setup
+
+Populates a directory in a new worktree from an identical one elsewhere
+(an installed node_modules, a build cache) while copying as few bytes as
+possible. Each file is tried in turn as:
+
+1. a reflink (FICLONE): a copy-on-write clone sharing the same disk
+   blocks, on filesystems that support it (Btrfs, XFS, bcachefs)
+2. a hardlink, but only where the caller allows it: write-once cache
+   entries or trees that are never modified in place
+3. a plain byte copy
+
+Symlinks are recreated as-is. Once a reflink fails, the rest of the tree
+skips straight to the next strategy. Reflinked and copied files are private
+to dest and always left writable by their owner, even when cloned from a
+read-only tree.
+
+Usage:
+    from worktree_clone import clone_tree
+    stats = clone_tree(main / ".next", worktree / ".next", link_prefixes=("cache/webpack/",))
+    stats = clone_tree(store, worktree / "node_modules", link_prefixes=("",),
+                       copy_prefixes=(".package-lock.json",))
+"""
+
+import errno
+import fcntl
+import os
+import shutil
+import stat
+from pathlib import Path
+
+# ioctl request number of FICLONE (linux/fs.h)
+FICLONE = 0x40049409
+
+
+def reflink(src: str, dst: str) -> bool:
+    """Clone src to dst with FICLONE; False (and no dst) when unsupported"""
+    try:
+        with open(src, "rb") as source, open(dst, "wb") as dest:
+            fcntl.ioctl(dest.fileno(), FICLONE, source.fileno())
+    except OSError as e:
+        if e.errno not in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.ENOSYS):
+            raise
+        try:
+            os.unlink(dst)
+        except FileNotFoundError:
+            pass
+        return False
+    shutil.copystat(src, dst)
+    return True
+
+
+def new_stats() -> dict:
+    return {"reflinked": 0, "linked": 0, "copied": 0, "bytes_saved": 0, "bytes_copied": 0}
+
+
+def make_writable(path: str | Path):
+    mode = os.stat(path).st_mode
+    if not mode & stat.S_IWUSR:
+        os.chmod(path, mode | stat.S_IWUSR)
+
+
+def clone_file(src: str, dst: str | Path, stats: dict, hardlink: bool = False, state: dict | None = None):
+    """Clone one file by reflink, then hardlink (if allowed), then copy
+
+    state carries whether reflinks still look supported between calls.
+    """
+    state = state if state is not None else {"reflink": True}
+    size = os.path.getsize(src)
+
+    if state["reflink"]:
+        if reflink(src, dst):
+            make_writable(dst)
+            stats["reflinked"] += 1
+            stats["bytes_saved"] += size
+            return
+        state["reflink"] = False
+
+    if hardlink:
+        try:
+            os.link(src, dst)
+            stats["linked"] += 1
+            stats["bytes_saved"] += size
+            return
+        except OSError:
+            pass
+
+    shutil.copy2(src, dst)
+    make_writable(dst)
+    stats["copied"] += 1
+    stats["bytes_copied"] += size
+
+
+def clone_tree(source: str | Path, dest: str | Path, exclude: set[str] | frozenset = frozenset(),
+               link_prefixes: tuple[str, ...] = (), copy_prefixes: tuple[str, ...] = (),
+               use_reflink: bool = True) -> dict:
+    """Recreate source at dest, sharing file contents wherever possible
+
+    exclude names top-level entries of source to leave out. Files whose
+    path relative to source starts with one of link_prefixes may be
+    hardlinked ("" allows every file), unless it also starts with one of
+    copy_prefixes. Returns counts per strategy and the bytes saved and
+    copied.
+    """
+    source, dest = Path(source), Path(dest)
+    stats = new_stats()
+    state = {"reflink": use_reflink}
+
+    for root, dirs, files in os.walk(source):
+        relative = Path(root).relative_to(source)
+        if relative == Path("."):
+            dirs[:] = [d for d in dirs if d not in exclude]
+            files = [f for f in files if f not in exclude]
+        target_dir = dest / relative
+        target_dir.mkdir(parents=True, exist_ok=True)
+
+        # os.walk lists symlinked directories without following them
+        for name in list(dirs):
+            if os.path.islink(os.path.join(root, name)):
+                dirs.remove(name)
+                files.append(name)
+
+        prefix = "" if relative == Path(".") else f"{relative.as_posix()}/"
+        for name in files:
+            src = os.path.join(root, name)
+            dst = target_dir / name
+            if os.path.islink(src):
+                os.symlink(os.readlink(src), dst)
+                continue
+            relative_path = f"{prefix}{name}"
+            hardlink = any(relative_path.startswith(p) for p in link_prefixes) \
+                and not any(relative_path.startswith(p) for p in copy_prefixes)
+            clone_file(src, dst, stats, hardlink=hardlink, state=state)
+
+    return stats
+
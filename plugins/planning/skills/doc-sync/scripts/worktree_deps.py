@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Shared dependency setup for worktrees
+
+By default ("install" mode) every worktree runs a full npm/pnpm/yarn/pip
+install. In "shared" mode, worktrees are keyed by their lockfiles and the
+work is done once per key:
+
+- npm/yarn: the first install for a key is cloned into a store under the
+  git common dir that no worktree owns. Later worktrees clone their
+  node_modules from it (see worktree_clone.py): reflinks where the
+  filesystem supports them, otherwise hardlinks to the store's files,
+  which are read-only so an in-place write fails instead of changing
+  every worktree. Metadata that package managers rewrite (hidden
+  lockfiles, integrity files, generated clients) is always copied. The
+  main checkout seeds the store only when its installed tree matches its
+  lockfile.
+- pnpm: installs go through pnpm's content-addressed store with
+  --prefer-offline, so packages are linked instead of downloaded
+- pip: a requirements set already installed into the same environment is
+  skipped; pyproject.toml projects only re-run the editable install
+
+Seeds are recorded in <git common dir>/worktree-deps.json, and a lock file
+per key makes concurrent setups of the same key wait for the first install
+instead of racing it. Tools that patch node_modules in place (patch-package)
+need "install" mode wherever reflinks are unavailable.
+
+Usage:
+    from worktree_deps import DependencyInstaller
+    installer = DependencyInstaller(project_root, mode="shared")
+    setup = installer.setup(worktree)
+    print(setup["manager"], setup["strategy"], setup["ok"])
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import stat
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+from worktree_clone import clone_tree
+
+DEPS_MODES = ("install", "shared")
+
+# Files whose contents decide the installed tree, per package manager
+LOCKFILES = {
+    "pnpm": ("package.json", "pnpm-lock.yaml"),
+    "yarn": ("package.json", "yarn.lock"),
+    "npm": ("package.json", "package-lock.json", "npm-shrinkwrap.json"),
+    "pip": ("requirements.txt",),
+    "pip-editable": ("pyproject.toml",),
+}
+
+# Mutable per-checkout state left out when sharing node_modules
+UNSHARED = frozenset({".cache"})
+
+# Files under node_modules that installs and codegen rewrite; never hardlinked
+MUTABLE_METADATA = (
+    ".package-lock.json",
+    ".yarn-integrity",
+    ".yarn-state.yml",
+    ".modules.yaml",
+    ".prisma/",
+)
+
+
+def detect_manager(worktree: Path) -> str | None:
+    """Package manager for a checkout, in the order setup_dependencies checks them"""
+    if (worktree / "package.json").exists():
+        if (worktree / "pnpm-lock.yaml").exists():
+            return "pnpm"
+        if (worktree / "yarn.lock").exists():
+            return "yarn"
+        return "npm"
+    if (worktree / "requirements.txt").exists():
+        return "pip"
+    if (worktree / "pyproject.toml").exists():
+        return "pip-editable"
+    return None
+
+
+def install_command(manager: str, shared: bool = False) -> list[str]:
+    if manager == "pnpm":
+        return ["pnpm", "install", "--prefer-offline"] if shared else ["pnpm", "install"]
+    if manager == "yarn":
+        return ["yarn", "install"]
+    if manager == "npm":
+        return ["npm", "install"]
+    if manager == "pip":
+        return ["pip", "install", "-r", "requirements.txt"]
+    return ["pip", "install", "-e", "."]
+
+
+def installed_matches_lockfile(checkout: Path, manager: str) -> bool:
+    """Whether checkout's node_modules was installed from its current lockfile
+
+    npm: every package in package-lock.json (optional ones may be missing)
+    is in npm's hidden lockfile at the same version, and nothing else is.
+    yarn: the integrity/state file yarn writes after an install is newer
+    than package.json and yarn.lock.
+    """
+    node_modules = checkout / "node_modules"
+    if manager == "npm":
+        lockfile = next((checkout / name for name in ("npm-shrinkwrap.json", "package-lock.json")
+                         if (checkout / name).exists()), None)
+        try:
+            with open(lockfile) as f:
+                locked = json.load(f).get("packages")
+            with open(node_modules / ".package-lock.json") as f:
+                installed = json.load(f).get("packages")
+        except (TypeError, OSError, json.JSONDecodeError):
+            return False
+        if not locked or installed is None:
+            return False
+        locked.pop("", None)
+        return all(
+            installed[path].get("version") == entry.get("version") if path in installed else entry.get("optional")
+            for path, entry in locked.items()
+        ) and all(path in locked for path in installed)
+
+    if manager == "yarn":
+        stamps = [node_modules / ".yarn-integrity", node_modules / ".yarn-state.yml"]
+        stamp = next((path for path in stamps if path.exists()), None)
+        if stamp is None:
+            return False
+        installed_at = stamp.stat().st_mtime
+        return all(
+            not (checkout / name).exists() or (checkout / name).stat().st_mtime <= installed_at
+            for name in LOCKFILES["yarn"]
+        )
+
+    return False
+
+
+def freeze_tree(root: Path):
+    """Drop write permission from every file under root"""
+    for directory, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(directory, name)
+            if os.path.islink(path):
+                continue
+            mode = os.stat(path).st_mode
+            os.chmod(path, mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+
+
+def dependency_key(worktree: Path, manager: str) -> str:
+    """Hash of the manager and its lockfiles; equal keys mean identical installs"""
+    digest = hashlib.sha256(manager.encode())
+    for name in LOCKFILES[manager]:
+        path = worktree / name
+        digest.update(f"\0{name}\0".encode())
+        if path.exists():
+            digest.update(path.read_bytes())
+    if manager.startswith("pip"):
+        # Python installs land in whichever environment pip belongs to
+        digest.update((shutil.which("pip") or "pip").encode())
+    return digest.hexdigest()
+
+
+class DependencyInstaller:
+    """Installs worktree dependencies once per distinct set of lockfiles"""
+
+    def __init__(self, project_root: str | Path, mode: str = "install"):
+        self.project_root = Path(project_root).resolve()
+        self.mode = mode
+        self.state_dir = self._git_common_dir()
+        self.state_path = self.state_dir / "worktree-deps.json"
+
+    def _git_common_dir(self) -> Path:
+        try:
+            output = subprocess.check_output(
+                ["git", "rev-parse", "--git-common-dir"], cwd=self.project_root, text=True
+            ).strip()
+            return (self.project_root / output).resolve()
+        except (subprocess.CalledProcessError, OSError):
+            return self.project_root / ".git"
+
+    def _locked(self, key: str):
+        """Exclusive lock for one dependency key, across threads and processes"""
+        lock_dir = self.state_dir / "worktree-deps"
+        lock_dir.mkdir(parents=True, exist_ok=True)
+        lock = open(lock_dir / f"{key[:16]}.lock", "w")
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        return lock
+
+    def _load_seeds(self) -> dict:
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _record_seed(self, key: str, worktree: Path, manager: str):
+        with self._locked("state"):
+            seeds = self._load_seeds()
+            seeds[key] = {"path": str(worktree), "manager": manager, "installed": datetime.now().isoformat()}
+            tmp_path = self.state_path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(seeds, f, indent=2)
+            os.replace(tmp_path, self.state_path)
+
+    def _seed_for(self, key: str) -> Path | None:
+        """Checkout whose pip install matched key; pip installs into the environment"""
+        seed = self._load_seeds().get(key)
+        return Path(seed["path"]) if seed else None
+
+    def _store_dir(self, key: str) -> Path:
+        return self.state_dir / "worktree-deps" / "store" / key[:16]
+
+    def _store_for(self, key: str) -> Path | None:
+        """The completed node_modules store for key, if any"""
+        store = self._store_dir(key)
+        try:
+            if (store / ".complete").read_text() == key:
+                return store
+        except OSError:
+            pass
+        return None
+
+    def _build_store(self, key: str, source: Path, manager: str) -> Path:
+        """Clone source's node_modules into the store for key and freeze it
+
+        The store is never hardlinked to source, which its checkout keeps
+        modifying; files are reflinked or copied.
+        """
+        store = self._store_dir(key)
+        tmp_store = store.with_name(f"{store.name}.tmp")
+        shutil.rmtree(tmp_store, ignore_errors=True)
+        clone_tree(source / "node_modules", tmp_store / "node_modules", exclude=UNSHARED)
+        freeze_tree(tmp_store / "node_modules")
+        (tmp_store / ".complete").write_text(key)
+        shutil.rmtree(store, ignore_errors=True)
+        os.replace(tmp_store, store)
+        self._record_seed(key, store, manager)
+        return store
+
+    def _clone_store(self, store: Path, worktree: Path) -> dict:
+        return clone_tree(store / "node_modules", worktree / "node_modules",
+                          link_prefixes=("",), copy_prefixes=MUTABLE_METADATA)
+
+    def _install(self, worktree: Path, manager: str, shared: bool = False) -> subprocess.CompletedProcess:
+        return subprocess.run(install_command(manager, shared), cwd=worktree, capture_output=True)
+
+    def setup(self, worktree: str | Path) -> dict:
+        """Install or share dependencies for one worktree
+
+        Returns {"ok", "manager", "strategy", "seed", "error", ...} with
+        strategy one of "none", "installed", "store", "cloned" or "cached".
+        """
+        worktree = Path(worktree).resolve()
+        manager = detect_manager(worktree)
+        setup = {"ok": True, "manager": manager, "strategy": "none", "seed": None, "error": None}
+        if manager is None:
+            return setup
+
+        if self.mode != "shared":
+            result = self._install(worktree, manager)
+            setup.update(ok=result.returncode == 0, strategy="installed")
+            setup["error"] = None if setup["ok"] else result.stderr.decode()
+            return setup
+
+        key = dependency_key(worktree, manager)
+        with self._locked(key):
+            if manager in ("npm", "yarn"):
+                store = self._store_for(key)
+                if store is None and self.project_root != worktree \
+                        and dependency_key(self.project_root, manager) == key \
+                        and installed_matches_lockfile(self.project_root, manager):
+                    try:
+                        store = self._build_store(key, self.project_root, manager)
+                    except OSError as e:
+                        setup["error"] = f"Storing {self.project_root / 'node_modules'} failed: {e}"
+
+                if store and not (worktree / "node_modules").exists():
+                    try:
+                        stats = self._clone_store(store, worktree)
+                        setup.update(strategy="cloned", seed=str(store), error=None, **stats)
+                        return setup
+                    except OSError as e:
+                        # Fall through to a normal install over whatever was cloned
+                        setup["error"] = f"Cloning from {store} failed: {e}"
+
+                result = self._install(worktree, manager, shared=True)
+                setup.update(ok=result.returncode == 0, strategy="installed")
+                if not setup["ok"]:
+                    setup["error"] = result.stderr.decode()
+                    return setup
+                setup["error"] = None
+                if store is None:
+                    try:
+                        self._build_store(key, worktree, manager)
+                    except OSError:
+                        pass  # Later worktrees install on their own
+                return setup
+
+            seed = self._seed_for(key) if manager.startswith("pip") else None
+            if seed and manager == "pip":
+                setup.update(strategy="cached", seed=str(seed))
+                return setup
+
+            if seed and manager == "pip-editable":
+                # Dependencies are in place; only this checkout's own package is missing
+                result = subprocess.run(["pip", "install", "-e", ".", "--no-deps"], cwd=worktree, capture_output=True)
+                setup.update(ok=result.returncode == 0, strategy="cached", seed=str(seed))
+                setup["error"] = None if setup["ok"] else result.stderr.decode()
+                return setup
+
+            result = self._install(worktree, manager, shared=True)
+            setup.update(ok=result.returncode == 0, strategy="store" if manager == "pnpm" else "installed")
+            if setup["ok"]:
+                setup["error"] = None
+                self._record_seed(key, worktree, manager)
+            else:
+                setup["error"] = result.stderr.decode()
+            return setup
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+"""
+command_matcher.py
+BM25 ranking of a tech stack's commands against feature specs.
+
+Commands are indexed once into an inverted index over their name, plugin
+and description, with the name and plugin counted twice so "add-auth"
+outranks a command that only mentions auth in passing. A feature is
+scored term-at-a-time: only the postings of the terms it contains are
+touched, so ranking costs the same however many commands never match.
+
+Used by:
+  plugins/planning/skills/feature-workflow-generation/scripts/generate-feature-workflow.py
+"""
+
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+
+# BM25 document and query term saturation, and length normalization
+K1 = 1.2
+K3 = 8.0
+B = 0.75
+
+# Times a command's name and plugin tokens count against its description's
+NAME_WEIGHT = 2
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be by can for from has have in into is it its of on or
+that the this to with will should must when where which who how what all
+any each new use used using via not no so than then them they their there
+these those you your we our us
+""".split())
+
+
+def tokenize(text):
+    """Lowercased word tokens without stopwords, with plural 's' stripped"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if len(token) < 2 or token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class CommandMatcher:
+    """Inverted BM25 index over command names and descriptions"""
+
+    def __init__(self, commands):
+        """commands are dicts with name, description, plugin and phase, as in available_commands"""
+        self.commands = list(commands)
+        self.postings = defaultdict(list)
+
+        lengths = []
+        for doc, command in enumerate(self.commands):
+            terms = Counter(tokenize(command.get("description") or ""))
+            for _ in range(NAME_WEIGHT):
+                terms.update(tokenize(f"{command.get('name') or ''} {command.get('plugin') or ''}"))
+            for term, count in terms.items():
+                self.postings[term].append((doc, count))
+            lengths.append(sum(terms.values()))
+
+        average = (sum(lengths) / len(lengths)) if lengths else 0
+        norms = [K1 * (1 - B + B * length / average) if average else K1 for length in lengths]
+
+        # Fold idf and length normalization into each posting up front
+        total = len(self.commands)
+        for term, postings in self.postings.items():
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            self.postings[term] = [
+                (doc, idf * count * (K1 + 1) / (count + norms[doc])) for doc, count in postings
+            ]
+
+    def rank(self, query_terms, k=8):
+        """Top k commands for a Counter of query terms, best first
+
+        Each result is the command dict plus its score and the query terms
+        it matched. Commands sharing no term with the query are left out.
+        """
+        scores = defaultdict(float)
+        matched = defaultdict(list)
+        for term, count in query_terms.items():
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            weight = count * (K3 + 1) / (count + K3)
+            for doc, score in postings:
+                scores[doc] += weight * score
+                matched[doc].append(term)
+
+        best = heapq.nsmallest(
+            k, scores.items(),
+            key=lambda item: (-item[1], self.commands[item[0]].get("plugin") or "", self.commands[item[0]].get("name") or ""),
+        )
+        return [
+            dict(self.commands[doc], score=round(score, 3), matched_terms=sorted(matched[doc]))
+            for doc, score in best
+        ]
@@ -3,13 +3,35 @@
 """
 generate-feature-workflow.py
 Queries Airtable for tech stack commands and matches them to features from features.json
-Usage: python3 generate-feature-workflow.py
+Usage: python3 generate-feature-workflow.py [--spec full|digest|sections|hash] [--section NAME]
+                                            [--feature ID] [--priority P0] [--status STATUS] [--jsonl]
+                                            [--top-k N] [--all-commands]
+
+Specs are summarized by default: each feature carries a digest of its
+spec.md (hash, size, title, heading outline, first paragraph) read in one
+streaming pass. Full bodies are only read with --spec full, ideally
+together with --feature. --jsonl writes one record per line, plugins
+first and then each feature as soon as its spec has been read.
+
+Each feature also gets matched_commands: the --top-k commands ranked by
+BM25 against its name, description and spec text (see command_matcher.py).
+The full command list is then left out unless --all-commands is given;
+--top-k 0 turns matching off and always ships the full list.
 """
 
+import argparse
+import hashlib
 import os
 import sys
 import json
-import requests
+from pathlib import Path
+
+# Shared Airtable client lives with the foundation workflow-generation skill
+sys.path.insert(0, str(Path(__file__).resolve().parents[4] / "foundation" / "skills" / "workflow-generation" / "scripts"))
+from airtable_client import AirtableClient
+from collections import Counter
+
+from command_matcher import CommandMatcher, tokenize
 
 # Configuration
 AIRTABLE_TOKEN = os.getenv("AIRTABLE_TOKEN") or os.getenv("MCP_AIRTABLE_TOKEN")
@@ -21,6 +43,17 @@ TECH_STACKS_TABLE = "tblG07GusbRMJ9h1I"
 PLUGINS_TABLE = "tblVEI2x2xArVx9ID"
 COMMANDS_TABLE = "tblWKaSceuRJrBFC1"
 
+SPEC_MODES = ("full", "digest", "sections", "hash")
+
+# Longest first-paragraph summary kept in a spec digest
+SUMMARY_CHARS = 280
+
+# Ranked commands attached to each feature by default
+TOP_K = 8
+
+# One pooled, rate-limited session for every request this script makes
+client = AirtableClient(AIRTABLE_TOKEN, BASE_ID)
+
 def get_tech_stack_from_project_json():
     """Read tech stack name from .claude/project.json"""
     project_json_path = ".claude/project.json"
@@ -45,62 +78,154 @@ def get_features_from_features_json():
 
     return features_data.get("features", [])
 
-def read_spec_files(features):
-    """Read spec.md files for each feature"""
+def filter_features(features, feature_ids=None, priority=None, status=None):
+    """Keep only the features matching every given filter"""
+    return [
+        feature for feature in features
+        if (not feature_ids or feature.get("id") in feature_ids)
+        and (not priority or feature.get("priority") == priority)
+        and (not status or feature.get("status") == status)
+    ]
+
+def read_spec(spec_path, mode="digest", sections=None, query=None):
+    """Read one spec.md in a single streaming pass
+
+    Returns (spec, content): spec always holds the path, sha256 and size,
+    plus the title, heading outline and summary (the first paragraph after
+    the title, ignoring YAML frontmatter) for "digest" or the bodies
+    of the wanted sections (all of them when none are named) for
+    "sections". content is the full text for "full" and None otherwise,
+    so other modes never hold the whole file in memory. When query is a
+    Counter, the spec's terms are added to it along the way.
+    """
+    wanted = {name.strip().lower() for name in sections or ()}
+    digest = hashlib.sha256()
+    size = 0
+    title = summary = early_summary = None
+    outline, bodies, lines, paragraph = [], {}, [], []
+    current, current_level = None, 0
+    in_fence = in_frontmatter = False
+
+    def end_paragraph():
+        nonlocal summary, early_summary
+        if paragraph and summary is None:
+            text = " ".join(paragraph)[:SUMMARY_CHARS]
+            if title is not None:
+                summary = text
+            elif early_summary is None:
+                # Only used when the spec never gets a title
+                early_summary = text
+        paragraph.clear()
+
+    with open(spec_path, 'rb') as f:
+        for line_number, raw in enumerate(f):
+            digest.update(raw)
+            size += len(raw)
+            line = raw.decode('utf-8', errors='replace')
+            if query is not None:
+                query.update(tokenize(line))
+            if mode == "full":
+                lines.append(line)
+                continue
+            if mode == "hash":
+                continue
+
+            stripped = line.strip()
+            if line_number == 0 and stripped == "---":
+                in_frontmatter = True
+                continue
+            if in_frontmatter:
+                in_frontmatter = stripped != "---"
+                continue
+
+            if stripped.startswith("```"):
+                in_fence = not in_fence
+                end_paragraph()
+
+            level = len(stripped) - len(stripped.lstrip('#'))
+            is_heading = not in_fence and 0 < level <= 6 and stripped[level:level + 1] == ' '
+            if is_heading:
+                end_paragraph()
+                heading = stripped[level:].strip().rstrip('#').strip()
+                if title is None and level == 1:
+                    title = heading
+                outline.append(heading)
+                if current is not None and level <= current_level:
+                    current = None
+                if mode == "sections" and current is None and (not wanted or heading.lower() in wanted):
+                    current, current_level = heading, level
+                    bodies.setdefault(current, [])
+                    continue
+            elif not stripped:
+                end_paragraph()
+            elif mode == "digest" and summary is None and not in_fence and not stripped.startswith("```"):
+                paragraph.append(stripped)
+
+            if current is not None:
+                bodies[current].append(line)
+
+    end_paragraph()
+    spec = {"path": spec_path, "sha256": digest.hexdigest(), "bytes": size}
+    if mode == "digest":
+        spec.update({"title": title, "outline": outline, "summary": summary or early_summary or ""})
+    elif mode == "sections":
+        spec["sections"] = {heading: "".join(body).strip() for heading, body in bodies.items()}
+
+    return spec, "".join(lines) if mode == "full" else None
+
+def iter_feature_specs(features, mode="digest", sections=None, matcher=None, top_k=TOP_K):
+    """Yield each feature with its spec attached, reading one spec at a time
+
+    With a matcher, the feature's name, description and spec text are
+    ranked against the commands as the spec streams past.
+    """
     for feature in features:
-        feature_id = feature.get("id")
-        spec_path = f"specs/{feature_id}/spec.md"
+        feature = dict(feature)
+        spec_path = f"specs/{feature.get('id')}/spec.md"
+        query = None
+        if matcher:
+            query = Counter(tokenize(" ".join(
+                str(feature.get(field) or "") for field in ("name", "title", "description")
+            )))
 
         if os.path.exists(spec_path):
-            with open(spec_path, 'r') as f:
-                feature["spec_content"] = f.read()
+            feature["spec"], content = read_spec(spec_path, mode, sections, query)
         else:
-            feature["spec_content"] = ""
-
-    return features
+            feature["spec"], content = None, ""
+
+        if mode == "full":
+            feature["spec_content"] = content
+        if matcher:
+            feature["matched_commands"] = matcher.rank(query, top_k)
+        yield feature
+
+def plugin_summary(plugin, with_commands=True):
+    """A plugin record for output, listing its commands or only counting them"""
+    summary = {key: value for key, value in plugin.items() if key not in ("command_ids", "commands")}
+    if with_commands:
+        summary["commands"] = plugin["commands"]
+    else:
+        summary["command_count"] = len(plugin["commands"])
+    return summary
 
 def get_tech_stack(stack_name):
     """Query tech stack by name"""
-    url = f"https://api.airtable.com/v0/{BASE_ID}/{TECH_STACKS_TABLE}"
-    headers = {"Authorization": f"Bearer {AIRTABLE_TOKEN}"}
     params = {"filterByFormula": f'{{Stack Name}}="{stack_name}"'}
 
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
-
-    data = response.json()
+    data = client.get(TECH_STACKS_TABLE, params=params)
     if not data.get("records"):
         return None
 
     return data["records"][0]
 
-def get_plugin(plugin_id):
-    """Get plugin details by ID"""
-    url = f"https://api.airtable.com/v0/{BASE_ID}/{PLUGINS_TABLE}/{plugin_id}"
-    headers = {"Authorization": f"Bearer {AIRTABLE_TOKEN}"}
-
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-
-    return response.json()
-
-def get_commands_batch(command_ids):
-    """Get multiple command details in batch using filterByFormula"""
-    if not command_ids:
-        return []
+def get_plugins(plugin_ids):
+    """Get plugin details for several IDs in batched requests, in input order"""
+    plugins = client.get_records_by_id(PLUGINS_TABLE, plugin_ids)
+    return [plugins[plugin_id] for plugin_id in plugin_ids if plugin_id in plugins]
 
-    # Build OR formula for batch query
-    id_conditions = [f'RECORD_ID()="{cmd_id}"' for cmd_id in command_ids[:100]]  # Airtable limit
-    formula = f'OR({",".join(id_conditions)})'
-
-    url = f"https://api.airtable.com/v0/{BASE_ID}/{COMMANDS_TABLE}"
-    headers = {"Authorization": f"Bearer {AIRTABLE_TOKEN}"}
-    params = {"filterByFormula": formula}
-
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
-
-    return response.json().get("records", [])
+def get_commands(command_ids):
+    """Get command details by ID, following pagination; shared IDs are fetched once"""
+    return client.get_records_by_id(COMMANDS_TABLE, command_ids, fields=["Command Name", "Description"])
 
 def extract_plugin_ids(tech_stack_record):
     """Extract all plugin IDs from tech stack record"""
@@ -143,8 +268,7 @@ def get_tech_stack_commands(stack_name):
     # Query plugins table to get plugin details
     plugins_data = []
 
-    for plugin_id in plugin_ids:
-        plugin = get_plugin(plugin_id)
+    for plugin in get_plugins(plugin_ids):
         plugin_name = plugin.get("fields", {}).get("Name")
         plugin_phase = plugin.get("fields", {}).get("Lifecycle Phase", "Other")
         command_ids = plugin.get("fields", {}).get("Commands", [])
@@ -157,18 +281,12 @@ def get_tech_stack_commands(stack_name):
         }
         plugins_data.append(plugin_entry)
 
-    # Get ALL command details using batch queries
+    # Get ALL command details using concurrent batch queries
     all_command_ids = []
     for plugin_data in plugins_data:
         all_command_ids.extend(plugin_data["command_ids"])
 
-    # Fetch in batches of 100 (Airtable limit)
-    all_commands = {}
-    for i in range(0, len(all_command_ids), 100):
-        batch_ids = all_command_ids[i:i+100]
-        batch_commands = get_commands_batch(batch_ids)
-        for cmd in batch_commands:
-            all_commands[cmd["id"]] = cmd
+    all_commands = get_commands(all_command_ids)
 
     # Map commands back to plugins
     for plugin_data in plugins_data:
@@ -187,8 +305,12 @@ def get_tech_stack_commands(stack_name):
         "all_commands": [cmd for plugin in plugins_data for cmd in plugin["commands"]]
     }
 
-def generate_feature_workflow_data():
-    """Generate feature workflow data combining features.json + Airtable commands"""
+def load_feature_workflow_data(feature_ids=None, priority=None, status=None):
+    """Load features.json and the tech stack's commands; specs are left for streaming
+
+    Returns (data, features), where data holds the tech stack and plugins,
+    or an error dict.
+    """
 
     # Read tech stack from project.json
     tech_stack_name = get_tech_stack_from_project_json()
@@ -197,7 +319,7 @@ def generate_feature_workflow_data():
         return {
             "error": "Tech stack not found in .claude/project.json",
             "message": "Run /foundation:detect first to populate project.json"
-        }
+        }, []
 
     # Read features from features.json
     features = get_features_from_features_json()
@@ -206,27 +328,99 @@ def generate_feature_workflow_data():
         return {
             "error": "No features found in features.json",
             "message": "Run /planning:add-feature first to create features"
-        }
+        }, []
 
-    # Read spec files
-    features = read_spec_files(features)
+    features = filter_features(features, feature_ids, priority, status)
+
+    if not features:
+        return {
+            "error": "No features match the given filters",
+            "message": "Check --feature, --priority and --status against features.json"
+        }, []
 
     # Get available commands from Airtable
     commands_data = get_tech_stack_commands(tech_stack_name)
 
     if "error" in commands_data:
-        return commands_data
+        return commands_data, []
 
-    # Return combined data
     return {
         "tech_stack": tech_stack_name,
-        "features": features,
         "available_commands": commands_data["all_commands"],
         "plugins": commands_data["plugins"]
+    }, features
+
+def generate_feature_workflow_data(spec_mode="digest", sections=None, top_k=TOP_K, all_commands=False, **filters):
+    """Generate feature workflow data combining features.json + Airtable commands"""
+    data, features = load_feature_workflow_data(**filters)
+
+    if "error" in data:
+        return data
+
+    matcher = CommandMatcher(data["available_commands"]) if top_k else None
+    with_commands = all_commands or not matcher
+
+    result = {
+        "tech_stack": data["tech_stack"],
+        "features": list(iter_feature_specs(features, spec_mode, sections, matcher, top_k)),
     }
+    if with_commands:
+        result["available_commands"] = data["available_commands"]
+    result["plugins"] = [plugin_summary(plugin, with_commands) for plugin in data["plugins"]]
+    return result
+
+def stream_feature_workflow_data(out, spec_mode="digest", sections=None, top_k=TOP_K, all_commands=False, **filters):
+    """Write JSON lines: one per plugin, then one per feature as its spec is read
+
+    Plugin records carry their commands only when the full list is shipped,
+    so the flat command list is never repeated. Returns False when an
+    error record was written.
+    """
+    data, features = load_feature_workflow_data(**filters)
+
+    if "error" in data:
+        out.write(json.dumps(data) + "\n")
+        return False
+
+    matcher = CommandMatcher(data["available_commands"]) if top_k else None
+
+    for plugin in data["plugins"]:
+        record = {"type": "plugin", "tech_stack": data["tech_stack"]}
+        record.update(plugin_summary(plugin, all_commands or not matcher))
+        out.write(json.dumps(record) + "\n")
+
+    for feature in iter_feature_specs(features, spec_mode, sections, matcher, top_k):
+        out.write(json.dumps({"type": "feature", **feature}) + "\n")
+        out.flush()
+
+    return True
 
 if __name__ == "__main__":
-    result = generate_feature_workflow_data()
+    parser = argparse.ArgumentParser(description="Combine features.json and specs with the tech stack's Airtable commands")
+    parser.add_argument("--spec", choices=SPEC_MODES, default="digest",
+                        help="How much of each spec.md to include (default: digest)")
+    parser.add_argument("--section", action="append", dest="sections", metavar="NAME",
+                        help="With --spec sections, only include this heading (repeatable)")
+    parser.add_argument("--feature", action="append", dest="feature_ids", metavar="ID",
+                        help="Only include this feature (repeatable)")
+    parser.add_argument("--priority", help="Only include features with this priority")
+    parser.add_argument("--status", help="Only include features with this status")
+    parser.add_argument("--jsonl", action="store_true",
+                        help="Stream one JSON record per line instead of a single document")
+    parser.add_argument("--top-k", type=int, default=TOP_K,
+                        help=f"Ranked commands per feature; 0 ships the full list instead (default: {TOP_K})")
+    parser.add_argument("--all-commands", action="store_true",
+                        help="Include the full command list alongside the ranked matches")
+    args = parser.parse_args()
+
+    filters = {"feature_ids": args.feature_ids, "priority": args.priority, "status": args.status}
+    options = {"top_k": max(args.top_k, 0), "all_commands": args.all_commands}
+
+    if args.jsonl:
+        ok = stream_feature_workflow_data(sys.stdout, args.spec, args.sections, **options, **filters)
+        sys.exit(0 if ok else 1)
+
+    result = generate_feature_workflow_data(args.spec, args.sections, **options, **filters)
 
     # Output JSON
     print(json.dumps(result, indent=2))
@@ -6,6 +6,8 @@ Add worktree discovery section to all agents
 import os
 from pathlib import Path
 
+from component_index import index
+
 # The worktree discovery section to add
 WORKTREE_SECTION = """
 ## Worktree Discovery
@@ -67,12 +69,18 @@ def main():
     print("Adding worktree discovery to all agents...")
     print("")
 
-    # Find all active agents (not archived)
-    agent_files = sorted(marketplace_dir.glob("plugins/*/agents/*.md"))
-    agent_files = [f for f in agent_files if '/archived/' not in str(f)]
+    # Find all active agents (the index skips archived plugins)
+    agents = index.components(marketplace_dir, kind='agents')
 
     count = 0
-    for agent_file in agent_files:
+    for agent in agents:
+        agent_file = marketplace_dir / agent['path']
+
+        # Indexed section titles avoid re-reading agents that are already done
+        if 'Worktree Discovery' in agent['sections']:
+            print(f"⏭️  Skipping {agent_file.name} (already has worktree discovery)")
+            continue
+
         if add_worktree_discovery(agent_file):
             count += 1
 
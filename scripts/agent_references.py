@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Single-pass reference extractor for agent and command markdown
+
+audit-agents, populate-airtable, link-agent-commands and link-agent-skills
+used to run their own regex passes over every agent file. scan_references()
+walks the text once with one compiled pattern and returns a compact record:
+
+    {
+        'commands':      ['plugin:command', ...]  # /plugin:command, SlashCommand("plugin:command")
+        'bare_commands': ['command', ...]         # /command, SlashCommand("command")
+        'skills':        ['plugin:skill', ...]    # Skill(plugin:skill), Skill('skill')
+        'mcp_servers':   ['server', ...]          # mcp__server or mcp__server__tool
+        'mcp_tool_servers': ['server', ...]       # only servers called as mcp__server__tool
+        'agents':        ['plugin:agent', ...]    # subagent_type="...", Task(agent="...")
+        'markers':       {'slash': bool, 'mcp': bool, 'skills': bool}
+        'sections':      ['heading or bold title', ...]
+    }
+
+Headings and bold markers consume only their delimiters, so keywords and
+references inside section titles are still seen. Call arguments are only
+taken when they are a plain name followed by the closing quote or paren,
+so prose such as `Skill(` or SlashCommand(command: "...") records nothing.
+
+Usage:
+    from agent_references import scan_references
+    record = scan_references(content)
+"""
+
+import re
+
+# Path fragments that look like /commands but are filesystem or URL noise
+FALSE_POSITIVES = ('http', 'https', 'path', 'home', 'usr', 'bin')
+
+# Section keywords, matched case-insensitively after their first letter
+MARKER_KEYWORDS = {
+    'slash': ('slash commands', 'available commands', 'commands to use'),
+    'mcp': ('mcp servers', 'mcp server', 'mcp tools', 'available mcp'),
+    'skills': ('skills',),
+}
+MARKER_KINDS = {keyword: kind for kind, keywords in MARKER_KEYWORDS.items() for keyword in keywords}
+
+
+def marker_branches():
+    """One branch per keyword and first-letter case, longest keywords first"""
+    branches = []
+    for keyword in sorted(MARKER_KINDS, key=len, reverse=True):
+        rest = re.escape(keyword[1:])
+        # "available mcp" must not swallow the mcp__ of "Available mcp__server"
+        guard = '(?!_)' if keyword.endswith('mcp') else ''
+        for first in (keyword[0].upper(), keyword[0]):
+            branches.append(f"{first}(?i:{rest}){guard}")
+    return branches
+
+
+# Every branch starts with a literal character, which lets the regex engine
+# skip straight to candidate positions instead of trying each branch everywhere
+TOKEN_PATTERN = re.compile('|'.join([
+    r'SlashCommand\(["\'](?P<slash_call>[a-z0-9-]+(?::[a-z0-9-]+)?)["\']',
+    r'Skill\((?:["\'](?P<skill>[a-z0-9-]+(?::[a-z0-9-]+)?)["\']|(?P<skill_call>[a-z0-9-]+:[a-z0-9-]+)\))',
+    r'/(?P<command>[a-z0-9-]+)(?::(?P<subcommand>[a-z0-9-]+))?',
+    r'mcp__(?P<mcp>[a-z0-9-]+(?:_[a-z0-9-]+)*)(?P<mcp_tool>__)?',
+    r'subagent_type\s*=\s*["\'](?P<subagent>[^"\'\s]+)',
+    r'Task\(\s*agent\s*=\s*["\'](?P<task_agent>[^"\'\s]+)',
+    r'#(?P<heading>#{0,5})[ \t]',
+    r'\*(?P<bold>\*)',
+] + marker_branches()))
+
+STRICT_COMMAND = re.compile(r'[a-z0-9-]+:[a-z0-9-]+')
+
+
+def scan_references(content):
+    """Extract every command, skill, MCP server, agent and section marker in one scan"""
+    commands, bare_commands, skills, mcp_servers, agents, sections = set(), set(), set(), set(), set(), []
+    mcp_tool_servers = set()
+    markers = {'slash': False, 'mcp': False, 'skills': False}
+    bold_open = None
+
+    for match in TOKEN_PATTERN.finditer(content):
+        kind = match.lastgroup
+        if kind is None:
+            markers[MARKER_KINDS[match.group().lower()]] = True
+            continue
+
+        if kind not in ('heading', 'bold') and 'skills' in match.group().lower():
+            # Tokens are consumed whole, so keywords inside them are checked here
+            markers['skills'] = True
+
+        # lastgroup is the subcommand when /plugin:command matched
+        if kind == 'subcommand':
+            commands.add(f"{match.group('command')}:{match.group('subcommand')}")
+        elif kind == 'command':
+            command = match.group('command')
+            if not any(noise in command for noise in FALSE_POSITIVES):
+                bare_commands.add(command)
+        elif kind == 'slash_call':
+            call = match.group('slash_call')
+            if STRICT_COMMAND.fullmatch(call):
+                commands.add(call)
+            else:
+                bare_commands.add(call)
+        elif kind in ('skill', 'skill_call'):
+            skills.add(match.group(kind))
+        elif kind in ('mcp', 'mcp_tool'):
+            mcp_servers.add(match.group('mcp'))
+            if kind == 'mcp_tool':
+                mcp_tool_servers.add(match.group('mcp'))
+        elif kind in ('subagent', 'task_agent'):
+            agents.add(match.group(kind))
+        elif kind == 'heading':
+            start = match.start()
+            if start and content[start - 1] != '\n':
+                continue  # A '#' inside a line is not a heading
+            end = content.find('\n', match.end())
+            title = content[match.end():end if end != -1 else len(content)]
+            sections.append(title.strip().rstrip('#').strip())
+        elif kind == 'bold':
+            position = match.start()
+            if bold_open is not None:
+                text = content[bold_open:position]
+                if text and '\n' not in text and '*' not in text:
+                    sections.append(text)
+                    bold_open = None
+                    continue
+            bold_open = position + 2
+
+    return {
+        'commands': sorted(commands),
+        'bare_commands': sorted(bare_commands),
+        'skills': sorted(skills),
+        'mcp_servers': sorted(mcp_servers),
+        'mcp_tool_servers': sorted(mcp_tool_servers),
+        'agents': sorted(agents),
+        'markers': markers,
+        'sections': sections,
+    }
@@ -0,0 +1,682 @@
+#!/usr/bin/env python3
+"""
+Local Airtable stand-in for offline runs and benchmarks
+
+Serves the subset of the Airtable REST API our scripts use (list with
+filterByFormula/fields/pagination, get, batch create/update/upsert/delete)
+from an in-memory copy of a fixture, so sync/manifest/workflow pipelines can
+be measured deterministically with no network.
+
+Fixtures:
+  - packaging-data.json (output of generate-package-report.py export)
+  - a recorded fixture from `airtable-standin.py record`
+
+Usage:
+    # Record the live base into a fixture (needs AIRTABLE_TOKEN)
+    python3 airtable-standin.py record --output airtable-fixture.json
+
+    # Serve a fixture on localhost
+    python3 airtable-standin.py serve --fixture packaging-data.json --port 8787
+
+    # Point any Airtable-backed script at it
+    export AIRTABLE_ENDPOINT_URL=http://localhost:8787
+    export AIRTABLE_TOKEN=offline
+    python3 scripts/sync-airtable.py
+
+Options such as --latency and --rate-limit simulate network round trips and
+Airtable's 5 req/s limit (429 responses). Request counts per table are printed
+on shutdown and available from GET /_stats. Writes stay in memory.
+"""
+
+import argparse
+import json
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlparse
+
+from airtable_snapshot import KEY_FIELDS
+
+DEFAULT_BASE_ID = "appHbSB7WhT1TxEQb"
+
+# Table IDs referenced directly by the workflow generation scripts
+TABLE_IDS = {
+    "tblG07GusbRMJ9h1I": "Tech Stacks",
+    "tblVEI2x2xArVx9ID": "Plugins",
+    "tblWKaSceuRJrBFC1": "Commands",
+    "tblNngn8hglFXZKnl": "Agents",
+    "tblWJSyghUzEiV1Cc": "Skills",
+}
+
+# packaging-data.json section -> table name
+PACKAGING_SECTIONS = {
+    "mcp_servers": "MCP Servers",
+    "skills": "Skills",
+    "commands": "Commands",
+    "agents": "Agents",
+    "plugins": "Plugins",
+}
+
+RECORD_TABLES = ["Marketplaces", "Plugins", "Agents", "Commands", "Skills", "MCP Servers", "Tech Stacks"]
+
+PRIMARY_FIELDS = dict(KEY_FIELDS, **{"Tech Stacks": "Stack Name"})
+
+MAX_PAGE_SIZE = 100
+MAX_BATCH = 10
+
+
+def now_iso():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def parse_time(value):
+    if isinstance(value, datetime):
+        return value
+    text = str(value).strip().replace("Z", "+00:00")
+    parsed = datetime.fromisoformat(text)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+class StandinError(Exception):
+    def __init__(self, status, error_type, message):
+        super().__init__(message)
+        self.status = status
+        self.error_type = error_type
+        self.message = message
+
+
+# ---------------------------------------------------------------------------
+# Formula evaluation (the subset of Airtable formulas used in this repo)
+# ---------------------------------------------------------------------------
+
+TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<field>\{[^}]*\})
+      | (?P<number>\d+(?:\.\d+)?)
+      | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<op>!=|<>|>=|<=|=|>|<|&|\+|-|\*|/|\(|\)|,)
+    )""", re.VERBOSE)
+
+
+def tokenize(formula):
+    tokens = []
+    pos = 0
+    formula = formula.strip()
+    while pos < len(formula):
+        match = TOKEN_RE.match(formula, pos)
+        if not match or match.end() == pos:
+            raise StandinError(422, "INVALID_FILTER_BY_FORMULA", f"Invalid formula near: {formula[pos:pos + 20]}")
+        pos = match.end()
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+    return tokens
+
+
+class FormulaParser:
+    """Recursive-descent parser producing a nested tuple AST"""
+
+    COMPARE = {"=", "!=", "<>", ">", "<", ">=", "<="}
+
+    def __init__(self, formula):
+        self.tokens = tokenize(formula)
+        self.pos = 0
+
+    def parse(self):
+        node = self.compare()
+        if self.pos != len(self.tokens):
+            raise StandinError(422, "INVALID_FILTER_BY_FORMULA", "Unexpected trailing tokens in formula")
+        return node
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, value=None):
+        token = self.peek()
+        if value is not None and token[1] != value:
+            raise StandinError(422, "INVALID_FILTER_BY_FORMULA", f"Expected '{value}' in formula")
+        self.pos += 1
+        return token
+
+    def compare(self):
+        node = self.concat()
+        while self.peek()[1] in self.COMPARE:
+            op = self.take()[1]
+            node = ("op", op, node, self.concat())
+        return node
+
+    def concat(self):
+        node = self.additive()
+        while self.peek()[1] == "&":
+            self.take()
+            node = ("op", "&", node, self.additive())
+        return node
+
+    def additive(self):
+        node = self.term()
+        while self.peek()[1] in ("+", "-"):
+            op = self.take()[1]
+            node = ("op", op, node, self.term())
+        return node
+
+    def term(self):
+        node = self.factor()
+        while self.peek()[1] in ("*", "/"):
+            op = self.take()[1]
+            node = ("op", op, node, self.factor())
+        return node
+
+    def factor(self):
+        kind, value = self.take()
+        if kind == "string":
+            return ("lit", re.sub(r"\\(.)", r"\1", value[1:-1]))
+        if kind == "number":
+            return ("lit", float(value) if "." in value else int(value))
+        if kind == "field":
+            return ("field", value[1:-1])
+        if kind == "name":
+            args = []
+            if self.peek()[1] == "(":
+                self.take("(")
+                if self.peek()[1] != ")":
+                    args.append(self.compare())
+                    while self.peek()[1] == ",":
+                        self.take()
+                        args.append(self.compare())
+                self.take(")")
+            return ("call", value.upper(), args)
+        if value == "(":
+            node = self.compare()
+            self.take(")")
+            return node
+        if value == "-":
+            return ("op", "-", ("lit", 0), self.factor())
+        raise StandinError(422, "INVALID_FILTER_BY_FORMULA", f"Unexpected token '{value}' in formula")
+
+
+def truthy(value):
+    return value not in (None, "", 0, False) and value != []
+
+
+def as_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class FormulaEvaluator:
+    def __init__(self, store, table, record):
+        self.store = store
+        self.table = table
+        self.record = record
+
+    def eval(self, node):
+        kind = node[0]
+        if kind == "lit":
+            return node[1]
+        if kind == "field":
+            return self.field(node[1])
+        if kind == "op":
+            return self.op(node[1], self.eval(node[2]), self.eval(node[3]))
+        return self.call(node[1], node[2])
+
+    def field(self, name):
+        value = self.record["fields"].get(name)
+        if isinstance(value, list):
+            # Linked records render as their primary field, like Airtable does
+            return ", ".join(self.store.display_name(item) for item in value)
+        if isinstance(value, bool):
+            return 1 if value else 0
+        return value
+
+    def op(self, op, left, right):
+        if op == "&":
+            return as_text(left) + as_text(right)
+        if op in ("+", "-", "*", "/"):
+            left, right = float(left or 0), float(right or 0)
+            return {"+": left + right, "-": left - right, "*": left * right,
+                    "/": left / right if right else None}[op]
+        if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+            a, b = left, right
+        else:
+            a, b = as_text(left), as_text(right)
+        return {"=": a == b, "!=": a != b, "<>": a != b, ">": a > b,
+                "<": a < b, ">=": a >= b, "<=": a <= b}[op]
+
+    def call(self, name, args):
+        if name == "IF":
+            return self.eval(args[1]) if truthy(self.eval(args[0])) else (self.eval(args[2]) if len(args) > 2 else None)
+        if name == "AND":
+            return all(truthy(self.eval(arg)) for arg in args)
+        if name == "OR":
+            return any(truthy(self.eval(arg)) for arg in args)
+
+        values = [self.eval(arg) for arg in args]
+        if name == "NOT":
+            return not truthy(values[0])
+        if name in ("TRUE", "FALSE"):
+            return name == "TRUE"
+        if name == "BLANK":
+            return None
+        if name == "RECORD_ID":
+            return self.record["id"]
+        if name == "CREATED_TIME":
+            return self.record["createdTime"]
+        if name == "LAST_MODIFIED_TIME":
+            return self.store.modified[self.table][self.record["id"]]
+        if name == "LOWER":
+            return as_text(values[0]).lower()
+        if name == "UPPER":
+            return as_text(values[0]).upper()
+        if name == "TRIM":
+            return as_text(values[0]).strip()
+        if name == "LEN":
+            return len(as_text(values[0]))
+        if name in ("FIND", "SEARCH"):
+            needle, haystack = as_text(values[0]), as_text(values[1])
+            start = int(values[2]) - 1 if len(values) > 2 else 0
+            if name == "SEARCH":
+                needle, haystack = needle.lower(), haystack.lower()
+            return haystack.find(needle, start) + 1
+        if name == "ARRAYJOIN":
+            return as_text(values[0])
+        if name == "DATETIME_PARSE":
+            return parse_time(values[0]).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+        if name in ("IS_AFTER", "IS_BEFORE", "IS_SAME"):
+            a, b = parse_time(values[0]), parse_time(values[1])
+            return {"IS_AFTER": a > b, "IS_BEFORE": a < b, "IS_SAME": a == b}[name]
+        raise StandinError(422, "INVALID_FILTER_BY_FORMULA", f"Unsupported formula function: {name}")
+
+
+# ---------------------------------------------------------------------------
+# In-memory base
+# ---------------------------------------------------------------------------
+
+class Store:
+    def __init__(self, base_id):
+        self.base_id = base_id
+        self.tables = {}          # table name -> {record_id: record}
+        self.modified = {}        # table name -> {record_id: iso time}
+        self.names = {}           # record_id -> primary field value
+        self.lock = threading.RLock()
+        self._formulas = {}
+
+    @classmethod
+    def from_fixture(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        store = cls(data.get("base_id", DEFAULT_BASE_ID))
+        if "tables" in data:
+            # Recorded fixture: {"tables": {name: [records]}}
+            for table_name, records in data["tables"].items():
+                for record in records:
+                    store.insert(table_name, record)
+        else:
+            # packaging-data.json: {section: {record_id: fields}}
+            for section, table_name in PACKAGING_SECTIONS.items():
+                for record_id, fields in data.get(section, {}).items():
+                    store.insert(table_name, {"id": record_id, "fields": fields})
+
+        for table_name in RECORD_TABLES:
+            store.tables.setdefault(table_name, {})
+            store.modified.setdefault(table_name, {})
+        return store
+
+    def resolve_table(self, name_or_id):
+        name = TABLE_IDS.get(name_or_id, name_or_id)
+        if name not in self.tables:
+            raise StandinError(404, "TABLE_NOT_FOUND", f"Could not find table {name_or_id} in application {self.base_id}")
+        return name
+
+    def primary_field(self, table_name, fields):
+        if table_name in PRIMARY_FIELDS:
+            return PRIMARY_FIELDS[table_name]
+        return next(iter(fields), None)
+
+    def display_name(self, value):
+        if isinstance(value, str) and value.startswith("rec"):
+            return self.names.get(value, value)
+        return as_text(value)
+
+    def insert(self, table_name, record):
+        record = {
+            "id": record.get("id") or "rec" + secrets.token_hex(7)[:14],
+            "createdTime": record.get("createdTime") or now_iso(),
+            "fields": dict(record.get("fields", {})),
+        }
+        self.tables.setdefault(table_name, {})[record["id"]] = record
+        self.modified.setdefault(table_name, {})[record["id"]] = record["createdTime"]
+        self._index_name(table_name, record)
+        return record
+
+    def _index_name(self, table_name, record):
+        primary = self.primary_field(table_name, record["fields"])
+        if primary and primary in record["fields"]:
+            self.names[record["id"]] = as_text(record["fields"][primary])
+
+    def get(self, table_name, record_id):
+        record = self.tables[table_name].get(record_id)
+        if record is None:
+            raise StandinError(404, "NOT_FOUND", f"Could not find record {record_id}")
+        return record
+
+    def update(self, table_name, record_id, fields, replace=False):
+        record = self.get(table_name, record_id)
+        record["fields"] = dict(fields) if replace else {**record["fields"], **fields}
+        self.modified[table_name][record_id] = now_iso()
+        self._index_name(table_name, record)
+        return record
+
+    def delete(self, table_name, record_id):
+        self.get(table_name, record_id)
+        del self.tables[table_name][record_id]
+        del self.modified[table_name][record_id]
+        self.names.pop(record_id, None)
+
+    def select(self, table_name, formula=None):
+        records = list(self.tables[table_name].values())
+        if not formula:
+            return records
+        ast = self._formulas.get(formula)
+        if ast is None:
+            ast = self._formulas[formula] = FormulaParser(formula).parse()
+        return [rec for rec in records if truthy(FormulaEvaluator(self, table_name, rec).eval(ast))]
+
+
+def project(record, fields):
+    if not fields:
+        return record
+    return {**record, "fields": {k: v for k, v in record["fields"].items() if k in fields}}
+
+
+# ---------------------------------------------------------------------------
+# HTTP front end
+# ---------------------------------------------------------------------------
+
+class RateLimiter:
+    """Sliding one-second window per base, mirroring Airtable's 5 req/s limit"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.hits = defaultdict(deque)
+        self.lock = threading.Lock()
+
+    def allow(self, key):
+        if not self.limit:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            window = self.hits[key]
+            while window and now - window[0] >= 1:
+                window.popleft()
+            if len(window) >= self.limit:
+                return False
+            window.append(now)
+            return True
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    store = None
+    limiter = None
+    latency = 0.0
+    stats = defaultdict(int)
+    stats_lock = threading.Lock()
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def do_PATCH(self):
+        self.dispatch("PATCH")
+
+    def do_PUT(self):
+        self.dispatch("PUT")
+
+    def do_DELETE(self):
+        self.dispatch("DELETE")
+
+    def dispatch(self, method):
+        parsed = urlparse(self.path)
+        parts = [unquote(p) for p in parsed.path.split("/") if p]
+        query = parse_qs(parsed.query)
+
+        if parts == ["_stats"]:
+            with self.stats_lock:
+                self.send_json(200, dict(self.stats))
+            return
+
+        try:
+            # Always drain the body first so errors never desync a keep-alive connection
+            body = self.read_body()
+            if len(parts) < 3 or parts[0] != "v0":
+                raise StandinError(404, "NOT_FOUND", "Unknown endpoint")
+            if not self.limiter.allow(parts[1]):
+                raise StandinError(429, "RATE_LIMIT_REACHED", "Rate limit exceeded. Please try again later")
+            if self.latency:
+                time.sleep(self.latency)
+
+            with self.store.lock:
+                table = self.store.resolve_table(parts[2])
+                rest = parts[3:]
+                with self.stats_lock:
+                    self.stats[f"{method} {table}"] += 1
+                    self.stats["total"] += 1
+                status, payload = self.route(method, table, rest, query, body)
+        except StandinError as e:
+            status, payload = e.status, {"error": {"type": e.error_type, "message": e.message}}
+
+        self.send_json(status, payload)
+
+    def route(self, method, table, rest, query, body):
+        store = self.store
+
+        if method == "GET" and not rest:
+            return 200, self.list_records(table, {
+                "filterByFormula": query.get("filterByFormula", [None])[0],
+                "fields": query.get("fields[]", []) + query.get("fields", []),
+                "pageSize": query.get("pageSize", [None])[0],
+                "maxRecords": query.get("maxRecords", [None])[0],
+                "offset": query.get("offset", [None])[0],
+            })
+        if method == "POST" and rest == ["listRecords"]:
+            return 200, self.list_records(table, body)
+        if method == "GET" and len(rest) == 1:
+            return 200, store.get(table, rest[0])
+
+        if method == "POST" and not rest:
+            if "records" not in body:
+                return 200, store.insert(table, {"fields": body.get("fields", {})})
+            records = self.batch(body)
+            return 200, {"records": [store.insert(table, {"fields": r.get("fields", {})}) for r in records]}
+
+        if method in ("PATCH", "PUT") and len(rest) == 1:
+            return 200, store.update(table, rest[0], body.get("fields", {}), replace=method == "PUT")
+        if method in ("PATCH", "PUT") and not rest:
+            records = self.batch(body)
+            upsert = body.get("performUpsert")
+            if upsert:
+                return 200, self.upsert(table, records, upsert.get("fieldsToMergeOn", []), method == "PUT")
+            return 200, {"records": [
+                store.update(table, r["id"], r.get("fields", {}), replace=method == "PUT") for r in records
+            ]}
+
+        if method == "DELETE":
+            record_ids = rest[:1] or query.get("records[]", [])
+            for record_id in record_ids:
+                store.delete(table, record_id)
+            if rest:
+                return 200, {"id": rest[0], "deleted": True}
+            return 200, {"records": [{"id": record_id, "deleted": True} for record_id in record_ids]}
+
+        raise StandinError(404, "NOT_FOUND", "Unsupported operation")
+
+    def list_records(self, table, options):
+        formula = options.get("filterByFormula")
+        fields = options.get("fields") or []
+        page_size = min(int(options.get("pageSize") or MAX_PAGE_SIZE), MAX_PAGE_SIZE)
+        max_records = options.get("maxRecords")
+        offset = options.get("offset")
+
+        records = self.store.select(table, formula)
+        if max_records:
+            records = records[:int(max_records)]
+
+        start = 0
+        if offset:
+            match = re.fullmatch(r"itr(\d+)", offset)
+            if not match:
+                raise StandinError(422, "LIST_RECORDS_ITERATOR_NOT_AVAILABLE", "Invalid offset")
+            start = int(match.group(1))
+
+        page = records[start:start + page_size]
+        payload = {"records": [project(rec, fields) for rec in page]}
+        if start + page_size < len(records):
+            payload["offset"] = f"itr{start + page_size}"
+        return payload
+
+    def upsert(self, table, records, merge_on, replace):
+        # Like Airtable, resolve every match first and fail the whole request if any is ambiguous
+        matches = []
+        for record in records:
+            fields = record.get("fields", {})
+            key = tuple(as_text(fields.get(name)) for name in merge_on)
+            found = [rec for rec in self.store.tables[table].values()
+                     if tuple(as_text(rec["fields"].get(name)) for name in merge_on) == key]
+            if len(found) > 1:
+                raise StandinError(422, "INVALID_RECORDS",
+                                   f"More than one record matches fieldsToMergeOn {merge_on}: {key}")
+            matches.append(found[0] if found else None)
+
+        created, updated, results = [], [], []
+        for record, match in zip(records, matches):
+            fields = record.get("fields", {})
+            if match:
+                result = self.store.update(table, match["id"], fields, replace=replace)
+                updated.append(result["id"])
+            else:
+                result = self.store.insert(table, {"fields": fields})
+                created.append(result["id"])
+            results.append(result)
+        return {"records": results, "createdRecords": created, "updatedRecords": updated}
+
+    @staticmethod
+    def batch(body):
+        records = body.get("records", [])
+        if len(records) > MAX_BATCH:
+            raise StandinError(422, "INVALID_RECORDS", f"At most {MAX_BATCH} records per request")
+        return records
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except json.JSONDecodeError:
+            raise StandinError(422, "INVALID_REQUEST_BODY", "Could not parse request body")
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 429:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Suppress logs
+
+
+def serve(args):
+    store = Store.from_fixture(args.fixture)
+    StandinHandler.store = store
+    StandinHandler.limiter = RateLimiter(args.rate_limit)
+    StandinHandler.latency = args.latency / 1000
+
+    server = ThreadingHTTPServer((args.host, args.port), StandinHandler)
+    server.daemon_threads = True
+
+    counts = ", ".join(f"{name}: {len(records)}" for name, records in store.tables.items())
+    print(f"🧪 Airtable stand-in serving {args.fixture}")
+    print(f"   Base: {store.base_id}")
+    print(f"   Tables: {counts}")
+    print(f"📡 export AIRTABLE_ENDPOINT_URL=http://{args.host}:{args.port}")
+    print(f"⏹️  Press Ctrl+C to stop")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n📊 Requests served:")
+        for key, count in sorted(StandinHandler.stats.items()):
+            print(f"   {key}: {count}")
+
+
+def record(args):
+    from pyairtable import Api
+
+    token = os.getenv("AIRTABLE_TOKEN")
+    if not token:
+        print("❌ ERROR: AIRTABLE_TOKEN environment variable not set")
+        print("   Export it: export AIRTABLE_TOKEN=your_key_here")
+        sys.exit(1)
+
+    api = Api(token, endpoint_url=os.getenv("AIRTABLE_ENDPOINT_URL", "https://api.airtable.com"))
+    base = api.base(args.base_id)
+
+    fixture = {"base_id": args.base_id, "recorded": now_iso(), "tables": {}}
+    for table_name in args.tables:
+        records = base.table(table_name).all()
+        fixture["tables"][table_name] = records
+        print(f"  ✓ {table_name}: {len(records)} records")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(fixture, f, indent=2, ensure_ascii=False)
+    print(f"\n✅ Recorded fixture to {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Airtable stand-in for offline runs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="Serve a fixture over HTTP")
+    serve_parser.add_argument("--fixture", default=str(Path(__file__).parent.parent / "packaging-data.json"),
+                              help="Recorded fixture or packaging-data.json (default: repo packaging-data.json)")
+    serve_parser.add_argument("--host", default="localhost")
+    serve_parser.add_argument("--port", type=int, default=8787)
+    serve_parser.add_argument("--latency", type=float, default=0, help="Added latency per request in ms")
+    serve_parser.add_argument("--rate-limit", type=int, default=0,
+                              help="Requests per second per base before returning 429 (Airtable: 5, default: off)")
+
+    record_parser = subparsers.add_parser("record", help="Record live tables into a fixture")
+    record_parser.add_argument("--output", default="airtable-fixture.json")
+    record_parser.add_argument("--base-id", default=DEFAULT_BASE_ID)
+    record_parser.add_argument("--tables", nargs="+", default=RECORD_TABLES)
+
+    args = parser.parse_args()
+    if args.command == "serve":
+        serve(args)
+    else:
+        record(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Local snapshot cache for Airtable tables
+
+Every marketplace script reads the same Agents/Commands/Skills/Plugins/MCP
+Servers tables. Instead of each one calling table.all() from scratch, they
+read through this module, which keeps one SQLite snapshot per base/table:
+
+- Within the TTL the snapshot is returned without touching the API
+- After the TTL only records created/modified since the last sync are
+  fetched (LAST_MODIFIED_TIME()/CREATED_TIME() formula), plus a cheap
+  name-only listing to drop deleted records
+- Writes through airtable_writer.BatchWriter call mark_stale() on their
+  table, and scripts writing through pyairtable directly call it
+  themselves, so the next read, in this process or another script,
+  refreshes before trusting the cache;
+  tables linked to it are marked too, since Airtable updates the reverse
+  side of every link
+- Records keep the order the API returned them in: updates rewrite rows
+  in place and only new records are appended
+
+Usage:
+    from airtable_snapshot import snapshot
+    agents = snapshot.all(agents_table)
+
+Environment:
+    AIRTABLE_SNAPSHOT_PATH  SQLite file (default: ~/.cache/dev-lifecycle-marketplace/airtable-snapshot.db)
+    AIRTABLE_SNAPSHOT_TTL   Seconds a snapshot is trusted (default: 600)
+    AIRTABLE_SNAPSHOT=off   Bypass the cache and always call table.all()
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+DEFAULT_PATH = Path.home() / ".cache" / "dev-lifecycle-marketplace" / "airtable-snapshot.db"
+DEFAULT_TTL = 600
+
+# Overlap between syncs so clock skew never drops a modification
+SYNC_MARGIN = timedelta(minutes=5)
+
+# Bump to drop snapshots written by older versions (v1 reordered updated records)
+SNAPSHOT_VERSION = 2
+
+# Primary field per table, used to list record IDs cheaply when detecting deletions
+KEY_FIELDS = {
+    'Agents': 'Agent Name',
+    'Commands': 'Command Name',
+    'Skills': 'Skill Name',
+    'Plugins': 'Name',
+    'MCP Servers': 'MCP Server Name',
+    'Marketplaces': 'Name',
+}
+
+# Tables whose linked-record fields point at each table, so writing one
+# changes reverse-link fields in the others
+LINKED_TABLES = {
+    'Agents': ('Plugins', 'Commands', 'Skills', 'MCP Servers'),
+    'Commands': ('Plugins', 'Agents'),
+    'Skills': ('Plugins', 'Agents'),
+    'Plugins': ('Agents', 'Commands', 'Skills', 'Marketplaces'),
+    'MCP Servers': ('Agents',),
+    'Marketplaces': ('Plugins',),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tables (
+    base_id TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    synced_at TEXT NOT NULL,
+    PRIMARY KEY (base_id, table_name)
+);
+CREATE TABLE IF NOT EXISTS records (
+    base_id TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    record_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (base_id, table_name, record_id)
+);
+"""
+
+
+def table_key(table):
+    """Return (base_id, table_name) for a pyairtable Table (v1 or v2)"""
+    base = getattr(table, 'base', None)
+    if base is not None and hasattr(base, 'id'):
+        return base.id, table.name
+    return table.base_id, table.table_name
+
+
+class AirtableSnapshot:
+    """SQLite-backed cache of whole Airtable tables"""
+
+    def __init__(self, path=None, ttl=None, enabled=True):
+        self.path = Path(path or os.getenv('AIRTABLE_SNAPSHOT_PATH') or DEFAULT_PATH)
+        self.ttl = float(ttl if ttl is not None else os.getenv('AIRTABLE_SNAPSHOT_TTL', DEFAULT_TTL))
+        self.enabled = enabled
+        self.stats = {'hits': 0, 'incremental': 0, 'full': 0}
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _db(self):
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] < SNAPSHOT_VERSION:
+                with self._conn:
+                    self._conn.execute("DELETE FROM records")
+                    self._conn.execute("DELETE FROM tables")
+                self._conn.execute(f"PRAGMA user_version = {SNAPSHOT_VERSION}")
+        return self._conn
+
+    def all(self, table, refresh=False):
+        """Return all records of a table, refreshing the snapshot if needed
+
+        The lock only guards the SQLite connection, so several tables can be
+        fetched from Airtable concurrently from different threads.
+        """
+        if not self.enabled:
+            return table.all()
+
+        base_id, table_name = table_key(table)
+        with self._lock:
+            meta = self._db().execute(
+                "SELECT fetched_at, synced_at FROM tables WHERE base_id = ? AND table_name = ?",
+                (base_id, table_name),
+            ).fetchone()
+
+        if meta and not refresh and time.time() - meta[0] < self.ttl:
+            with self._lock:
+                self.stats['hits'] += 1
+        elif meta and table_name in KEY_FIELDS:
+            self._refresh_incremental(table, base_id, table_name, meta[1])
+        else:
+            self._refresh_full(table, base_id, table_name)
+
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT data FROM records WHERE base_id = ? AND table_name = ? ORDER BY rowid",
+                (base_id, table_name),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def mark_stale(self, *tables):
+        """Force the next read of these tables, and the tables linked to them, to refresh"""
+        if not self.enabled:
+            return
+        stale = set()
+        for table in tables:
+            base_id, table_name = table_key(table)
+            stale.add((base_id, table_name))
+            stale.update((base_id, linked) for linked in LINKED_TABLES.get(table_name, ()))
+        with self._lock:
+            db = self._db()
+            with db:
+                db.executemany(
+                    "UPDATE tables SET fetched_at = 0 WHERE base_id = ? AND table_name = ?",
+                    sorted(stale),
+                )
+
+    def _refresh_full(self, table, base_id, table_name):
+        started = datetime.now(timezone.utc)
+        records = table.all()
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute("DELETE FROM records WHERE base_id = ? AND table_name = ?", (base_id, table_name))
+                db.executemany(
+                    "INSERT INTO records (base_id, table_name, record_id, data) VALUES (?, ?, ?, ?)",
+                    [(base_id, table_name, rec['id'], json.dumps(rec)) for rec in records],
+                )
+                self._touch(db, base_id, table_name, started)
+            self.stats['full'] += 1
+
+    def _refresh_incremental(self, table, base_id, table_name, synced_at):
+        started = datetime.now(timezone.utc)
+        since = (datetime.fromisoformat(synced_at) - SYNC_MARGIN).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        formula = (
+            f"OR(IS_AFTER(LAST_MODIFIED_TIME(), '{since}'), "
+            f"IS_AFTER(CREATED_TIME(), '{since}'))"
+        )
+        changed = table.all(formula=formula)
+        live_ids = {rec['id'] for rec in table.all(fields=[KEY_FIELDS[table_name]])}
+
+        with self._lock:
+            db = self._db()
+            with db:
+                # Upsert in place: REPLACE would delete and re-append the row, moving it to the end
+                db.executemany(
+                    "INSERT INTO records (base_id, table_name, record_id, data) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (base_id, table_name, record_id) DO UPDATE SET data = excluded.data",
+                    [(base_id, table_name, rec['id'], json.dumps(rec)) for rec in changed],
+                )
+                cached_ids = {
+                    row[0] for row in db.execute(
+                        "SELECT record_id FROM records WHERE base_id = ? AND table_name = ?",
+                        (base_id, table_name),
+                    )
+                }
+                db.executemany(
+                    "DELETE FROM records WHERE base_id = ? AND table_name = ? AND record_id = ?",
+                    [(base_id, table_name, record_id) for record_id in cached_ids - live_ids],
+                )
+                self._touch(db, base_id, table_name, started)
+            self.stats['incremental'] += 1
+
+    def _touch(self, db, base_id, table_name, started):
+        db.execute(
+            "INSERT OR REPLACE INTO tables (base_id, table_name, fetched_at, synced_at) VALUES (?, ?, ?, ?)",
+            (base_id, table_name, time.time(), started.isoformat()),
+        )
+
+
+snapshot = AirtableSnapshot(enabled=os.getenv('AIRTABLE_SNAPSHOT', 'on').lower() not in ('off', '0', 'false'))
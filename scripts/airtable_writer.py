@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Rate-limit-aware batch writer for Airtable mutations
+
+Airtable accepts at most 10 records per write and 5 requests per second per
+base. Instead of each script looping over 10-record slices serially, they
+write through this module, which:
+
+- Keeps up to 5 batches in flight, paced by a token bucket shared by every
+  writer on the same base in this process
+- Retries 429s (never applied) and, for idempotent writes, 5xx responses and
+  dropped connections, honouring Retry-After or backing off with jitter
+- Turns creates into upserts when key_fields are given, so a create that
+  timed out after Airtable applied it cannot duplicate records on retry.
+  key_fields must be unique per record: Airtable rejects an upsert that
+  matches several records.
+- Reports progress and throughput for every run
+- Marks the table stale in the snapshot cache after every run, even one
+  that failed part-way, so later reads refetch what was written
+
+Usage:
+    from airtable_writer import BatchWriter
+    created = BatchWriter(agents_table, "agents").create(records, key_fields=["Agent Name"])
+    BatchWriter(agents_table, "agents").update(updates)
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+from airtable_snapshot import snapshot, table_key
+
+# Token bucket shared with the workflow generators' Airtable client
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "plugins" / "foundation" / "skills" / "workflow-generation" / "scripts"))
+from airtable_client import RateLimiter
+
+BATCH_SIZE = 10
+REQUESTS_PER_SECOND = float(os.getenv("AIRTABLE_WRITE_RATE", 5))
+MAX_IN_FLIGHT = 5
+MAX_RETRIES = 5
+SERVER_ERRORS = {500, 502, 503, 504}
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def bucket_for(base_id):
+    """Return the process-wide token bucket for a base"""
+    with _buckets_lock:
+        if base_id not in _buckets:
+            _buckets[base_id] = RateLimiter(REQUESTS_PER_SECOND)
+        return _buckets[base_id]
+
+
+class BatchWriter:
+    """Pipelined, throttled batch create/update/upsert for one table"""
+
+    def __init__(self, table, label="records", workers=MAX_IN_FLIGHT, indent="  "):
+        self.table = table
+        self.label = label
+        self.workers = workers
+        self.indent = indent
+        self.limiter = bucket_for(table_key(table)[0])
+
+    def create(self, records, key_fields=None):
+        """Create records (field dicts); returns the created records in input order
+
+        With key_fields the batch is sent as an upsert merged on those fields,
+        which makes retrying after a server error safe.
+        """
+        if key_fields:
+            return self.upsert(records, key_fields, verb="Created")
+        return self._run(self.table.batch_create, records, "Created", idempotent=False)
+
+    def update(self, records):
+        """Update records ({'id': ..., 'fields': ...}); returns them in input order"""
+        return self._run(self.table.batch_update, records, "Updated", idempotent=True)
+
+    def upsert(self, records, key_fields, verb="Upserted"):
+        """Create or update records matched on key_fields; returns records in input order"""
+        def send(batch):
+            result = self.table.batch_upsert([{'fields': fields} for fields in batch], key_fields=key_fields)
+            return result['records']
+
+        return self._run(send, records, verb, idempotent=True)
+
+    def _run(self, send, records, verb, idempotent):
+        records = list(records)
+        if not records:
+            return []
+
+        batches = [records[i:i + BATCH_SIZE] for i in range(0, len(records), BATCH_SIZE)]
+        results = [None] * len(batches)
+        stats = {'done': 0, 'requests': 0, 'retries': 0}
+        lock = threading.Lock()
+        started = time.monotonic()
+
+        def write(index):
+            results[index] = self._send(send, batches[index], idempotent, stats, lock)
+            with lock:
+                stats['done'] += len(batches[index])
+                print(f"{self.indent}✓ {verb} {stats['done']}/{len(records)} {self.label}")
+
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(batches))) as executor:
+                futures = [executor.submit(write, index) for index in range(len(batches))]
+                try:
+                    for future in futures:
+                        future.result()
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+        finally:
+            snapshot.mark_stale(self.table)
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        retries = f", {stats['retries']} retried" if stats['retries'] else ""
+        print(
+            f"{self.indent}⏱️  {len(records)} {self.label} in {elapsed:.1f}s "
+            f"({stats['requests']} requests, {stats['requests'] / elapsed:.1f} req/s, "
+            f"{len(records) / elapsed:.1f} records/s{retries})"
+        )
+
+        return [record for batch in results for record in batch]
+
+    def _send(self, send, batch, idempotent, stats, lock):
+        for attempt in range(MAX_RETRIES + 1):
+            self.limiter.acquire()
+            with lock:
+                stats['requests'] += 1
+            try:
+                return send(batch)
+            except (requests.HTTPError, requests.ConnectionError, requests.Timeout) as e:
+                response = getattr(e, 'response', None)
+                status = response.status_code if response is not None else None
+                # A 429 was rejected before being applied, so it is always safe to resend
+                retryable = status == 429 or (idempotent and (status is None or status in SERVER_ERRORS))
+                if not retryable or attempt == MAX_RETRIES:
+                    raise
+
+                retry_after = response.headers.get("Retry-After") if response is not None else None
+                if retry_after and retry_after.isdigit():
+                    delay = float(retry_after)
+                else:
+                    # Full jitter: spreads concurrent retries instead of stampeding together
+                    delay = random.uniform(0, min(30, 2 ** attempt))
+                with lock:
+                    stats['retries'] += 1
+                time.sleep(delay)
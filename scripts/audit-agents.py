@@ -9,13 +9,24 @@ Scans all agent files to extract:
 
 Compares with Airtable and generates a detailed report.
 Does NOT modify Airtable - just reports findings.
+
+Usage:
+    python audit-agents.py [--incremental] [--workers=N]
+
+--incremental re-audits only agents whose file or Airtable record changed
+since the last report and reuses the stored results for the rest.
 """
 
+import hashlib
+import json
 import os
-import re
 from pathlib import Path
 from pyairtable import Api
 
+from agent_references import FALSE_POSITIVES
+from airtable_snapshot import snapshot
+from component_index import INDEX_VERSION, index
+
 # Airtable configuration
 AIRTABLE_TOKEN = os.getenv("AIRTABLE_TOKEN")
 if not AIRTABLE_TOKEN:
@@ -23,9 +34,10 @@ if not AIRTABLE_TOKEN:
     print("   Export it: export AIRTABLE_TOKEN=your_key_here")
     exit(1)
 BASE_ID = "appHbSB7WhT1TxEQb"
+AIRTABLE_ENDPOINT_URL = os.getenv("AIRTABLE_ENDPOINT_URL", "https://api.airtable.com")
 
 # Initialize Airtable API
-api = Api(AIRTABLE_TOKEN)
+api = Api(AIRTABLE_TOKEN, endpoint_url=AIRTABLE_ENDPOINT_URL)
 base = api.base(BASE_ID)
 agents_table = base.table("Agents")
 commands_table = base.table("Commands")
@@ -38,63 +50,132 @@ MARKETPLACES = {
     "domain-plugin-builder": "/home/gotime2022/.claude/plugins/marketplaces/domain-plugin-builder",
 }
 
-def scan_agent_file(file_path):
-    """Scan agent file for slash commands, skills, and MCP servers"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except:
-        return None
+# Per-agent results of the last report, for --incremental runs
+AUDIT_STATE_PATH = Path(os.getenv(
+    "AUDIT_STATE_PATH",
+    Path.home() / ".cache" / "dev-lifecycle-marketplace" / "agent-audit.json",
+))
 
-    # Extract slash commands
-    # Pattern 1: /plugin:command or /command
-    slash_commands = set()
-    for match in re.finditer(r'/([a-z0-9-]+(?::[a-z0-9-]+)?)', content):
-        cmd = match.group(1)
-        # Filter out common false positives
-        if not any(x in cmd for x in ['http', 'https', 'path', 'home', 'usr', 'bin']):
-            slash_commands.add(cmd)
-
-    # Pattern 2: SlashCommand() references
-    for match in re.finditer(r'SlashCommand\(["\']([^"\']+)["\']', content):
-        slash_commands.add(match.group(1))
-
-    # Extract skills
-    # Pattern: Skill('skill-name') or @skill-name
-    skills = set()
-    for match in re.finditer(r'Skill\(["\']([^"\']+)["\']', content):
-        skills.add(match.group(1))
-
-    # Extract MCP servers
-    # Pattern: mcp__server_name__tool
-    mcp_servers = set()
-    for match in re.finditer(r'mcp__([a-z0-9_-]+)__', content):
-        server = match.group(1).replace('_', '-')
-        mcp_servers.add(server)
-
-    # Check for section markers
-    has_slash_section = bool(re.search(r'(?:Slash Commands|Available Commands|Commands to Use)', content, re.IGNORECASE))
-    has_mcp_section = bool(re.search(r'(?:MCP (?:Servers?|Tools)|Available MCP)', content, re.IGNORECASE))
-    has_skills_section = bool(re.search(r'(?:Skills|Available Skills)', content, re.IGNORECASE))
+def scan_agent_file(agent_file):
+    """Summarize the slash commands, skills, and MCP servers an indexed agent file uses"""
+    if agent_file['error']:
+        return None
 
+    references = agent_file['references']
+    slash_commands = set(references['commands']) | set(references['bare_commands'])
     return {
-        'slash_commands': slash_commands,
-        'skills': skills,
-        'mcp_servers': mcp_servers,
-        'has_slash_section': has_slash_section,
-        'has_mcp_section': has_mcp_section,
-        'has_skills_section': has_skills_section,
+        'slash_commands': {c for c in slash_commands if not any(noise in c for noise in FALSE_POSITIVES)},
+        'skills': set(references['skills']),
+        # Only mcp__server__tool calls count as using a server
+        'mcp_servers': {server.replace('_', '-') for server in references['mcp_tool_servers']},
+        'has_slash_section': references['markers']['slash'],
+        'has_mcp_section': references['markers']['mcp'],
+        'has_skills_section': references['markers']['skills'],
     }
 
-def main():
+def resolve_agent_files(workers=None):
+    """Map each relative agent File Path to its indexed file, one walk per marketplace
+
+    The index walks all marketplaces in parallel and re-parses changed agent
+    files across a process pool; earlier marketplaces win when the same
+    relative path exists in several.
+    """
+    index.refresh(*MARKETPLACES.values(), workers=workers)
+
+    agent_files = {}
+    for mp_name, mp_path in reversed(list(MARKETPLACES.items())):
+        for file_path, agent_file in index.by_path(mp_path, kind='agents').items():
+            agent_files[file_path] = dict(agent_file, marketplace=mp_name)
+    return agent_files
+
+# Bump when audit_agent's comparisons change, so --incremental re-audits everything
+AUDIT_VERSION = 1
+
+def audit_signature(agent, agent_file):
+    """Fingerprint of everything an agent's audit depends on
+
+    INDEX_VERSION and FALSE_POSITIVES cover the reference extraction and
+    AUDIT_VERSION the comparison, so changing either re-audits every agent
+    instead of reusing stored results.
+    """
+    payload = json.dumps(
+        [agent['fields'], agent_file['marketplace'], agent_file['mtime_ns'], agent_file['size'],
+         INDEX_VERSION, FALSE_POSITIVES, AUDIT_VERSION],
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def audit_agent(agent, scan_result):
+    """Compare one agent's scanned file with its Airtable record"""
+    airtable_has_slash = agent['fields'].get('Has Slash Commands Section', False)
+    airtable_has_mcp = agent['fields'].get('Has MCP Section', False)
+    airtable_has_skills = agent['fields'].get('Has Skills Section', False)
+    airtable_uses_commands = agent['fields'].get('Uses Commands', [])
+    airtable_skills = agent['fields'].get('Skills', [])
+    airtable_mcp = agent['fields'].get('MCP Servers Linked', [])
+
+    # Find discrepancies
+    discrepancies = []
+
+    # Check section flags
+    if scan_result['has_slash_section'] != airtable_has_slash:
+        discrepancies.append(f"Has Slash Commands Section: File={scan_result['has_slash_section']}, Airtable={airtable_has_slash}")
+
+    if scan_result['has_mcp_section'] != airtable_has_mcp:
+        discrepancies.append(f"Has MCP Section: File={scan_result['has_mcp_section']}, Airtable={airtable_has_mcp}")
+
+    if scan_result['has_skills_section'] != airtable_has_skills:
+        discrepancies.append(f"Has Skills Section: File={scan_result['has_skills_section']}, Airtable={airtable_has_skills}")
+
+    # Check slash commands
+    found_commands = scan_result['slash_commands']
+    if found_commands:
+        linked_count = len(airtable_uses_commands)
+        if linked_count < len(found_commands):
+            discrepancies.append(f"Slash Commands: Found {len(found_commands)} in file, only {linked_count} linked in Airtable")
+            discrepancies.append(f"  Found: {', '.join(sorted(found_commands))}")
+
+    # Check skills
+    found_skills = scan_result['skills']
+    if found_skills:
+        linked_count = len(airtable_skills)
+        if linked_count < len(found_skills):
+            discrepancies.append(f"Skills: Found {len(found_skills)} in file, only {linked_count} linked in Airtable")
+            discrepancies.append(f"  Found: {', '.join(sorted(found_skills))}")
+
+    # Check MCP servers
+    found_mcp = scan_result['mcp_servers']
+    if found_mcp:
+        linked_count = len(airtable_mcp)
+        if linked_count < len(found_mcp):
+            discrepancies.append(f"MCP Servers: Found {len(found_mcp)} in file, only {linked_count} linked in Airtable")
+            discrepancies.append(f"  Found: {', '.join(sorted(found_mcp))}")
+
+    return discrepancies
+
+def load_audit_state():
+    try:
+        with open(AUDIT_STATE_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {"agents": {}}
+
+def save_audit_state(state):
+    AUDIT_STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = AUDIT_STATE_PATH.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, AUDIT_STATE_PATH)
+
+def main(incremental=False, workers=None):
     print("🔍 COMPREHENSIVE AGENT AUDIT")
     print("=" * 80)
 
     # Get all agents from Airtable
     print("\n📊 Loading Airtable data...")
-    agents = agents_table.all()
-    commands = {c['fields'].get('Command Name'): c['id'] for c in commands_table.all()}
-    skills_data = {s['fields'].get('Skill Name'): s['id'] for s in skills_table.all()}
+    agents = snapshot.all(agents_table)
+    commands = {c['fields'].get('Command Name'): c['id'] for c in snapshot.all(commands_table)}
+    skills_data = {s['fields'].get('Skill Name'): s['id'] for s in snapshot.all(skills_table)}
 
     print(f"  ✓ Loaded {len(agents)} agents")
     print(f"  ✓ Loaded {len(commands)} commands")
@@ -102,7 +183,12 @@ def main():
 
     # Scan all agent files
     print("\n🔎 Scanning agent files...")
+    agent_files = resolve_agent_files(workers)
+
+    previous = load_audit_state()["agents"] if incremental else {}
+    state = {"agents": {}}
     findings = []
+    reaudited = 0
 
     for agent in agents:
         agent_name = agent['fields'].get('Agent Name')
@@ -111,75 +197,37 @@ def main():
         if not file_path:
             continue
 
-        # Find marketplace path
-        marketplace_path = None
-        for mp_name, mp_path in MARKETPLACES.items():
-            full_path = Path(mp_path) / file_path
-            if full_path.exists():
-                marketplace_path = full_path
-                break
-
-        if not marketplace_path:
-            continue
-
-        # Scan file
-        scan_result = scan_agent_file(marketplace_path)
-        if not scan_result:
+        # Find the indexed agent file
+        agent_file = agent_files.get(file_path)
+        if not agent_file:
             continue
 
-        # Compare with Airtable
-        airtable_has_slash = agent['fields'].get('Has Slash Commands Section', False)
-        airtable_has_mcp = agent['fields'].get('Has MCP Section', False)
-        airtable_has_skills = agent['fields'].get('Has Skills Section', False)
-        airtable_uses_commands = agent['fields'].get('Uses Commands', [])
-        airtable_skills = agent['fields'].get('Skills', [])
-        airtable_mcp = agent['fields'].get('MCP Servers Linked', [])
-
-        # Find discrepancies
-        discrepancies = []
-
-        # Check section flags
-        if scan_result['has_slash_section'] != airtable_has_slash:
-            discrepancies.append(f"Has Slash Commands Section: File={scan_result['has_slash_section']}, Airtable={airtable_has_slash}")
-
-        if scan_result['has_mcp_section'] != airtable_has_mcp:
-            discrepancies.append(f"Has MCP Section: File={scan_result['has_mcp_section']}, Airtable={airtable_has_mcp}")
-
-        if scan_result['has_skills_section'] != airtable_has_skills:
-            discrepancies.append(f"Has Skills Section: File={scan_result['has_skills_section']}, Airtable={airtable_has_skills}")
-
-        # Check slash commands
-        found_commands = scan_result['slash_commands']
-        if found_commands:
-            linked_count = len(airtable_uses_commands)
-            if linked_count < len(found_commands):
-                discrepancies.append(f"Slash Commands: Found {len(found_commands)} in file, only {linked_count} linked in Airtable")
-                discrepancies.append(f"  Found: {', '.join(sorted(found_commands))}")
-
-        # Check skills
-        found_skills = scan_result['skills']
-        if found_skills:
-            linked_count = len(airtable_skills)
-            if linked_count < len(found_skills):
-                discrepancies.append(f"Skills: Found {len(found_skills)} in file, only {linked_count} linked in Airtable")
-                discrepancies.append(f"  Found: {', '.join(sorted(found_skills))}")
-
-        # Check MCP servers
-        found_mcp = scan_result['mcp_servers']
-        if found_mcp:
-            linked_count = len(airtable_mcp)
-            if linked_count < len(found_mcp):
-                discrepancies.append(f"MCP Servers: Found {len(found_mcp)} in file, only {linked_count} linked in Airtable")
-                discrepancies.append(f"  Found: {', '.join(sorted(found_mcp))}")
+        signature = audit_signature(agent, agent_file)
+        cached = previous.get(agent['id'])
+        if cached and cached['signature'] == signature:
+            # Neither the file nor the Airtable record changed since the last report
+            discrepancies = cached['discrepancies']
+        else:
+            # Scan file
+            scan_result = scan_agent_file(agent_file)
+            if not scan_result:
+                continue
+            discrepancies = audit_agent(agent, scan_result)
+            reaudited += 1
+
+        state["agents"][agent['id']] = {'signature': signature, 'discrepancies': discrepancies}
 
         if discrepancies:
             findings.append({
                 'agent': agent_name,
                 'discrepancies': discrepancies,
                 'file_path': file_path,
-                'scan_result': scan_result
             })
 
+    save_audit_state(state)
+    if incremental:
+        print(f"  ✓ Re-audited {reaudited} changed agents, reused {len(state['agents']) - reaudited} from last report")
+
     # Generate report
     print("\n" + "=" * 80)
     print("📋 AUDIT REPORT")
@@ -229,4 +277,7 @@ def main():
     print("\n" + "=" * 80)
 
 if __name__ == "__main__":
-    main()
+    import sys
+
+    workers = next((int(arg.split('=', 1)[1]) for arg in sys.argv if arg.startswith('--workers=')), None)
+    main(incremental='--incremental' in sys.argv, workers=workers)
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Persistent component index for marketplace plugin trees
+
+Several scripts need the same view of plugins/*/agents/*.md,
+plugins/*/commands/*.md and plugins/*/skills/*/SKILL.md. Instead of each
+one globbing and re-parsing the tree, they query this index, which keeps
+one SQLite row per component:
+
+- kind, plugin, name, path, mtime and size
+- parsed frontmatter and the first body line (summary)
+- references to slash commands, skills, MCP servers and invoked agents,
+  section markers and section titles (see agent_references.py)
+
+refresh() walks plugins/* once and only re-reads files whose mtime or size
+changed since the last run. Several marketplaces are walked in parallel
+worker processes and changed files are parsed across all cores.
+
+Usage:
+    from component_index import index
+    for agent in index.components(marketplace_path, kind='agents'):
+        print(agent['name'], agent['references']['commands'])
+
+Environment:
+    COMPONENT_INDEX_PATH  SQLite file (default: ~/.cache/dev-lifecycle-marketplace/component-index.db)
+    COMPONENT_INDEX=off   Keep the index in memory only (always re-parses)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from agent_references import scan_references
+from markdown_frontmatter import parse_frontmatter
+
+DEFAULT_PATH = Path.home() / ".cache" / "dev-lifecycle-marketplace" / "component-index.db"
+
+# Bump when the stored fields or reference extraction change, forcing a re-parse
+INDEX_VERSION = 4
+
+KINDS = ('agents', 'commands', 'skills')
+
+# Skill directory entries recorded alongside each skill
+SKILL_PARTS = {"SKILL.md", "scripts", "templates", "examples"}
+
+# Below this many changed files, parsing in-process beats starting workers
+MIN_PARALLEL_FILES = 32
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS components (
+    root TEXT NOT NULL,
+    path TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    plugin TEXT NOT NULL,
+    name TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    version INTEGER NOT NULL,
+    parts TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (root, path)
+);
+"""
+
+
+def walk_plugins(root):
+    """Collect component files under root/plugins in a single pass
+
+    Returns (kind, plugin, path, file, parts) tuples; path is relative to
+    root, file is the markdown file to parse (None for a skill without
+    SKILL.md). Plain tuples so results can come back from a worker process.
+    """
+    found = []
+    plugins_dir = Path(root) / "plugins"
+    if not plugins_dir.is_dir():
+        return found
+
+    for plugin_entry in sorted(os.scandir(plugins_dir), key=lambda e: e.name):
+        # Skip hidden and archived directories
+        if not plugin_entry.is_dir() or plugin_entry.name.startswith(('archived', '.')):
+            continue
+
+        plugin = plugin_entry.name
+        for kind_entry in os.scandir(plugin_entry.path):
+            if kind_entry.name not in KINDS or not kind_entry.is_dir():
+                continue
+
+            for entry in sorted(os.scandir(kind_entry.path), key=lambda e: e.name):
+                path = f"plugins/{plugin}/{kind_entry.name}/{entry.name}"
+                if kind_entry.name == 'skills':
+                    if entry.is_dir():
+                        parts = sorted({child.name for child in os.scandir(entry.path)} & SKILL_PARTS)
+                        skill_md = os.path.join(entry.path, "SKILL.md") if "SKILL.md" in parts else None
+                        found.append(('skills', plugin, path, skill_md, parts))
+                elif entry.name.endswith('.md') and entry.is_file():
+                    found.append((kind_entry.name, plugin, path, entry.path, []))
+
+    return found
+
+
+def parse_file(file):
+    """Read one component file and extract everything the index stores
+
+    Runs in worker processes, so it returns plain data and never raises.
+    """
+    data = {'frontmatter': None, 'frontmatter_error': None, 'summary': '', 'error': None}
+    content = body = ''
+
+    if file is not None:
+        try:
+            with open(file, 'r', encoding='utf-8') as f:
+                content = body = f.read()
+        except Exception as e:
+            data['error'] = f"Error reading {file}: {e}"
+
+    try:
+        frontmatter, body = parse_frontmatter(content)
+        data['frontmatter'] = frontmatter if isinstance(frontmatter, dict) else None
+    except Exception as e:
+        # The body is still usable for references when only the YAML is broken
+        data['frontmatter_error'] = f"Invalid frontmatter in {file}: {e}"
+
+    for line in body.split('\n'):
+        if line.strip() and not line.startswith('#'):
+            data['summary'] = line.strip()
+            break
+
+    references = scan_references(content)
+    data['sections'] = references.pop('sections')
+    data['references'] = references
+    return data
+
+
+def component_name(kind, path, frontmatter):
+    stem = Path(path).stem if kind != 'skills' else Path(path).name
+    if kind == 'agents' and frontmatter and frontmatter.get('name'):
+        return str(frontmatter['name'])
+    return stem
+
+
+class ComponentIndex:
+    """SQLite-backed index of agents, commands and skills per marketplace root"""
+
+    def __init__(self, path=None, enabled=True):
+        self.path = Path(path or os.getenv('COMPONENT_INDEX_PATH') or DEFAULT_PATH)
+        self.enabled = enabled
+        self.stats = {'parsed': 0, 'unchanged': 0, 'removed': 0}
+        self.refreshed = set()
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _db(self):
+        if self._conn is None:
+            if self.enabled:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            else:
+                self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def refresh(self, *roots, workers=None):
+        """Bring the index up to date for these marketplace roots"""
+        # One set of rows per checkout, however the caller spells its path
+        roots = [os.path.realpath(root) for root in roots]
+        workers = workers or os.cpu_count() or 1
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+        try:
+            if pool and len(roots) > 1:
+                walks = dict(zip(roots, pool.map(walk_plugins, roots)))
+            else:
+                walks = {root: walk_plugins(root) for root in roots}
+
+            with self._lock:
+                db = self._db()
+                pending, kept = self._diff(db, walks)
+
+                files = [entry[3] for _, entry, _ in pending]
+                if pool and len(files) >= MIN_PARALLEL_FILES:
+                    # Several files per task keeps pickling overhead below the parsing cost
+                    chunksize = max(1, len(files) // (workers * 4))
+                    parsed = list(pool.map(parse_file, files, chunksize=chunksize))
+                else:
+                    parsed = [parse_file(file) for file in files]
+
+                self._store(db, walks, pending, parsed, kept)
+        finally:
+            if pool:
+                pool.shutdown()
+
+        self.refreshed.update(roots)
+
+    def _diff(self, db, walks):
+        """Split walked entries into ones needing a parse and ones still current"""
+        pending, kept = [], {}
+        for root, entries in walks.items():
+            rows = {
+                row[0]: row[1:]
+                for row in db.execute(
+                    "SELECT path, mtime_ns, size, version FROM components WHERE root = ?", (root,)
+                )
+            }
+            kept[root] = set()
+            for entry in entries:
+                kind, plugin, path, file, parts = entry
+                stat = os.stat(file) if file else None
+                signature = (stat.st_mtime_ns, stat.st_size) if stat else (0, 0)
+                if rows.get(path) == (*signature, INDEX_VERSION):
+                    kept[root].add(path)
+                    continue
+                pending.append((root, entry, signature))
+        return pending, kept
+
+    def _store(self, db, walks, pending, parsed, kept):
+        with db:
+            for (root, (kind, plugin, path, file, parts), (mtime_ns, size)), data in zip(pending, parsed):
+                data['file'] = file
+                db.execute(
+                    "INSERT OR REPLACE INTO components "
+                    "(root, path, kind, plugin, name, mtime_ns, size, version, parts, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (root, path, kind, plugin, component_name(kind, path, data['frontmatter']),
+                     mtime_ns, size, INDEX_VERSION, json.dumps(parts), json.dumps(data)),
+                )
+            self.stats['parsed'] += len(pending)
+
+            for root, entries in walks.items():
+                # Skill layout can change without touching SKILL.md
+                db.executemany(
+                    "UPDATE components SET parts = ? WHERE root = ? AND path = ?",
+                    [(json.dumps(parts), root, path) for kind, _, path, _, parts in entries
+                     if kind == 'skills' and path in kept[root]],
+                )
+                self.stats['unchanged'] += len(kept[root])
+
+                live = {entry[2] for entry in entries}
+                stale = [
+                    (root, row[0]) for row in db.execute("SELECT path FROM components WHERE root = ?", (root,))
+                    if row[0] not in live
+                ]
+                db.executemany("DELETE FROM components WHERE root = ? AND path = ?", stale)
+                self.stats['removed'] += len(stale)
+
+    def components(self, root, kind=None, plugin=None):
+        """Return indexed components under root, refreshing once per process"""
+        root = os.path.realpath(root)
+        if root not in self.refreshed:
+            self.refresh(root)
+
+        query = "SELECT kind, plugin, name, path, mtime_ns, size, parts, data FROM components WHERE root = ?"
+        params = [root]
+        if kind:
+            query += " AND kind = ?"
+            params.append(kind)
+        if plugin:
+            query += " AND plugin = ?"
+            params.append(plugin)
+
+        with self._lock:
+            rows = self._db().execute(query + " ORDER BY path", params).fetchall()
+
+        components = []
+        for kind, plugin, name, path, mtime_ns, size, parts, data in rows:
+            component = json.loads(data)
+            component.update({
+                'kind': kind,
+                'plugin': plugin,
+                'name': name,
+                'path': path,
+                'mtime_ns': mtime_ns,
+                'size': size,
+                'parts': json.loads(parts),
+            })
+            components.append(component)
+        return components
+
+    def by_path(self, root, kind=None):
+        """Return {relative path: component} for lookups by Airtable's File Path"""
+        return {component['path']: component for component in self.components(root, kind=kind)}
+
+
+index = ComponentIndex(enabled=os.getenv('COMPONENT_INDEX', 'on').lower() not in ('off', '0', 'false'))
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Dependency graph over plugins, agents, commands, skills and MCP servers
+
+Packaging a plugin needs more than its agents' direct links. A command
+invokes agents, and those agents use further commands, skills and MCP
+servers. This module builds one graph from the Airtable tables and
+answers transitive questions about it:
+
+- closure(node): everything a node needs, memoized per strongly
+  connected component so each part of the graph is computed once
+- cycles(): groups of components that depend on each other
+- bundle(node): the deduplicated minimal set of components to ship,
+  grouped by kind, plus the other plugins those components come from
+
+Edges come from the linked-record fields (Plugin, Uses Commands, Skills,
+MCP Servers Linked, Invokes Agent). add_file_references() adds the
+invocations found in the markdown files themselves, via the component
+index: subagent_type="..."/Task(agent="...") calls, and the commands and
+skills that command files use.
+
+Usage:
+    from dependency_graph import DependencyGraph
+    graph = DependencyGraph(tables)   # {kind: {record_id: fields}}, as in packaging-data.json
+    graph.add_file_references(marketplace_root)
+    for plugin_id in graph.tables['plugins']:
+        print(graph.bundle(('plugins', plugin_id)))
+
+Nodes are (kind, record_id) tuples, with kind one of KINDS.
+"""
+
+from collections import defaultdict
+
+KINDS = ('plugins', 'agents', 'commands', 'skills', 'mcp_servers')
+
+# Primary name field per kind
+NAME_FIELDS = {
+    'plugins': 'Name',
+    'agents': 'Agent Name',
+    'commands': 'Command Name',
+    'skills': 'Skill Name',
+    'mcp_servers': 'MCP Server Name',
+}
+
+# Linked-record fields that point at something the record needs. Inverse
+# links (Used By Agents, a command's Agents) are left out on purpose.
+DEPENDENCY_FIELDS = {
+    'plugins': (('Agents', 'agents'), ('Commands', 'commands'), ('Skills', 'skills')),
+    'agents': (('Uses Commands', 'commands'), ('Skills', 'skills'), ('MCP Servers Linked', 'mcp_servers')),
+    'commands': (('Invokes Agent', 'agents'),),
+    'skills': (),
+    'mcp_servers': (),
+}
+
+
+class DependencyGraph:
+    """Directed graph of what each component needs, with memoized closures"""
+
+    def __init__(self, tables):
+        """tables maps each kind to {record_id: fields}, as in packaging-data.json"""
+        self.tables = {kind: tables.get(kind, {}) for kind in KINDS}
+        self.edges = defaultdict(set)
+        self.owner = {}
+        self._named_cache = {}
+        self._paths = {}
+        self._closures = None
+        self._components = None
+
+        for kind, records in self.tables.items():
+            for record_id, fields in records.items():
+                node = (kind, record_id)
+                if kind != 'plugins':
+                    plugin_ids = [p for p in fields.get('Plugin', []) if p in self.tables['plugins']]
+                    if plugin_ids:
+                        self.owner[node] = plugin_ids[0]
+                        for plugin_id in plugin_ids:
+                            self.add_edge(('plugins', plugin_id), node)
+                for field, target_kind in DEPENDENCY_FIELDS[kind]:
+                    for target in self._linked(fields.get(field), target_kind):
+                        self.add_edge(node, target)
+
+    def _linked(self, values, kind):
+        """Resolve a linked-record field, which may hold record ids or names"""
+        if not values:
+            return []
+        if isinstance(values, str):
+            values = [v.strip() for v in values.split(',')]
+        resolved = []
+        for value in values:
+            if value in self.tables[kind]:
+                resolved.append((kind, value))
+            else:
+                matches = self._named(kind).get(value, [])
+                if len(matches) == 1:
+                    resolved.append((kind, matches[0]))
+        return resolved
+
+    def _named(self, kind):
+        """{name: [record ids]} for one kind, built on first use"""
+        if kind not in self._named_cache:
+            named = defaultdict(list)
+            for record_id, fields in self.tables[kind].items():
+                named[fields.get(NAME_FIELDS[kind])].append(record_id)
+            self._named_cache[kind] = named
+        return self._named_cache[kind]
+
+    def add_edge(self, source, target):
+        if target not in self.edges[source]:
+            self.edges[source].add(target)
+            self._closures = None
+
+    def name(self, node):
+        kind, record_id = node
+        return self.tables[kind].get(record_id, {}).get(NAME_FIELDS[kind], record_id)
+
+    def add_file_references(self, root, workers=None):
+        """Add invocation edges found in the agent and command files under root
+
+        Records are matched to indexed files by their File Path, so only
+        components that live in this checkout gain edges. Returns the number
+        of edges added.
+        """
+        from component_index import index
+
+        index.refresh(root, workers=workers)
+        for kind, path_field in (('agents', 'File Path'), ('commands', 'File Path'), ('skills', 'Directory Path')):
+            for record_id, fields in self.tables[kind].items():
+                if fields.get(path_field):
+                    self._paths[fields[path_field].rstrip('/')] = (kind, record_id)
+
+        added = 0
+        for component in index.components(root):
+            node = self._paths.get(component['path'])
+            if node is None or node[0] == 'skills':
+                continue
+            references = component['references']
+            plugin = component['plugin']
+
+            targets = [self._resolve('agents', name, plugin) for name in references.get('agents', [])]
+            if node[0] == 'commands':
+                # Agents' own command and skill links are already in Airtable
+                targets += [self._resolve('commands', name, plugin) for name in references['commands']]
+                targets += [self._resolve('commands', f"{plugin}:{name}", plugin)
+                            for name in references['bare_commands']]
+                targets += [self._resolve('skills', name, plugin) for name in references['skills']]
+
+            for target in targets:
+                if target and target != node and target not in self.edges[node]:
+                    self.add_edge(node, target)
+                    added += 1
+        return added
+
+    def _resolve(self, kind, reference, plugin):
+        """Map "plugin:name" or a bare name from a markdown file to a node"""
+        ref_plugin, _, name = reference.strip().lstrip('/').rpartition(':')
+        if kind == 'commands':
+            matches = self._named(kind).get(f"/{ref_plugin or plugin}:{name}", [])
+            return (kind, matches[0]) if len(matches) == 1 else None
+
+        # The file layout settles it when the record's path is known
+        layout = f"plugins/{ref_plugin or plugin}/{kind}/{name}" + ('.md' if kind == 'agents' else '')
+        if layout in self._paths:
+            return self._paths[layout]
+
+        matches = self._named(kind).get(name, [])
+        # A bare name is still unambiguous when only one record has it
+        if not ref_plugin and len(matches) == 1:
+            return (kind, matches[0])
+        return None
+
+    def _compute(self):
+        """Tarjan's algorithm, iteratively; closures fill in as components complete
+
+        Tarjan finishes a strongly connected component only after every
+        component it reaches, so each closure is the union of already-known
+        closures and is computed exactly once.
+        """
+        order, lowlink, on_stack, stack = {}, {}, set(), []
+        component_of, closures, components = {}, [], []
+        nodes = [(kind, record_id) for kind in KINDS for record_id in self.tables[kind]]
+
+        for start in nodes:
+            if start in order:
+                continue
+            work = [(start, iter(self.edges.get(start, ())))]
+            order[start] = lowlink[start] = len(order)
+            stack.append(start)
+            on_stack.add(start)
+
+            while work:
+                node, successors = work[-1]
+                for successor in successors:
+                    if successor not in order:
+                        order[successor] = lowlink[successor] = len(order)
+                        stack.append(successor)
+                        on_stack.add(successor)
+                        work.append((successor, iter(self.edges.get(successor, ()))))
+                        break
+                    if successor in on_stack:
+                        lowlink[node] = min(lowlink[node], order[successor])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+                    if lowlink[node] != order[node]:
+                        continue
+
+                    members = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        members.append(member)
+                        if member == node:
+                            break
+                    component = len(components)
+                    for member in members:
+                        component_of[member] = component
+
+                    closure = set(members)
+                    for member in members:
+                        for successor in self.edges.get(member, ()):
+                            if component_of[successor] != component:
+                                closure |= closures[component_of[successor]]
+                    components.append(members)
+                    closures.append(frozenset(closure))
+
+        self._components = (component_of, components)
+        self._closures = closures
+
+    def closure(self, node):
+        """Every node reachable from node, including itself"""
+        if self._closures is None:
+            self._compute()
+        component_of, _ = self._components
+        if node not in component_of:
+            return frozenset([node])
+        return self._closures[component_of[node]]
+
+    def cycles(self):
+        """Groups of nodes that depend on one another, as lists of nodes"""
+        if self._closures is None:
+            self._compute()
+        _, components = self._components
+        return [
+            sorted(members) for members in components
+            if len(members) > 1 or members[0] in self.edges.get(members[0], ())
+        ]
+
+    def bundle(self, *nodes):
+        """Minimal deduplicated bundle for one or more nodes
+
+        Returns {kind: [names]} for every kind except plugins, plus
+        'requires_plugins': the other plugins whose components are pulled in.
+        """
+        needed = set()
+        for node in nodes:
+            needed |= self.closure(node)
+
+        own_plugins = {record_id for kind, record_id in nodes if kind == 'plugins'}
+        own_plugins |= {self.owner[node] for node in nodes if node in self.owner}
+
+        bundle = {kind: [] for kind in KINDS if kind != 'plugins'}
+        requires = set()
+        for node in needed:
+            kind = node[0]
+            if kind == 'plugins':
+                continue
+            bundle[kind].append(self.name(node))
+            owner = self.owner.get(node)
+            if owner and owner not in own_plugins:
+                requires.add(self.name(('plugins', owner)))
+
+        for names in bundle.values():
+            names.sort(key=str)
+        bundle['requires_plugins'] = sorted(requires)
+        return bundle
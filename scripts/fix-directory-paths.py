@@ -7,6 +7,8 @@ They should be "plugins/{name}" not "{marketplace}/{name}"
 import os
 from pyairtable import Api
 
+from airtable_writer import BatchWriter
+
 # Airtable configuration
 AIRTABLE_TOKEN = os.getenv("AIRTABLE_TOKEN")
 if not AIRTABLE_TOKEN:
@@ -14,9 +16,10 @@ if not AIRTABLE_TOKEN:
     print("   Export it: export AIRTABLE_TOKEN=your_key_here")
     exit(1)
 BASE_ID = "appHbSB7WhT1TxEQb"
+AIRTABLE_ENDPOINT_URL = os.getenv("AIRTABLE_ENDPOINT_URL", "https://api.airtable.com")
 
 # Initialize Airtable API
-api = Api(AIRTABLE_TOKEN)
+api = Api(AIRTABLE_TOKEN, endpoint_url=AIRTABLE_ENDPOINT_URL)
 base = api.base(BASE_ID)
 plugins_table = base.table("Plugins")
 
@@ -50,12 +53,8 @@ for plugin in plugins:
 if updates:
     print(f"\n📝 Updating {len(updates)} records...")
 
-    # Batch update (10 at a time)
-    batch_size = 10
-    for i in range(0, len(updates), batch_size):
-        batch = updates[i:i+batch_size]
-        plugins_table.batch_update(batch)
-        print(f"  Updated {min(i+batch_size, len(updates))}/{len(updates)}")
+    # Batch update (10 per request, pipelined under the rate limit)
+    BatchWriter(plugins_table, "plugins").update(updates)
 
     print("\n✅ All Directory Paths fixed!")
 else:
@@ -9,13 +9,25 @@ This helps identify:
 - Complete dependency tree for packaging
 
 Use this to create reusable "bundles" for other projects.
+
+Plugin reports can also be streamed as JSON, one plugin at a time:
+    python3 generate-package-report.py plugin [name] --format json
+
+Bundles follow dependencies transitively (commands invoke agents, which use
+further commands, skills and MCP servers; see dependency_graph.py).
+--from-export reads packaging-data.json instead of Airtable.
 """
 
 import os
 import json
+import sys
+from collections import defaultdict
 from pathlib import Path
 from pyairtable import Api
 
+from airtable_snapshot import snapshot
+from dependency_graph import DependencyGraph
+
 # Airtable configuration
 AIRTABLE_TOKEN = os.getenv("AIRTABLE_TOKEN")
 if not AIRTABLE_TOKEN:
@@ -23,9 +35,10 @@ if not AIRTABLE_TOKEN:
     print("   Export it: export AIRTABLE_TOKEN=your_key_here")
     exit(1)
 BASE_ID = "appHbSB7WhT1TxEQb"
+AIRTABLE_ENDPOINT_URL = os.getenv("AIRTABLE_ENDPOINT_URL", "https://api.airtable.com")
 
 # Initialize Airtable API
-api = Api(AIRTABLE_TOKEN)
+api = Api(AIRTABLE_TOKEN, endpoint_url=AIRTABLE_ENDPOINT_URL)
 base = api.base(BASE_ID)
 agents_table = base.table("Agents")
 commands_table = base.table("Commands")
@@ -33,75 +46,137 @@ skills_table = base.table("Skills")
 mcp_servers_table = base.table("MCP Servers")
 plugins_table = base.table("Plugins")
 
+EXPORT_FILE = Path("packaging-data.json")
+MARKETPLACE_DIR = Path(__file__).parent.parent
+
 def get_all_mcp_servers():
     """Get list of all available MCP servers"""
-    servers = mcp_servers_table.all()
+    servers = snapshot.all(mcp_servers_table)
     return {rec['id']: rec['fields'] for rec in servers}
 
 def get_all_skills():
     """Get list of all available skills"""
-    skills = skills_table.all()
+    skills = snapshot.all(skills_table)
     return {rec['id']: rec['fields'] for rec in skills}
 
 def get_all_commands():
     """Get list of all available commands"""
-    commands = commands_table.all()
+    commands = snapshot.all(commands_table)
     return {rec['id']: rec['fields'] for rec in commands}
 
 def get_all_agents():
     """Get list of all agents with dependencies"""
-    agents = agents_table.all()
+    agents = snapshot.all(agents_table)
     return {rec['id']: rec['fields'] for rec in agents}
 
 def get_all_plugins():
     """Get list of all plugins"""
-    plugins = plugins_table.all()
+    plugins = snapshot.all(plugins_table)
     return {rec['id']: rec['fields'] for rec in plugins}
 
-def build_agent_package(agent_id, agent_data, all_commands, all_skills, all_mcps):
+def load_packaging_data(from_export=False):
+    """Fetch every table once (or read the last export) and build the indexes the reports share"""
+    if from_export:
+        with open(EXPORT_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    else:
+        data = {
+            'mcp_servers': get_all_mcp_servers(),
+            'skills': get_all_skills(),
+            'commands': get_all_commands(),
+            'agents': get_all_agents(),
+            'plugins': get_all_plugins(),
+        }
+    data.update(build_indexes(data))
+    return data
+
+def load_dependency_graph(data):
+    """Dependency graph over the tables plus the invocations in this checkout's markdown"""
+    graph = DependencyGraph(data)
+    graph.add_file_references(MARKETPLACE_DIR)
+    return graph
+
+def build_indexes(data):
+    """Build plugin→agents and agent→dependency indexes in one pass over each table
+
+    Each command, skill and MCP server is summarized once, however many
+    agents link to it, and each plugin's agents come from a lookup instead
+    of a scan over every agent.
+    """
+    command_entries = {
+        cmd_id: {
+            'name': cmd.get('Command Name'),
+            'description': cmd.get('Description', '')
+        }
+        for cmd_id, cmd in data['commands'].items()
+    }
+    skill_entries = {
+        skill_id: {
+            'name': skill.get('Skill Name'),
+            'description': skill.get('Description', ''),
+            'has_scripts': skill.get('Has Scripts', False),
+            'has_templates': skill.get('Has Templates', False),
+        }
+        for skill_id, skill in data['skills'].items()
+    }
+    mcp_entries = {
+        mcp_id: {
+            'name': mcp.get('MCP Server Name'),
+            'description': mcp.get('Description', ''),
+            'purpose': mcp.get('Purpose', '')
+        }
+        for mcp_id, mcp in data['mcp_servers'].items()
+    }
+
+    plugin_agents = defaultdict(list)
+    agent_dependencies = {}
+    for agent_id, agent_data in data['agents'].items():
+        for plugin_id in agent_data.get('Plugin', []):
+            plugin_agents[plugin_id].append(agent_id)
+
+        # Links to records that no longer exist are dropped, as before
+        agent_dependencies[agent_id] = {
+            'commands': [cmd_id for cmd_id in agent_data.get('Uses Commands', []) if cmd_id in command_entries],
+            'skills': [skill_id for skill_id in agent_data.get('Skills', []) if skill_id in skill_entries],
+            'mcp_servers': [mcp_id for mcp_id in agent_data.get('MCP Servers Linked', []) if mcp_id in mcp_entries],
+        }
+
+    for agent_ids in plugin_agents.values():
+        agent_ids.sort(key=lambda agent_id: data['agents'][agent_id].get('Agent Name', ''))
+
+    return {
+        'plugin_agents': plugin_agents,
+        'agent_dependencies': agent_dependencies,
+        'entries': {
+            'commands': command_entries,
+            'skills': skill_entries,
+            'mcp_servers': mcp_entries,
+        },
+    }
+
+def build_agent_package(agent_id, agent_data, data):
     """Build complete package info for an agent"""
-    package = {
+    dependencies = data['agent_dependencies'][agent_id]
+    entries = data['entries']
+    return {
         'agent_name': agent_data.get('Agent Name'),
         'description': agent_data.get('Purpose', ''),
         'file_path': agent_data.get('File Path', ''),
         'dependencies': {
-            'commands': [],
-            'skills': [],
-            'mcp_servers': []
+            kind: [entries[kind][record_id] for record_id in record_ids]
+            for kind, record_ids in dependencies.items()
         }
     }
 
-    # Get commands this agent uses
-    uses_commands = agent_data.get('Uses Commands', [])
-    for cmd_id in uses_commands:
-        if cmd_id in all_commands:
-            package['dependencies']['commands'].append({
-                'name': all_commands[cmd_id].get('Command Name'),
-                'description': all_commands[cmd_id].get('Description', '')
-            })
-
-    # Get skills this agent uses
-    skills_used = agent_data.get('Skills', [])
-    for skill_id in skills_used:
-        if skill_id in all_skills:
-            package['dependencies']['skills'].append({
-                'name': all_skills[skill_id].get('Skill Name'),
-                'description': all_skills[skill_id].get('Description', ''),
-                'has_scripts': all_skills[skill_id].get('Has Scripts', False),
-                'has_templates': all_skills[skill_id].get('Has Templates', False),
-            })
-
-    # Get MCP servers this agent uses
-    mcp_servers = agent_data.get('MCP Servers Linked', [])
-    for mcp_id in mcp_servers:
-        if mcp_id in all_mcps:
-            package['dependencies']['mcp_servers'].append({
-                'name': all_mcps[mcp_id].get('MCP Server Name'),
-                'description': all_mcps[mcp_id].get('Description', ''),
-                'purpose': all_mcps[mcp_id].get('Purpose', '')
-            })
-
-    return package
+def select_plugins(all_plugins, plugin_filter=None):
+    """Plugins whose name contains plugin_filter, sorted by name"""
+    return sorted(
+        (
+            (plugin_id, plugin_data) for plugin_id, plugin_data in all_plugins.items()
+            if plugin_filter is None or plugin_filter in plugin_data.get('Name', '')
+        ),
+        key=lambda x: x[1].get('Name', ''),
+    )
 
 def generate_all_mcp_list():
     """Generate list of all MCP servers"""
@@ -125,28 +200,21 @@ def generate_all_mcp_list():
 
     return servers
 
-def generate_plugin_packages(plugin_filter=None):
+def generate_plugin_packages(plugin_filter=None, output_format='text', from_export=False):
     """Generate packaging report for plugins"""
+    data = load_packaging_data(from_export)
+    plugins_to_process = select_plugins(data['plugins'], plugin_filter)
+
+    if output_format == 'json':
+        stream_plugin_packages(plugins_to_process, data, load_dependency_graph(data), sys.stdout)
+        return
+
     print("\n" + "="*80)
     print("PLUGIN PACKAGING REPORT")
     print("="*80)
 
-    # Get all data
-    all_mcps = get_all_mcp_servers()
-    all_skills = get_all_skills()
-    all_commands = get_all_commands()
-    all_agents = get_all_agents()
-    all_plugins = get_all_plugins()
-
-    # Filter plugins if specified
-    plugins_to_process = {}
-    for plugin_id, plugin_data in all_plugins.items():
-        plugin_name = plugin_data.get('Name', '')
-        if plugin_filter is None or plugin_filter in plugin_name:
-            plugins_to_process[plugin_id] = plugin_data
-
     # Process each plugin
-    for plugin_id, plugin_data in sorted(plugins_to_process.items(), key=lambda x: x[1].get('Name', '')):
+    for plugin_id, plugin_data in plugins_to_process:
         plugin_name = plugin_data.get('Name')
 
         print(f"\n{'='*80}")
@@ -154,17 +222,13 @@ def generate_plugin_packages(plugin_filter=None):
         print(f"{'='*80}")
 
         # Get agents in this plugin
-        plugin_agents = []
-        for agent_id, agent_data in all_agents.items():
-            agent_plugin_ids = agent_data.get('Plugin', [])
-            if plugin_id in agent_plugin_ids:
-                plugin_agents.append((agent_id, agent_data))
+        plugin_agents = data['plugin_agents'].get(plugin_id, [])
 
         print(f"\n📊 Total Agents: {len(plugin_agents)}\n")
 
         # Build package for each agent
-        for agent_id, agent_data in sorted(plugin_agents, key=lambda x: x[1].get('Agent Name', '')):
-            package = build_agent_package(agent_id, agent_data, all_commands, all_skills, all_mcps)
+        for agent_id in plugin_agents:
+            package = build_agent_package(agent_id, data['agents'][agent_id], data)
 
             print(f"🤖 {package['agent_name']}")
             print(f"   {package['description'][:100]}...")
@@ -192,7 +256,65 @@ def generate_plugin_packages(plugin_filter=None):
 
             print()
 
-def generate_deployment_package():
+def stream_plugin_packages(plugins_to_process, data, graph, out):
+    """Write the plugin dependency report as JSON, one plugin at a time
+
+    Each plugin's bundle is its transitive closure from the dependency
+    graph, deduplicated; dependency cycles are listed after the plugins.
+    """
+    out.write('{"plugins": [')
+    for position, (plugin_id, plugin_data) in enumerate(plugins_to_process):
+        plugin_report = {
+            'plugin_name': plugin_data.get('Name'),
+            'description': plugin_data.get('Description', ''),
+            'agents': [
+                build_agent_package(agent_id, data['agents'][agent_id], data)
+                for agent_id in data['plugin_agents'].get(plugin_id, [])
+            ],
+            'bundle': graph.bundle(('plugins', plugin_id)),
+        }
+        out.write(('\n  ' if position == 0 else ',\n  ') + json.dumps(plugin_report))
+        out.flush()
+    cycles = [[graph.name(node) for node in cycle] for cycle in graph.cycles()]
+    out.write('\n], "cycles": ' + json.dumps(cycles) + '}\n')
+
+def generate_bundles(plugin_filter=None, output_format='text', from_export=False):
+    """Report the minimal transitive bundle for each plugin and any dependency cycles"""
+    data = load_packaging_data(from_export)
+    graph = load_dependency_graph(data)
+    plugins_to_process = select_plugins(data['plugins'], plugin_filter)
+
+    bundles = {
+        plugin_data.get('Name'): graph.bundle(('plugins', plugin_id))
+        for plugin_id, plugin_data in plugins_to_process
+    }
+    cycles = [[graph.name(node) for node in cycle] for cycle in graph.cycles()]
+
+    if output_format == 'json':
+        json.dump({'bundles': bundles, 'cycles': cycles}, sys.stdout, indent=2)
+        print()
+        return
+
+    print("\n" + "="*80)
+    print("PLUGIN BUNDLES (TRANSITIVE)")
+    print("="*80)
+
+    for plugin_name, bundle in bundles.items():
+        if not any(bundle[kind] for kind in ('agents', 'commands', 'skills', 'mcp_servers')):
+            continue
+
+        print(f"\n📦 {plugin_name}")
+        print(f"   • {len(bundle['agents'])} agents, {len(bundle['commands'])} commands, "
+              f"{len(bundle['skills'])} skills, {len(bundle['mcp_servers'])} MCP servers")
+        if bundle['requires_plugins']:
+            print(f"   • Pulls from: {', '.join(bundle['requires_plugins'])}")
+
+    if cycles:
+        print(f"\n🔁 Dependency Cycles ({len(cycles)}):")
+        for cycle in cycles:
+            print(f"   • {' ↔ '.join(cycle)}")
+
+def generate_deployment_package(from_export=False):
     """Generate special report for deployment plugin (most likely to be reused)"""
     print("\n" + "="*80)
     print("DEPLOYMENT PLUGIN - REUSABLE PACKAGE")
@@ -200,11 +322,8 @@ def generate_deployment_package():
     print("\nThis package can be copied to any project for deployment capabilities\n")
 
     # Get all data
-    all_mcps = get_all_mcp_servers()
-    all_skills = get_all_skills()
-    all_commands = get_all_commands()
-    all_agents = get_all_agents()
-    all_plugins = get_all_plugins()
+    data = load_packaging_data(from_export)
+    all_plugins = data['plugins']
 
     # Find deployment plugin
     deployment_plugin_id = None
@@ -217,44 +336,31 @@ def generate_deployment_package():
         print("⚠️  Deployment plugin not found")
         return
 
-    # Collect all dependencies
-    all_mcps_needed = set()
-    all_skills_needed = set()
-    all_commands_needed = set()
-
-    # Get agents in deployment plugin
-    deployment_agents = []
-    for agent_id, agent_data in all_agents.items():
-        agent_plugin_ids = agent_data.get('Plugin', [])
-        if deployment_plugin_id in agent_plugin_ids:
-            deployment_agents.append((agent_id, agent_data))
-
-            # Collect dependencies
-            all_mcps_needed.update(agent_data.get('MCP Servers Linked', []))
-            all_skills_needed.update(agent_data.get('Skills', []))
-            all_commands_needed.update(agent_data.get('Uses Commands', []))
+    # Everything the plugin needs, following commands into the agents they invoke
+    bundle = load_dependency_graph(data).bundle(('plugins', deployment_plugin_id))
 
     print(f"📦 Package Contents:")
-    print(f"   • {len(deployment_agents)} agents")
-    print(f"   • {len(all_commands_needed)} commands")
-    print(f"   • {len(all_skills_needed)} skills")
-    print(f"   • {len(all_mcps_needed)} MCP servers")
+    print(f"   • {len(bundle['agents'])} agents")
+    print(f"   • {len(bundle['commands'])} commands")
+    print(f"   • {len(bundle['skills'])} skills")
+    print(f"   • {len(bundle['mcp_servers'])} MCP servers")
 
     print(f"\n🔌 Required MCP Servers:")
-    for mcp_id in sorted(all_mcps_needed):
-        if mcp_id in all_mcps:
-            print(f"   • {all_mcps[mcp_id].get('MCP Server Name')}")
+    for mcp_name in bundle['mcp_servers']:
+        print(f"   • {mcp_name}")
 
     print(f"\n🎯 Required Skills:")
-    for skill_id in sorted(all_skills_needed):
-        if skill_id in all_skills:
-            skill_name = all_skills[skill_id].get('Skill Name')
-            print(f"   • {skill_name}")
+    for skill_name in bundle['skills']:
+        print(f"   • {skill_name}")
 
     print(f"\n📋 Required Commands:")
-    for cmd_id in sorted(all_commands_needed):
-        if cmd_id in all_commands:
-            print(f"   • {all_commands[cmd_id].get('Command Name')}")
+    for cmd_name in bundle['commands']:
+        print(f"   • {cmd_name}")
+
+    if bundle['requires_plugins']:
+        print(f"\n🧩 Pulls Components From:")
+        for plugin_name in bundle['requires_plugins']:
+            print(f"   • {plugin_name}")
 
     print(f"\n📝 Installation Instructions:")
     print(f"   1. Copy plugins/deployment/ directory")
@@ -289,10 +395,28 @@ def generate_json_export():
     return output_file
 
 if __name__ == "__main__":
-    import sys
+    args = sys.argv[1:]
+    output_format = 'text'
+    for position, arg in enumerate(args):
+        if arg.startswith('--format='):
+            output_format = arg.split('=', 1)[1]
+            del args[position]
+            break
+        if arg == '--format' and position + 1 < len(args):
+            output_format = args[position + 1]
+            del args[position:position + 2]
+            break
+
+    from_export = '--from-export' in args
+    if from_export:
+        args.remove('--from-export')
 
-    if len(sys.argv) > 1:
-        command = sys.argv[1]
+    if output_format not in ('text', 'json'):
+        print(f"❌ Unknown format: {output_format} (expected text or json)")
+        exit(1)
+
+    if args:
+        command = args[0]
 
         if command == "mcp-list":
             # List all MCP servers
@@ -300,12 +424,19 @@ if __name__ == "__main__":
 
         elif command == "plugin":
             # Generate report for specific plugin
-            plugin_name = sys.argv[2] if len(sys.argv) > 2 else None
-            generate_plugin_packages(plugin_filter=plugin_name)
+            plugin_name = args[1] if len(args) > 1 else None
+            generate_plugin_packages(plugin_filter=plugin_name, output_format=output_format,
+                                     from_export=from_export)
+
+        elif command == "bundle":
+            # Transitive bundles and dependency cycles
+            plugin_name = args[1] if len(args) > 1 else None
+            generate_bundles(plugin_filter=plugin_name, output_format=output_format,
+                             from_export=from_export)
 
         elif command == "deployment":
             # Generate deployment package report
-            generate_deployment_package()
+            generate_deployment_package(from_export=from_export)
 
         elif command == "export":
             # Export JSON
@@ -315,6 +446,7 @@ if __name__ == "__main__":
             # Generate all reports
             generate_all_mcp_list()
             generate_plugin_packages()
+            generate_bundles()
             generate_deployment_package()
             generate_json_export()
 
@@ -323,9 +455,12 @@ if __name__ == "__main__":
             print("\nUsage:")
             print("  python3 generate-package-report.py mcp-list      # List all MCP servers")
             print("  python3 generate-package-report.py plugin [name] # Report for plugin")
+            print("      [--format json]                              # Stream plugin report as JSON")
+            print("  python3 generate-package-report.py bundle [name] # Transitive bundles and cycles")
             print("  python3 generate-package-report.py deployment    # Deployment package")
             print("  python3 generate-package-report.py export        # Export JSON")
             print("  python3 generate-package-report.py all           # All reports")
+            print("\n  --from-export reads packaging-data.json instead of Airtable")
     else:
         # Default: show deployment package (most useful)
-        generate_deployment_package()
+        generate_deployment_package(from_export=from_export)
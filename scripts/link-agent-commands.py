@@ -5,10 +5,12 @@ Reads agent files to find slash command references
 """
 
 import os
-import re
-from pathlib import Path
 from pyairtable import Api
 
+from airtable_snapshot import snapshot
+from airtable_writer import BatchWriter
+from component_index import index
+
 # Airtable configuration
 AIRTABLE_TOKEN = os.getenv("AIRTABLE_TOKEN")
 if not AIRTABLE_TOKEN:
@@ -16,9 +18,10 @@ if not AIRTABLE_TOKEN:
     print("   Export it: export AIRTABLE_TOKEN=your_key_here")
     exit(1)
 BASE_ID = "appHbSB7WhT1TxEQb"
+AIRTABLE_ENDPOINT_URL = os.getenv("AIRTABLE_ENDPOINT_URL", "https://api.airtable.com")
 
 # Initialize Airtable API
-api = Api(AIRTABLE_TOKEN)
+api = Api(AIRTABLE_TOKEN, endpoint_url=AIRTABLE_ENDPOINT_URL)
 base = api.base(BASE_ID)
 agents_table = base.table("Agents")
 commands_table = base.table("Commands")
@@ -27,25 +30,12 @@ MARKETPLACES = {
     "dev-lifecycle": "/home/gotime2022/.claude/plugins/marketplaces/dev-lifecycle-marketplace",
 }
 
-def extract_slash_commands(content):
-    """Extract slash command references from content"""
-    # Pattern: /plugin:command or SlashCommand(/plugin:command)
-    patterns = [
-        r'/([a-z0-9-]+:[a-z0-9-]+)',
-        r'SlashCommand\(/([a-z0-9-]+:[a-z0-9-]+)\)',
-    ]
-    commands = set()
-    for pattern in patterns:
-        matches = re.findall(pattern, content)
-        commands.update(matches)
-    return list(commands)
-
 def link_agent_commands():
     """Link agents to commands they reference"""
     print("🔗 Linking agents to commands...")
 
     # Get all commands and create name→ID mapping
-    command_records = commands_table.all()
+    command_records = snapshot.all(commands_table)
     command_map = {}
     for rec in command_records:
         cmd_name = rec['fields'].get('Command Name', '')
@@ -59,9 +49,12 @@ def link_agent_commands():
     print(f"📊 Found {len(command_records)} commands")
 
     # Get all agents
-    agent_records = agents_table.all()
+    agent_records = snapshot.all(agents_table)
     print(f"📊 Found {len(agent_records)} agents")
 
+    # Agent files by relative path, re-parsed only where they changed
+    agent_files = index.by_path(MARKETPLACES["dev-lifecycle"], kind='agents')
+
     # Process each agent
     updates = []
     for agent_rec in agent_records:
@@ -72,20 +65,17 @@ def link_agent_commands():
         if not file_path:
             continue
 
-        # Read agent file
-        full_path = Path(MARKETPLACES["dev-lifecycle"]) / file_path
-        if not full_path.exists():
+        # Look up the indexed agent file
+        agent_file = agent_files.get(file_path)
+        if not agent_file:
             continue
 
-        try:
-            with open(full_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except Exception as e:
-            print(f"  ⚠️  {agent_name}: Error reading file: {e}")
+        if agent_file['error']:
+            print(f"  ⚠️  {agent_name}: {agent_file['error']}")
             continue
 
-        # Extract slash commands
-        slash_commands = extract_slash_commands(content)
+        # Slash commands referenced by the agent
+        slash_commands = agent_file['references']['commands']
 
         if not slash_commands:
             continue
@@ -114,11 +104,7 @@ def link_agent_commands():
     # Batch update
     if updates:
         print(f"\n📝 Updating {len(updates)} agents...")
-        batch_size = 10
-        for i in range(0, len(updates), batch_size):
-            batch = updates[i:i+batch_size]
-            agents_table.batch_update(batch)
-            print(f"  ✓ Updated {min(i+batch_size, len(updates))}/{len(updates)} agents")
+        BatchWriter(agents_table, "agents").update(updates)
     else:
         print("✓ No agent-command links to create")
 
@@ -5,10 +5,12 @@ Reads agent files to find Skill() invocations
 """
 
 import os
-import re
-from pathlib import Path
 from pyairtable import Api
 
+from airtable_snapshot import snapshot
+from airtable_writer import BatchWriter
+from component_index import index
+
 # Airtable configuration
 AIRTABLE_TOKEN = os.getenv("AIRTABLE_TOKEN")
 if not AIRTABLE_TOKEN:
@@ -16,9 +18,10 @@ if not AIRTABLE_TOKEN:
     print("   Export it: export AIRTABLE_TOKEN=your_key_here")
     exit(1)
 BASE_ID = "appHbSB7WhT1TxEQb"
+AIRTABLE_ENDPOINT_URL = os.getenv("AIRTABLE_ENDPOINT_URL", "https://api.airtable.com")
 
 # Initialize Airtable API
-api = Api(AIRTABLE_TOKEN)
+api = Api(AIRTABLE_TOKEN, endpoint_url=AIRTABLE_ENDPOINT_URL)
 base = api.base(BASE_ID)
 agents_table = base.table("Agents")
 skills_table = base.table("Skills")
@@ -27,19 +30,12 @@ MARKETPLACES = {
     "dev-lifecycle": "/home/gotime2022/.claude/plugins/marketplaces/dev-lifecycle-marketplace",
 }
 
-def extract_skills(content):
-    """Extract skill references from content"""
-    # Pattern: Skill(plugin:skill-name)
-    pattern = r'Skill\(([a-z0-9-]+:[a-z0-9-]+)\)'
-    matches = re.findall(pattern, content)
-    return list(set(matches))
-
 def link_agent_skills():
     """Link agents to skills they reference"""
     print("🔗 Linking agents to skills...")
 
     # Get all skills and create name→ID mapping
-    skill_records = skills_table.all()
+    skill_records = snapshot.all(skills_table)
     skill_map = {}
     for rec in skill_records:
         skill_name = rec['fields'].get('Skill Name', '')
@@ -49,9 +45,12 @@ def link_agent_skills():
     print(f"📊 Found {len(skill_records)} skills")
 
     # Get all agents
-    agent_records = agents_table.all()
+    agent_records = snapshot.all(agents_table)
     print(f"📊 Found {len(agent_records)} agents")
 
+    # Agent files by relative path, re-parsed only where they changed
+    agent_files = index.by_path(MARKETPLACES["dev-lifecycle"], kind='agents')
+
     # Process each agent
     updates = []
     for agent_rec in agent_records:
@@ -62,20 +61,17 @@ def link_agent_skills():
         if not file_path:
             continue
 
-        # Read agent file
-        full_path = Path(MARKETPLACES["dev-lifecycle"]) / file_path
-        if not full_path.exists():
+        # Look up the indexed agent file
+        agent_file = agent_files.get(file_path)
+        if not agent_file:
             continue
 
-        try:
-            with open(full_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except Exception as e:
-            print(f"  ⚠️  {agent_name}: Error reading file: {e}")
+        if agent_file['error']:
+            print(f"  ⚠️  {agent_name}: {agent_file['error']}")
             continue
 
-        # Extract skills
-        skill_refs = extract_skills(content)
+        # Skills referenced by the agent
+        skill_refs = agent_file['references']['skills']
 
         if not skill_refs:
             continue
@@ -107,11 +103,7 @@ def link_agent_skills():
     # Batch update
     if updates:
         print(f"\n📝 Updating {len(updates)} agents...")
-        batch_size = 10
-        for i in range(0, len(updates), batch_size):
-            batch = updates[i:i+batch_size]
-            agents_table.batch_update(batch)
-            print(f"  ✓ Updated {min(i+batch_size, len(updates))}/{len(updates)} agents")
+        BatchWriter(agents_table, "agents").update(updates)
     else:
         print("✓ No agent-skill links to create")
 
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Shared YAML frontmatter parser for marketplace markdown files
+
+Agents, commands and SKILL.md files all start with a `---` delimited YAML
+block. Scanning thousands of them should cost a few small reads, so this
+module:
+
+- Reads only up to the closing `---`, never the body
+- Uses libyaml's CSafeLoader when PyYAML was built with it
+- Memoizes results by (path, mtime, size), so repeated scans in one
+  process only re-parse files that changed
+
+Usage:
+    from markdown_frontmatter import read_frontmatter, parse_frontmatter
+    frontmatter = read_frontmatter(agent_file)          # dict or None
+    frontmatter, body = parse_frontmatter(content)     # already-read text
+"""
+
+import os
+import threading
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+DELIMITER = "---"
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def quote_argument_hint(line):
+    """Quote unquoted argument-hint values such as `[name] <path>`
+
+    Square brackets would otherwise be read as a YAML flow sequence and
+    fail on the trailing text.
+    """
+    if 'argument-hint:' in line and '[' in line:
+        if not (line.strip().endswith('"') or line.strip().endswith("'")):
+            key, value = line.split(':', 1)
+            return f'{key}: "{value.strip()}"'
+    return line
+
+
+def load_yaml(lines):
+    """Parse frontmatter lines (without delimiters) into a dict"""
+    return yaml.load("\n".join(quote_argument_hint(line) for line in lines), Loader=SafeLoader)
+
+
+def read_frontmatter(file_path):
+    """Return the parsed frontmatter of a markdown file, or None if it has none
+
+    Raises OSError/UnicodeDecodeError for unreadable files and yaml.YAMLError
+    for malformed frontmatter; callers decide how loudly to report those.
+    """
+    stat = os.stat(file_path)
+    key = (os.fspath(file_path), stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        if key in _cache:
+            cached = _cache[key]
+            return dict(cached) if isinstance(cached, dict) else cached
+
+    lines = []
+    closed = False
+    with open(file_path, 'r', encoding='utf-8') as f:
+        if f.readline().rstrip() != DELIMITER:
+            return None
+        for line in f:
+            if line.rstrip() == DELIMITER:
+                closed = True
+                break
+            lines.append(line.rstrip('\n'))
+
+    frontmatter = load_yaml(lines) if closed else None
+
+    with _cache_lock:
+        _cache[key] = frontmatter
+    return dict(frontmatter) if isinstance(frontmatter, dict) else frontmatter
+
+
+def parse_frontmatter(content):
+    """Split already-read markdown into (frontmatter dict or None, body)"""
+    lines = content.split('\n')
+    if not lines or lines[0].rstrip() != DELIMITER:
+        return None, content
+
+    for index, line in enumerate(lines[1:], start=1):
+        if line.rstrip() == DELIMITER:
+            return load_yaml(lines[1:index]), '\n'.join(lines[index + 1:])
+
+    return None, content
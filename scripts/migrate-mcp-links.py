@@ -6,6 +6,9 @@ Migrate MCP Servers from multi-select to linked records
 import os
 from pyairtable import Api
 
+from airtable_snapshot import snapshot
+from airtable_writer import BatchWriter
+
 # Airtable configuration
 AIRTABLE_TOKEN = os.getenv("AIRTABLE_TOKEN")
 if not AIRTABLE_TOKEN:
@@ -13,9 +16,10 @@ if not AIRTABLE_TOKEN:
     print("   Export it: export AIRTABLE_TOKEN=your_key_here")
     exit(1)
 BASE_ID = "appHbSB7WhT1TxEQb"
+AIRTABLE_ENDPOINT_URL = os.getenv("AIRTABLE_ENDPOINT_URL", "https://api.airtable.com")
 
 # Initialize Airtable API
-api = Api(AIRTABLE_TOKEN)
+api = Api(AIRTABLE_TOKEN, endpoint_url=AIRTABLE_ENDPOINT_URL)
 base = api.base(BASE_ID)
 agents_table = base.table("Agents")
 mcp_servers_table = base.table("MCP Servers")
@@ -25,12 +29,12 @@ def migrate_mcp_links():
     print("🔄 Migrating MCP Server links...")
 
     # Get all MCP Server records to create name→ID mapping
-    mcp_records = mcp_servers_table.all()
+    mcp_records = snapshot.all(mcp_servers_table)
     mcp_map = {rec['fields']['MCP Server Name']: rec['id'] for rec in mcp_records}
     print(f"📊 Found {len(mcp_map)} MCP servers")
 
     # Get all agents
-    agents = agents_table.all()
+    agents = snapshot.all(agents_table)
     print(f"📊 Found {len(agents)} agents")
 
     # Migrate each agent
@@ -65,11 +69,7 @@ def migrate_mcp_links():
     # Batch update
     if updates:
         print(f"\n📝 Updating {len(updates)} agents...")
-        batch_size = 10
-        for i in range(0, len(updates), batch_size):
-            batch = updates[i:i+batch_size]
-            agents_table.batch_update(batch)
-            print(f"  ✓ Updated {min(i+batch_size, len(updates))}/{len(updates)} agents")
+        BatchWriter(agents_table, "agents").update(updates)
     else:
         print("✓ No agents to update")
 
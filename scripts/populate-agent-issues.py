@@ -9,6 +9,8 @@ import re
 from pathlib import Path
 from pyairtable import Api
 
+from airtable_snapshot import snapshot
+
 # Airtable configuration
 AIRTABLE_TOKEN = os.getenv("AIRTABLE_TOKEN")
 if not AIRTABLE_TOKEN:
@@ -16,9 +18,10 @@ if not AIRTABLE_TOKEN:
     print("   Export it: export AIRTABLE_TOKEN=your_key_here")
     exit(1)
 BASE_ID = "appHbSB7WhT1TxEQb"
+AIRTABLE_ENDPOINT_URL = os.getenv("AIRTABLE_ENDPOINT_URL", "https://api.airtable.com")
 
 # Initialize Airtable API
-api = Api(AIRTABLE_TOKEN)
+api = Api(AIRTABLE_TOKEN, endpoint_url=AIRTABLE_ENDPOINT_URL)
 base = api.base(BASE_ID)
 agents_table = base.table("Agents")
 
@@ -137,6 +140,8 @@ def main():
                 # Try to create the field if it doesn't exist
                 print(f"  Note: If 'Issues' field doesn't exist, create it manually as Multi-select")
                 return
+            finally:
+                snapshot.mark_stale(agents_table)
 
         print("\n✅ All agents tagged with issues!")
     else:
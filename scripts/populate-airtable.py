@@ -6,10 +6,12 @@ Extracts data from actual plugin files and creates records with relationships
 
 import os
 import json
-import re
 from pathlib import Path
 from pyairtable import Api
 
+from airtable_writer import BatchWriter
+from component_index import index
+
 # Airtable configuration
 AIRTABLE_TOKEN = os.getenv("AIRTABLE_TOKEN")
 if not AIRTABLE_TOKEN:
@@ -17,9 +19,10 @@ if not AIRTABLE_TOKEN:
     print("   Export it: export AIRTABLE_TOKEN=your_key_here")
     exit(1)
 BASE_ID = "appHbSB7WhT1TxEQb"
+AIRTABLE_ENDPOINT_URL = os.getenv("AIRTABLE_ENDPOINT_URL", "https://api.airtable.com")
 
 # Initialize Airtable API
-api = Api(AIRTABLE_TOKEN)
+api = Api(AIRTABLE_TOKEN, endpoint_url=AIRTABLE_ENDPOINT_URL)
 base = api.base(BASE_ID)
 
 # Table references
@@ -37,69 +40,12 @@ MARKETPLACES = {
     "ai-tech-stack-1": "/home/gotime2022/.claude/plugins/marketplaces/ai-tech-stack-1",
 }
 
-def extract_frontmatter(file_path):
-    """Extract YAML frontmatter from markdown files"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # Match YAML frontmatter between --- markers
-        match = re.match(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
-        if match:
-            frontmatter_text = match.group(1)
-            frontmatter = {}
-            for line in frontmatter_text.split('\n'):
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    frontmatter[key.strip()] = value.strip()
-            return frontmatter, content
-        return {}, content
-    except Exception as e:
-        print(f"Error reading {file_path}: {e}")
-        return {}, ""
-
-def has_section(content, section_name):
-    """Check if markdown content has a specific section"""
-    patterns = [
-        f"## {section_name}",
-        f"### {section_name}",
-        f"**{section_name}**",
-    ]
-    return any(pattern in content for pattern in patterns)
-
-def extract_slash_commands(content):
-    """Extract slash command references from content"""
-    # Pattern: /plugin:command or SlashCommand(/plugin:command)
-    patterns = [
-        r'/([a-z0-9-]+:[a-z0-9-]+)',
-        r'SlashCommand\(/([a-z0-9-]+:[a-z0-9-]+)\)',
-    ]
-    commands = set()
-    for pattern in patterns:
-        matches = re.findall(pattern, content)
-        commands.update(matches)
-    return list(commands)
-
-def extract_mcp_servers(content):
-    """Extract MCP server references from content"""
-    # Pattern: mcp__servername
-    pattern = r'mcp__([a-z0-9_-]+)'
-    matches = re.findall(pattern, content)
-    return list(set([f"mcp__{m}" for m in matches]))
-
-def extract_skills(content):
-    """Extract skill references from content"""
-    # Pattern: Skill(plugin:skill-name)
-    pattern = r'Skill\(([a-z0-9-]+:[a-z0-9-]+)\)'
-    matches = re.findall(pattern, content)
-    return list(set(matches))
+def has_section(component, section_name):
+    """Check if an indexed markdown file has a specific section heading or bold marker"""
+    return any(section.startswith(section_name) for section in component['sections'])
 
 def scan_agents(marketplace_name, plugin_path, plugin_record_id):
     """Scan all agents in a plugin"""
-    agents_dir = Path(plugin_path) / "agents"
-    if not agents_dir.exists():
-        return []
-
     # Valid MCP servers from our predefined list
     VALID_MCP_SERVERS = {
         "mcp__supabase", "mcp__github", "mcp__airtable", "mcp__postman",
@@ -107,25 +53,21 @@ def scan_agents(marketplace_name, plugin_path, plugin_record_id):
     }
 
     agents_data = []
-    for agent_file in agents_dir.glob("*.md"):
-        frontmatter, content = extract_frontmatter(agent_file)
+    for agent in index.components(MARKETPLACES[marketplace_name], kind='agents', plugin=Path(plugin_path).name):
+        frontmatter = agent['frontmatter'] or {}
+        references = agent['references']
 
         # Extract data
-        agent_name = frontmatter.get('name', agent_file.stem)
+        agent_name = agent['name']
         description = frontmatter.get('description', '')
 
         # Check for sections
-        has_slash_cmds = has_section(content, "Slash Commands Available") or has_section(content, "Available Tools & Resources")
-        has_mcp = has_section(content, "MCP Servers Available") or "mcp__" in content
-        has_skills_section = has_section(content, "Skills Available")
-
-        # Extract references
-        slash_commands = extract_slash_commands(content)
-        mcp_servers = extract_mcp_servers(content)
-        skills_used = extract_skills(content)
+        has_slash_cmds = has_section(agent, "Slash Commands Available") or has_section(agent, "Available Tools & Resources")
+        has_mcp = has_section(agent, "MCP Servers Available") or bool(references['mcp_servers'])
+        has_skills_section = has_section(agent, "Skills Available")
 
         # Filter to only valid MCP servers
-        valid_mcps = [m for m in mcp_servers if m in VALID_MCP_SERVERS]
+        valid_mcps = [f"mcp__{m}" for m in references['mcp_servers'] if f"mcp__{m}" in VALID_MCP_SERVERS]
 
         # Determine status
         if has_slash_cmds and has_mcp and has_skills_section:
@@ -138,41 +80,32 @@ def scan_agents(marketplace_name, plugin_path, plugin_record_id):
         agents_data.append({
             "Agent Name": agent_name,
             "Plugin": [plugin_record_id],
-            "File Path": str(agent_file.relative_to(MARKETPLACES[marketplace_name])),
+            "File Path": agent['path'],
             "Purpose": description,
             "Has Slash Commands Section": has_slash_cmds,
             "Has MCP Section": has_mcp,
             "Has Skills Section": has_skills_section,
             "Status": status,
             "MCP Servers": valid_mcps if valid_mcps else [],  # Only valid MCPs
-            "_slash_commands": slash_commands,  # Store for later linking
-            "_skills": skills_used,  # Store for later linking
+            "_slash_commands": references['commands'],  # Store for later linking
+            "_skills": references['skills'],  # Store for later linking
         })
 
     return agents_data
 
 def scan_commands(marketplace_name, plugin_path, plugin_record_id):
     """Scan all commands in a plugin"""
-    commands_dir = Path(plugin_path) / "commands"
-    if not commands_dir.exists():
-        return []
+    plugin_name = Path(plugin_path).name
 
     commands_data = []
-    for cmd_file in commands_dir.glob("*.md"):
-        frontmatter, content = extract_frontmatter(cmd_file)
-
-        # Extract command name from filename
-        command_name = f"/{cmd_file.stem}"
-        if '/' not in cmd_file.stem:
-            # Get plugin name from path
-            plugin_name = Path(plugin_path).name
-            command_name = f"/{plugin_name}:{cmd_file.stem}"
+    for command in index.components(MARKETPLACES[marketplace_name], kind='commands', plugin=plugin_name):
+        frontmatter = command['frontmatter'] or {}
 
         commands_data.append({
-            "Command Name": command_name,
+            "Command Name": f"/{plugin_name}:{command['name']}",
             "Plugin": [plugin_record_id],
             "Description": frontmatter.get('description', ''),
-            "File Path": str(cmd_file.relative_to(MARKETPLACES[marketplace_name])),
+            "File Path": command['path'],
             "Argument Hint": frontmatter.get('argument-hint', ''),
             "Registered in Settings": True,  # Assume registered
         })
@@ -181,43 +114,20 @@ def scan_commands(marketplace_name, plugin_path, plugin_record_id):
 
 def scan_skills(marketplace_name, plugin_path, plugin_record_id):
     """Scan all skills in a plugin"""
-    skills_dir = Path(plugin_path) / "skills"
-    if not skills_dir.exists():
-        return []
-
     skills_data = []
-    for skill_dir in skills_dir.iterdir():
-        if not skill_dir.is_dir():
-            continue
-
-        skill_md = skill_dir / "SKILL.md"
-        has_skill_md = skill_md.exists()
-
-        # Check for subdirectories
-        has_scripts = (skill_dir / "scripts").exists()
-        has_templates = (skill_dir / "templates").exists()
-        has_examples = (skill_dir / "examples").exists()
-
-        # Extract description if SKILL.md exists
-        description = ""
-        if has_skill_md:
-            _, content = extract_frontmatter(skill_md)
-            # Get first paragraph as description
-            lines = content.split('\n')
-            for line in lines:
-                if line.strip() and not line.startswith('#'):
-                    description = line.strip()
-                    break
+    for skill in index.components(MARKETPLACES[marketplace_name], kind='skills', plugin=Path(plugin_path).name):
+        frontmatter = skill['frontmatter'] or {}
 
         skills_data.append({
-            "Skill Name": skill_dir.name,
+            "Skill Name": skill['name'],
             "Plugin": [plugin_record_id],
-            "Description": description,
-            "Directory Path": str(skill_dir.relative_to(MARKETPLACES[marketplace_name])),
-            "Has SKILL.md": has_skill_md,
-            "Has Scripts": has_scripts,
-            "Has Templates": has_templates,
-            "Has Examples": has_examples,
+            # SKILL.md frontmatter description, else its first paragraph
+            "Description": frontmatter.get('description') or skill['summary'],
+            "Directory Path": skill['path'],
+            "Has SKILL.md": "SKILL.md" in skill['parts'],
+            "Has Scripts": "scripts" in skill['parts'],
+            "Has Templates": "templates" in skill['parts'],
+            "Has Examples": "examples" in skill['parts'],
         })
 
     return skills_data
@@ -283,34 +193,19 @@ def populate_all_data():
     # Bulk create agents
     print(f"\n📝 Creating {len(all_agents)} agent records...")
     if all_agents:
-        batch_size = 10
-        for i in range(0, len(all_agents), batch_size):
-            batch = all_agents[i:i+batch_size]
-            # Remove temporary fields
-            clean_batch = []
-            for agent in batch:
-                clean_agent = {k: v for k, v in agent.items() if not k.startswith('_')}
-                clean_batch.append(clean_agent)
-            agents_table.batch_create(clean_batch)
-            print(f"  ✓ Created {min(i+batch_size, len(all_agents))}/{len(all_agents)} agents")
+        # Remove temporary fields
+        clean_agents = [{k: v for k, v in agent.items() if not k.startswith('_')} for agent in all_agents]
+        BatchWriter(agents_table, "agents").create(clean_agents)
 
     # Bulk create commands
     print(f"\n📝 Creating {len(all_commands)} command records...")
     if all_commands:
-        batch_size = 10
-        for i in range(0, len(all_commands), batch_size):
-            batch = all_commands[i:i+batch_size]
-            commands_table.batch_create(batch)
-            print(f"  ✓ Created {min(i+batch_size, len(all_commands))}/{len(all_commands)} commands")
+        BatchWriter(commands_table, "commands").create(all_commands)
 
     # Bulk create skills
     print(f"\n📝 Creating {len(all_skills)} skill records...")
     if all_skills:
-        batch_size = 10
-        for i in range(0, len(all_skills), batch_size):
-            batch = all_skills[i:i+batch_size]
-            skills_table.batch_create(batch)
-            print(f"  ✓ Created {min(i+batch_size, len(all_skills))}/{len(all_skills)} skills")
+        BatchWriter(skills_table, "skills").create(all_skills)
 
     print("\n✅ Population complete!")
     print(f"   📊 Total: {len(all_agents)} agents, {len(all_commands)} commands, {len(all_skills)} skills")
@@ -6,6 +6,8 @@ Populate MCP Servers table with all discovered MCP servers
 import os
 from pyairtable import Api
 
+from airtable_snapshot import snapshot
+
 # Airtable configuration
 AIRTABLE_TOKEN = os.getenv("AIRTABLE_TOKEN")
 if not AIRTABLE_TOKEN:
@@ -13,9 +15,10 @@ if not AIRTABLE_TOKEN:
     print("   Export it: export AIRTABLE_TOKEN=your_key_here")
     exit(1)
 BASE_ID = "appHbSB7WhT1TxEQb"
+AIRTABLE_ENDPOINT_URL = os.getenv("AIRTABLE_ENDPOINT_URL", "https://api.airtable.com")
 
 # Initialize Airtable API
-api = Api(AIRTABLE_TOKEN)
+api = Api(AIRTABLE_TOKEN, endpoint_url=AIRTABLE_ENDPOINT_URL)
 base = api.base(BASE_ID)
 mcp_servers_table = base.table("MCP Servers")
 
@@ -137,7 +140,10 @@ def populate_mcp_servers():
         batch_size = 10
         for i in range(0, len(to_create), batch_size):
             batch = to_create[i:i+batch_size]
-            mcp_servers_table.batch_create(batch) # type: ignore
+            try:
+                mcp_servers_table.batch_create(batch) # type: ignore
+            finally:
+                snapshot.mark_stale(mcp_servers_table)
             print(f"  ✓ Created {min(i+batch_size, len(to_create))}/{len(to_create)} MCP servers")
     else:
         print("✓ All MCP servers already exist")
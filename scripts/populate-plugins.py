@@ -9,6 +9,8 @@ import json
 from pathlib import Path
 from pyairtable import Api
 
+from airtable_snapshot import snapshot
+
 # Airtable configuration
 AIRTABLE_TOKEN = os.getenv("AIRTABLE_TOKEN")
 if not AIRTABLE_TOKEN:
@@ -16,9 +18,10 @@ if not AIRTABLE_TOKEN:
     print("   Export it: export AIRTABLE_TOKEN=your_key_here")
     exit(1)
 BASE_ID = "appHbSB7WhT1TxEQb"
+AIRTABLE_ENDPOINT_URL = os.getenv("AIRTABLE_ENDPOINT_URL", "https://api.airtable.com")
 
 # Initialize Airtable API
-api = Api(AIRTABLE_TOKEN)
+api = Api(AIRTABLE_TOKEN, endpoint_url=AIRTABLE_ENDPOINT_URL)
 base = api.base(BASE_ID)
 marketplaces_table = base.table("Marketplaces")
 plugins_table = base.table("Plugins")
@@ -45,6 +48,7 @@ def get_or_create_marketplace(marketplace_name, marketplace_path):
         'Directory Path': marketplace_path,
         'Description': f"{marketplace_name} marketplace",
     })
+    snapshot.mark_stale(marketplaces_table)
     return record['id']
 
 def populate_plugins_for_marketplace(marketplace_name, marketplace_path, marketplace_id):
@@ -120,6 +124,7 @@ def populate_plugins_for_marketplace(marketplace_name, marketplace_path, marketp
             'Directory Path': f"plugins/{plugin_name}",
             'Status': 'Active',
         })
+        snapshot.mark_stale(plugins_table)
         created_count += 1
 
     print(f"\n  Created: {created_count}")
@@ -2,17 +2,28 @@
 """
 Sync Airtable database to GitHub repository files
 Generates markdown and JSON files from Airtable records
+
+Tables are fetched concurrently. Files are only rewritten when their
+content changed, and a manifest of generated files (with a hash of each
+record's rendered markdown) limits regeneration to the records that
+changed, were renamed or were deleted, so the hourly sync commits minimal
+diffs. Pass --full to regenerate every file.
 """
 
 import os
 import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from pyairtable import Api
 
+from airtable_snapshot import snapshot
+
 # Configuration
 AIRTABLE_TOKEN = os.getenv("AIRTABLE_TOKEN")
 AIRTABLE_BASE_ID = os.getenv("AIRTABLE_BASE_ID", "appHbSB7WhT1TxEQb")
+AIRTABLE_ENDPOINT_URL = os.getenv("AIRTABLE_ENDPOINT_URL", "https://api.airtable.com")
 
 # Output directories
 SYNC_DIR = Path("airtable-sync")
@@ -21,6 +32,16 @@ COMMANDS_DIR = SYNC_DIR / "commands"
 SKILLS_DIR = SYNC_DIR / "skills"
 PLUGINS_DIR = SYNC_DIR / "plugins"
 MCP_SERVERS_DIR = SYNC_DIR / "mcp-servers"
+MANIFEST_FILE = SYNC_DIR / ".sync-manifest.json"
+
+# Tables exported to JSON, fetched concurrently
+TABLES = {
+    "Plugins": SYNC_DIR / "plugins.json",
+    "Agents": SYNC_DIR / "agents.json",
+    "Commands": SYNC_DIR / "commands.json",
+    "Skills": SYNC_DIR / "skills.json",
+    "MCP Servers": SYNC_DIR / "mcp-servers.json",
+}
 
 def setup_directories():
     """Create output directories"""
@@ -36,13 +57,80 @@ def clean_field_value(value):
     else:
         return value
 
-def sync_table_to_json(api, table_name, output_file):
-    """Sync entire table to JSON file"""
+def content_hash(content):
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+def sync_timestamp():
+    return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+
+class SyncManifest:
+    """Hashes of the generated files; files not regenerated in a run are pruned
+
+    Markdown files carry a "Last synced" timestamp, so their hashes are
+    taken over the content rendered without it; a file is only rewritten
+    when something other than the timestamp would change.
+    """
+
+    def __init__(self, path=MANIFEST_FILE, full=False):
+        self.path = path
+        self.data = {"files": {}}
+        if not full:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.data = {"files": json.load(f).get("files", {})}
+            except (OSError, json.JSONDecodeError, AttributeError):
+                pass
+        self.seen = set()
+
+    def unchanged(self, path, digest):
+        self.seen.add(str(path))
+        return self.data["files"].get(str(path)) == digest and Path(path).exists()
+
+    def record(self, path, digest):
+        self.data["files"][str(path)] = digest
+
+    def write(self, path, content, digest=None):
+        """Write content unless the file already holds it; returns True if written"""
+        digest = digest or content_hash(content)
+        if self.unchanged(path, digest):
+            return False
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        self.record(path, digest)
+        return True
+
+    def sync_record(self, path, render):
+        """Regenerate one record's markdown if its content or file name changed"""
+        digest = content_hash(render(""))
+        if self.unchanged(path, digest):
+            return False
+        return self.write(path, render(sync_timestamp()), digest)
+
+    def prune(self):
+        """Delete files of records that were removed or renamed since the last sync"""
+        removed = 0
+        for path in list(self.data["files"]):
+            if path not in self.seen:
+                del self.data["files"][path]
+                if Path(path).exists():
+                    Path(path).unlink()
+                    removed += 1
+        return removed
+
+    def save(self):
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2, sort_keys=True)
+            f.write("\n")
+        os.replace(tmp_path, self.path)
+
+def fetch_table(api, table_name):
+    """Fetch one table with cleaned field values"""
     table = api.table(AIRTABLE_BASE_ID, table_name)
-    records = table.all()
+    records = snapshot.all(table)
 
     # Extract just the fields with cleaned values
-    data = [
+    return [
         {
             "id": record["id"],
             "fields": {k: clean_field_value(v) for k, v in record["fields"].items()}
@@ -50,20 +138,43 @@ def sync_table_to_json(api, table_name, output_file):
         for record in records
     ]
 
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-
-    print(f"✅ Synced {len(data)} records from {table_name} to {output_file}")
+def fetch_tables(api):
+    """Fetch every exported table concurrently"""
+    with ThreadPoolExecutor(max_workers=len(TABLES)) as pool:
+        futures = {table_name: pool.submit(fetch_table, api, table_name) for table_name in TABLES}
+        return {table_name: future.result() for table_name, future in futures.items()}
+
+def sync_table_to_json(table_name, data, output_file, manifest):
+    """Write one table's records to its JSON file if they changed"""
+    content = json.dumps(data, indent=2, ensure_ascii=False)
+    if manifest.write(output_file, content):
+        print(f"✅ Synced {len(data)} records from {table_name} to {output_file}")
+    else:
+        print(f"⏭️  {table_name}: {len(data)} records unchanged in {output_file}")
     return data
 
-def sync_agents_to_markdown(agents_data):
-    """Generate markdown files for each agent"""
-    for agent in agents_data:
-        fields = agent["fields"]
-        agent_name = fields.get("Agent Name", "unknown")
+def sync_records_to_markdown(kind, records, directory, filename_for, render, manifest):
+    """Regenerate markdown for the records that changed; returns files written"""
+    # Records whose names map to the same file: the last one wins, as before
+    by_file = {directory / filename_for(record["fields"]): record for record in records}
+
+    written = 0
+    for filename, record in by_file.items():
+        if manifest.sync_record(filename, lambda synced_at, record=record: render(record, synced_at)):
+            written += 1
 
-        # Create markdown content
-        md_content = f"""# {agent_name}
+    print(f"✅ Generated {written} {kind[:-1]} markdown files ({len(by_file) - written} unchanged)")
+    return written
+
+def agent_filename(fields):
+    return f"{fields.get('Agent Name', 'unknown').lower().replace(' ', '-')}.md"
+
+def render_agent_markdown(agent, synced_at):
+    """Markdown for one agent"""
+    fields = agent["fields"]
+    agent_name = fields.get("Agent Name", "unknown")
+
+    return f"""# {agent_name}
 
 **Plugin**: {', '.join(fields.get("Plugin", []))}
 **File Path**: `{fields.get("File Path", "N/A")}`
@@ -94,24 +205,24 @@ def sync_agents_to_markdown(agents_data):
 {chr(10).join(f"- {issue}" for issue in fields.get("Issues", [])) if fields.get("Issues") else "None"}
 
 ---
-*Last synced: {datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")}*
+*Last synced: {synced_at}*
 *Airtable Record ID: {agent["id"]}*
 """
 
-        # Write to file
-        filename = AGENTS_DIR / f"{agent_name.lower().replace(' ', '-')}.md"
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(md_content)
+def sync_agents_to_markdown(agents_data, manifest):
+    """Generate markdown files for each changed agent"""
+    return sync_records_to_markdown("agents", agents_data, AGENTS_DIR, agent_filename,
+                                    render_agent_markdown, manifest)
 
-    print(f"✅ Generated {len(agents_data)} agent markdown files")
+def command_filename(fields):
+    return f"{fields.get('Command Name', 'unknown').lower().replace(' ', '-').replace('/', '-')}.md"
 
-def sync_commands_to_markdown(commands_data):
-    """Generate markdown files for each command"""
-    for command in commands_data:
-        fields = command["fields"]
-        command_name = fields.get("Command Name", "unknown")
+def render_command_markdown(command, synced_at):
+    """Markdown for one command"""
+    fields = command["fields"]
+    command_name = fields.get("Command Name", "unknown")
 
-        md_content = f"""# {command_name}
+    return f"""# {command_name}
 
 **Plugin**: {', '.join(fields.get("Plugin", []))}
 **File Path**: `{fields.get("File Path", "N/A")}`
@@ -137,23 +248,24 @@ def sync_commands_to_markdown(commands_data):
 {fields.get("Notes", "No notes")}
 
 ---
-*Last synced: {datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")}*
+*Last synced: {synced_at}*
 *Airtable Record ID: {command["id"]}*
 """
 
-        filename = COMMANDS_DIR / f"{command_name.lower().replace(' ', '-').replace('/', '-')}.md"
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(md_content)
+def sync_commands_to_markdown(commands_data, manifest):
+    """Generate markdown files for each changed command"""
+    return sync_records_to_markdown("commands", commands_data, COMMANDS_DIR, command_filename,
+                                    render_command_markdown, manifest)
 
-    print(f"✅ Generated {len(commands_data)} command markdown files")
+def skill_filename(fields):
+    return f"{fields.get('Skill Name', 'unknown').lower().replace(' ', '-')}.md"
 
-def sync_skills_to_markdown(skills_data):
-    """Generate markdown files for each skill"""
-    for skill in skills_data:
-        fields = skill["fields"]
-        skill_name = fields.get("Skill Name", "unknown")
+def render_skill_markdown(skill, synced_at):
+    """Markdown for one skill"""
+    fields = skill["fields"]
+    skill_name = fields.get("Skill Name", "unknown")
 
-        md_content = f"""# {skill_name}
+    return f"""# {skill_name}
 
 **Plugin**: {', '.join(fields.get("Plugin", []))}
 **Directory Path**: `{fields.get("Directory Path", "N/A")}`
@@ -178,21 +290,20 @@ def sync_skills_to_markdown(skills_data):
 {fields.get("Notes", "No notes")}
 
 ---
-*Last synced: {datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")}*
+*Last synced: {synced_at}*
 *Airtable Record ID: {skill["id"]}*
 """
 
-        filename = SKILLS_DIR / f"{skill_name.lower().replace(' ', '-')}.md"
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(md_content)
-
-    print(f"✅ Generated {len(skills_data)} skill markdown files")
+def sync_skills_to_markdown(skills_data, manifest):
+    """Generate markdown files for each changed skill"""
+    return sync_records_to_markdown("skills", skills_data, SKILLS_DIR, skill_filename,
+                                    render_skill_markdown, manifest)
 
-def generate_summary_report(plugins_data, agents_data, commands_data, skills_data):
-    """Generate comprehensive summary report"""
+def render_summary_report(plugins_data, agents_data, commands_data, skills_data, synced_at):
+    """Comprehensive summary report"""
     report = f"""# Airtable Sync Report
 
-**Last Updated**: {datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")}
+**Last Updated**: {synced_at}
 
 ## Overview
 
@@ -229,13 +340,19 @@ def generate_summary_report(plugins_data, agents_data, commands_data, skills_dat
 ---
 *Generated automatically by Airtable sync workflow*
 """
+    return report
 
-    with open(SYNC_DIR / "SYNC-REPORT.md", 'w', encoding='utf-8') as f:
-        f.write(report)
+def generate_summary_report(plugins_data, agents_data, commands_data, skills_data, manifest):
+    """Generate comprehensive summary report if its contents changed"""
+    def render(synced_at):
+        return render_summary_report(plugins_data, agents_data, commands_data, skills_data, synced_at)
 
-    print("✅ Generated summary report")
+    if manifest.sync_record(SYNC_DIR / "SYNC-REPORT.md", render):
+        print("✅ Generated summary report")
+    else:
+        print("⏭️  Summary report unchanged")
 
-def main():
+def main(full=False):
     """Main sync function"""
     print("🚀 Starting Airtable to GitHub sync...")
 
@@ -244,31 +361,41 @@ def main():
         return 1
 
     # Initialize Airtable API
-    api = Api(AIRTABLE_TOKEN)
+    api = Api(AIRTABLE_TOKEN, endpoint_url=AIRTABLE_ENDPOINT_URL)
 
     # Setup directories
     setup_directories()
+    manifest = SyncManifest(full=full)
 
     # Sync tables to JSON
     print("\n📥 Syncing tables to JSON...")
-    plugins_data = sync_table_to_json(api, "Plugins", SYNC_DIR / "plugins.json")
-    agents_data = sync_table_to_json(api, "Agents", SYNC_DIR / "agents.json")
-    commands_data = sync_table_to_json(api, "Commands", SYNC_DIR / "commands.json")
-    skills_data = sync_table_to_json(api, "Skills", SYNC_DIR / "skills.json")
-    mcp_data = sync_table_to_json(api, "MCP Servers", SYNC_DIR / "mcp-servers.json")
+    tables = fetch_tables(api)
+    for table_name, output_file in TABLES.items():
+        sync_table_to_json(table_name, tables[table_name], output_file, manifest)
+    plugins_data = tables["Plugins"]
+    agents_data = tables["Agents"]
+    commands_data = tables["Commands"]
+    skills_data = tables["Skills"]
 
     # Generate markdown files
     print("\n📝 Generating markdown files...")
-    sync_agents_to_markdown(agents_data)
-    sync_commands_to_markdown(commands_data)
-    sync_skills_to_markdown(skills_data)
+    sync_agents_to_markdown(agents_data, manifest)
+    sync_commands_to_markdown(commands_data, manifest)
+    sync_skills_to_markdown(skills_data, manifest)
 
     # Generate summary report
     print("\n📊 Generating summary report...")
-    generate_summary_report(plugins_data, agents_data, commands_data, skills_data)
+    generate_summary_report(plugins_data, agents_data, commands_data, skills_data, manifest)
+
+    removed = manifest.prune()
+    if removed:
+        print(f"🗑️  Removed {removed} files for deleted or renamed records")
+    manifest.save()
 
     print("\n✅ Sync completed successfully!")
     return 0
 
 if __name__ == "__main__":
-    exit(main())
+    import sys
+
+    exit(main(full='--full' in sys.argv))
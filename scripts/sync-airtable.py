@@ -11,13 +11,26 @@ This script:
 6. Re-links all relationships
 
 Run this script after any plugin changes to keep Airtable in sync.
+
+Per-file content fingerprints (path -> sha256 -> Airtable record ID) are kept
+between runs, so only components whose bytes changed are parsed and compared.
+Pass --full to ignore them and compare everything.
+
+Files are read through the shared component index, which walks each
+marketplace once in parallel worker processes and re-parses only files that
+changed on disk, across all cores; --workers=N caps the pool (1 = serial).
 """
 
+import hashlib
+import json
 import os
-import re
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from pyairtable import Api
-import yaml
+
+from airtable_snapshot import snapshot
+from airtable_writer import BatchWriter
+from component_index import index
 
 # Airtable configuration
 AIRTABLE_TOKEN = os.getenv("AIRTABLE_TOKEN")
@@ -27,9 +40,10 @@ if not AIRTABLE_TOKEN:
     exit(1)
 
 BASE_ID = "appHbSB7WhT1TxEQb"
+AIRTABLE_ENDPOINT_URL = os.getenv("AIRTABLE_ENDPOINT_URL", "https://api.airtable.com")
 
 # Initialize Airtable API
-api = Api(AIRTABLE_TOKEN)
+api = Api(AIRTABLE_TOKEN, endpoint_url=AIRTABLE_ENDPOINT_URL)
 base = api.base(BASE_ID)
 marketplaces_table = base.table("Marketplaces")
 plugins_table = base.table("Plugins")
@@ -45,44 +59,155 @@ MARKETPLACES = {
     "domain-plugin-builder": "/home/gotime2022/.claude/plugins/marketplaces/domain-plugin-builder",
 }
 
-def extract_frontmatter(file_path):
-    """Extract YAML frontmatter from markdown file"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # Match YAML frontmatter
-        match = re.match(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
-        if match:
-            frontmatter_text = match.group(1)
-
-            # Fix argument-hint lines with square brackets (YAML parsing issue)
-            # Replace unquoted lines containing [ with quoted versions
-            lines = frontmatter_text.split('\n')
-            fixed_lines = []
-            for line in lines:
-                # If line contains argument-hint with [ and isn't already quoted
-                if 'argument-hint:' in line and '[' in line:
-                    if not (line.strip().endswith('"') or line.strip().endswith("'")):
-                        # Extract the value part after the colon
-                        parts = line.split(':', 1)
-                        if len(parts) == 2:
-                            key = parts[0]
-                            value = parts[1].strip()
-                            # Quote the value
-                            line = f'{key}: "{value}"'
-                fixed_lines.append(line)
-
-            frontmatter_text = '\n'.join(fixed_lines)
-            return yaml.safe_load(frontmatter_text)
-        return None
-    except Exception as e:
-        print(f"  ⚠️  Error reading {file_path}: {e}")
-        return None
+FINGERPRINTS_PATH = Path(os.getenv(
+    "SYNC_FINGERPRINTS_PATH",
+    Path.home() / ".cache" / "dev-lifecycle-marketplace" / "sync-fingerprints.json",
+))
+
+# Fields this script writes; edits to them in Airtable invalidate fingerprints
+SYNCED_FIELDS = {
+    'Agents': ['Purpose', 'File Path'],
+    'Commands': ['Description', 'File Path'],
+    'Skills': ['Description', 'Has SKILL.md'],
+}
+
+# Overlap between syncs so clock skew never drops a modification
+SYNC_MARGIN = timedelta(minutes=5)
+
+def synced_fields_digest(table_name, fields):
+    """Hash of a record's synced field values, as Airtable returns them"""
+    values = [fields.get(name) for name in SYNCED_FIELDS[table_name]]
+    return hashlib.sha256(json.dumps(values, sort_keys=True).encode()).hexdigest()
+
+class FingerprintStore:
+    """Persisted per-file content fingerprints for one sync run
+
+    Layout: {"synced_at": iso, "record_ids": {table: [id, ...]},
+        "written": {table: {id: synced fields digest}},
+        "marketplaces": {name: {rel_path: {
+        "mtime_ns", "size", "sha256", "record_id"}}}}
+
+    A file is re-parsed only when its stat changed AND its bytes hash
+    differently from the last successful sync. synced_at is when the run
+    started, so edits made while it ran are caught by the next one; the
+    records it wrote itself are recognised by ID and field digest.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.data = {"synced_at": None, "marketplaces": {}}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.data = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                pass
+        self.pending = {}   # (marketplace, rel_path) -> entry awaiting a record ID
+        self.seen = {}      # marketplace -> rel paths present on disk this run
+        self.written = {}   # table -> {record ID: synced fields digest} written this run
+        self.started_at = datetime.now(timezone.utc).isoformat()
+
+    def entries(self, marketplace):
+        return self.data["marketplaces"].setdefault(marketplace, {})
+
+    def changed(self, marketplace, marketplace_path, full_path, extra=b""):
+        """Return True if the file needs syncing; remembers its new fingerprint"""
+        rel_path = Path(full_path).relative_to(marketplace_path).as_posix()
+        self.seen.setdefault(marketplace, set()).add(rel_path)
+
+        stat = os.stat(full_path)
+        entry = self.entries(marketplace).get(rel_path)
+        signature = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+        if entry and entry.get("record_id") and entry["mtime_ns"] == stat.st_mtime_ns \
+                and entry["size"] == stat.st_size and entry.get("extra") == extra.hex():
+            return False
+
+        with open(full_path, 'rb') as f:
+            digest = hashlib.sha256(f.read() + extra).hexdigest()
+
+        if entry and entry.get("record_id") and entry["sha256"] == digest:
+            # Touched but identical bytes: refresh the stat signature only
+            entry.update(signature)
+            entry["extra"] = extra.hex()
+            return False
+
+        self.pending[(marketplace, rel_path)] = dict(signature, sha256=digest, extra=extra.hex())
+        return True
+
+    def commit(self, marketplace, rel_path, record_id):
+        """Record a successfully synced file"""
+        entry = self.pending.pop((marketplace, rel_path), None)
+        if entry and record_id:
+            entry["record_id"] = record_id
+            self.entries(marketplace)[rel_path] = entry
+
+    def prune(self, marketplace):
+        """Forget files that no longer exist on disk"""
+        seen = self.seen.get(marketplace, set())
+        entries = self.entries(marketplace)
+        for rel_path in [p for p in entries if p not in seen]:
+            del entries[rel_path]
+
+    def record_writes(self, table_name, records):
+        """Remember records this run created or updated, as Airtable returned them"""
+        written = self.written.setdefault(table_name, {})
+        for rec in records:
+            written[rec['id']] = synced_fields_digest(table_name, rec['fields'])
+
+    def invalidate(self):
+        self.data["marketplaces"] = {}
+
+    def save(self, record_ids):
+        """Persist fingerprints with the record IDs seen at the start of the run plus this run's writes"""
+        self.data["synced_at"] = self.started_at
+        self.data["written"] = self.written
+        self.data["record_ids"] = {
+            table_name: sorted(set(ids) | set(self.written.get(table_name, {})))
+            for table_name, ids in record_ids.items()
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f)
+        os.replace(tmp_path, self.path)
+
+def airtable_changed(fingerprints):
+    """Cheap remote check: were synced records edited, added or deleted since our last run?
+
+    Returns (changed, {table name: current record IDs}). Records modified
+    since the last run started are ignored only when they are ones it wrote
+    and their synced fields still hold what it wrote.
+    """
+    synced_at = fingerprints.data.get("synced_at")
+    known_ids = fingerprints.data.get("record_ids", {})
+    written = fingerprints.data.get("written", {})
+
+    changed = not synced_at
+    record_ids = {}
+    for table in (agents_table, commands_table, skills_table):
+        names = SYNCED_FIELDS[table.name]
+        record_ids[table.name] = {rec['id'] for rec in table.all(fields=[names[0]])}
+        if changed:
+            continue
+        if record_ids[table.name] != set(known_ids.get(table.name, ())):
+            changed = True
+            continue
+
+        since = (datetime.fromisoformat(synced_at) - SYNC_MARGIN).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        fields = ", ".join(f"{{{name}}}" for name in names)
+        formula = f"IS_AFTER(LAST_MODIFIED_TIME({fields}), '{since}')"
+        own = written.get(table.name, {})
+        for rec in table.all(formula=formula, fields=names):
+            if own.get(rec['id']) != synced_fields_digest(table.name, rec['fields']):
+                changed = True
+                break
+
+    return changed, record_ids
 
 def get_existing_records_map(table):
     """Create a map of existing records by name (or composite key for skills)"""
-    records = table.all()
+    records = snapshot.all(table)
     record_map = {}
 
     # Determine name field based on table
@@ -128,155 +253,130 @@ def get_existing_records_map(table):
 
     return record_map
 
-def scan_filesystem_agents(marketplace_name, marketplace_path):
-    """Scan filesystem for all agents"""
-    agents = []
-    plugins_dir = Path(marketplace_path) / "plugins"
-
-    for plugin_dir in plugins_dir.iterdir():
-        if not plugin_dir.is_dir():
-            continue
-
-        # Skip archived directories
-        if plugin_dir.name.startswith('archived') or plugin_dir.name.startswith('.archive'):
-            continue
-
-        plugin_name = plugin_dir.name
-        agents_dir = plugin_dir / "agents"
-
-        if not agents_dir.exists():
-            continue
-
-        for agent_file in agents_dir.glob("*.md"):
-            frontmatter = extract_frontmatter(agent_file)
-
-            if not frontmatter:
-                print(f"  ⚠️  {agent_file.name}: No frontmatter found")
-                continue
-
-            if 'name' not in frontmatter:
-                print(f"  ⚠️  {agent_file.name}: Missing 'name' in frontmatter")
-                continue
-
-            agents.append({
-                'name': frontmatter['name'],
-                'plugin': plugin_name,
-                'description': frontmatter.get('description', ''),
-                'file_path': f"plugins/{plugin_name}/agents/{agent_file.name}",
-                'model': frontmatter.get('model', 'inherit'),
-                'color': frontmatter.get('color', 'blue'),
-            })
-
-    return agents
-
-def scan_filesystem_commands(marketplace_name, marketplace_path):
-    """Scan filesystem for all commands"""
-    commands = []
-    plugins_dir = Path(marketplace_path) / "plugins"
-
-    for plugin_dir in plugins_dir.iterdir():
-        if not plugin_dir.is_dir():
-            continue
-
-        # Skip archived directories
-        if plugin_dir.name.startswith('archived') or plugin_dir.name.startswith('.archive'):
-            continue
-
-        plugin_name = plugin_dir.name
-        commands_dir = plugin_dir / "commands"
-
-        if not commands_dir.exists():
-            continue
-
-        for cmd_file in commands_dir.glob("*.md"):
-            frontmatter = extract_frontmatter(cmd_file)
-
-            if not frontmatter:
-                print(f"  ⚠️  {cmd_file.name}: No frontmatter found")
-                continue
-
-            # Command name is /plugin:command-name
-            cmd_name = f"/{plugin_name}:{cmd_file.stem}"
-
-            commands.append({
-                'name': cmd_name,
-                'plugin': plugin_name,
-                'description': frontmatter.get('description', ''),
-                'file_path': f"plugins/{plugin_name}/commands/{cmd_file.name}",
-                'argument_hint': frontmatter.get('argument-hint', ''),
-            })
-
-    return commands
-
-def scan_filesystem_skills(marketplace_name, marketplace_path):
-    """Scan filesystem for all skills"""
-    skills = []
-    plugins_dir = Path(marketplace_path) / "plugins"
-
-    for plugin_dir in plugins_dir.iterdir():
-        if not plugin_dir.is_dir():
-            continue
-
-        # Skip archived directories
-        if plugin_dir.name.startswith('archived') or plugin_dir.name.startswith('.archive'):
-            continue
-
-        plugin_name = plugin_dir.name
-        skills_dir = plugin_dir / "skills"
-
-        if not skills_dir.exists():
-            continue
-
-        for skill_dir in skills_dir.iterdir():
-            if not skill_dir.is_dir():
-                continue
+def build_component(component):
+    """Turn an indexed component into the dict the sync functions expect
+
+    Returns (component dict or None, warning or None).
+    """
+    kind = component['kind']
+    plugin_name = component['plugin']
+    file_name = Path(component['path']).name
+    frontmatter = component['frontmatter']
+
+    if component['error']:
+        return None, f"  ⚠️  {component['error']}"
+
+    if kind == 'skills':
+        parts = component['parts']
+        return {
+            'name': component['name'],
+            'plugin': plugin_name,
+            # SKILL.md frontmatter description, else its first paragraph
+            'description': (frontmatter or {}).get('description') or component['summary'],
+            'directory_path': component['path'],
+            'fingerprint_path': f"{component['path']}/SKILL.md",
+            'has_skill_md': 'SKILL.md' in parts,
+            'has_scripts': 'scripts' in parts,
+            'has_templates': 'templates' in parts,
+            'has_examples': 'examples' in parts,
+        }, None
+
+    if component['frontmatter_error']:
+        return None, f"  ⚠️  {component['frontmatter_error']}"
+
+    if not frontmatter:
+        return None, f"  ⚠️  {file_name}: No frontmatter found"
+
+    if kind == 'agents':
+        if 'name' not in frontmatter:
+            return None, f"  ⚠️  {file_name}: Missing 'name' in frontmatter"
+
+        return {
+            'name': frontmatter['name'],
+            'plugin': plugin_name,
+            'description': frontmatter.get('description', ''),
+            'file_path': component['path'],
+            'fingerprint_path': component['path'],
+            'model': frontmatter.get('model', 'inherit'),
+            'color': frontmatter.get('color', 'blue'),
+        }, None
+
+    # Command name is /plugin:command-name
+    return {
+        'name': f"/{plugin_name}:{component['name']}",
+        'plugin': plugin_name,
+        'description': frontmatter.get('description', ''),
+        'file_path': component['path'],
+        'fingerprint_path': component['path'],
+        'argument_hint': frontmatter.get('argument-hint', ''),
+    }, None
+
+def scan_marketplaces(selected, fingerprints=None, workers=None):
+    """Scan the selected marketplaces through the component index
+
+    The index walks each marketplace once, in parallel worker processes, and
+    re-parses only files whose mtime or size changed, across all cores.
+    Fingerprints then narrow that down to what changed since the last sync.
+
+    Returns {marketplace_name: {'agents': [...], 'commands': [...], 'skills': [...]}}
+    """
+    for marketplace_path in selected.values():
+        if not (Path(marketplace_path) / "plugins").is_dir():
+            print(f"  ⚠️  {marketplace_path}/plugins not found")
+
+    index.refresh(*selected.values(), workers=workers)
+
+    scanned = {}
+    for marketplace_name, marketplace_path in selected.items():
+        scanned[marketplace_name] = {'agents': [], 'commands': [], 'skills': []}
+
+        for component in index.components(marketplace_path):
+            kind = component['kind']
+            if fingerprints:
+                if kind != 'skills':
+                    if not fingerprints.changed(marketplace_name, marketplace_path,
+                                                Path(marketplace_path) / component['path']):
+                        continue
+                elif 'SKILL.md' in component['parts']:
+                    # Skills are fingerprinted by SKILL.md bytes plus which subdirectories exist
+                    layout = "".join("1" if d in component['parts'] else "0" for d in ("scripts", "templates", "examples"))
+                    skill_md = Path(marketplace_path) / component['path'] / "SKILL.md"
+                    if not fingerprints.changed(marketplace_name, marketplace_path, skill_md, extra=layout.encode()):
+                        continue
+
+            item, warning = build_component(component)
+            if warning:
+                print(warning)
+            if item:
+                scanned[marketplace_name][kind].append(item)
+
+        if fingerprints:
+            fingerprints.prune(marketplace_name)
+
+    return scanned
+
+def sync_components(marketplace_name, components, fingerprints=None):
+    """Sync all scanned components for a marketplace
+
+    Returns the number of components whose files changed since the last sync.
+    """
+    print(f"\n🔄 Syncing {marketplace_name} marketplace...")
 
-            skill_name = skill_dir.name
-            skill_md = skill_dir / "SKILL.md"
-
-            # Extract description from SKILL.md if it exists
-            description = ""
-            if skill_md.exists():
-                try:
-                    with open(skill_md, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        # Try to get first paragraph as description
-                        lines = [l.strip() for l in content.split('\n') if l.strip() and not l.startswith('#')]
-                        if lines:
-                            description = lines[0]
-                except:
-                    pass
-
-            skills.append({
-                'name': skill_name,
-                'plugin': plugin_name,
-                'description': description,
-                'directory_path': f"plugins/{plugin_name}/skills/{skill_name}",
-                'has_skill_md': skill_md.exists(),
-                'has_scripts': (skill_dir / "scripts").exists(),
-                'has_templates': (skill_dir / "templates").exists(),
-                'has_examples': (skill_dir / "examples").exists(),
-            })
+    fs_agents = components['agents']
+    fs_commands = components['commands']
+    fs_skills = components['skills']
 
-    return skills
+    print(f"  Found {len(fs_agents)} changed agents")
+    print(f"  Found {len(fs_commands)} changed commands")
+    print(f"  Found {len(fs_skills)} changed skills")
 
-def sync_components(marketplace_name, marketplace_path):
-    """Sync all components for a marketplace"""
-    print(f"\n🔄 Syncing {marketplace_name} marketplace...")
+    if not fs_agents and not fs_commands and not fs_skills:
+        print("\n✅ Nothing changed since last sync")
+        return 0
 
     # Get plugin record map
     plugins_map = get_existing_records_map(plugins_table)
 
-    # Scan filesystem
-    print("\n📂 Scanning filesystem...")
-    fs_agents = scan_filesystem_agents(marketplace_name, marketplace_path)
-    fs_commands = scan_filesystem_commands(marketplace_name, marketplace_path)
-    fs_skills = scan_filesystem_skills(marketplace_name, marketplace_path)
-
-    print(f"  Found {len(fs_agents)} agents")
-    print(f"  Found {len(fs_commands)} commands")
-    print(f"  Found {len(fs_skills)} skills")
-
     # Get existing Airtable records
     print("\n📊 Loading existing Airtable records...")
     existing_agents = get_existing_records_map(agents_table)
@@ -289,22 +389,32 @@ def sync_components(marketplace_name, marketplace_path):
 
     # Sync agents
     print("\n🔄 Syncing agents...")
-    sync_agents(fs_agents, existing_agents, plugins_map)
+    agent_ids = sync_agents(fs_agents, existing_agents, plugins_map, fingerprints)
 
     # Sync commands
     print("\n🔄 Syncing commands...")
-    sync_commands(fs_commands, existing_commands, plugins_map)
+    command_ids = sync_commands(fs_commands, existing_commands, plugins_map, fingerprints)
 
     # Sync skills
     print("\n🔄 Syncing skills...")
-    sync_skills(fs_skills, existing_skills, plugins_map)
+    skill_ids = sync_skills(fs_skills, existing_skills, plugins_map, fingerprints)
+
+    if fingerprints:
+        for rel_path, record_id in {**agent_ids, **command_ids, **skill_ids}.items():
+            fingerprints.commit(marketplace_name, rel_path, record_id)
 
     print("\n✅ Sync complete!")
+    return len(fs_agents) + len(fs_commands) + len(fs_skills)
 
-def sync_agents(fs_agents, existing_agents, plugins_map):
-    """Sync agents - create new, update changed, mark deleted"""
+def sync_agents(fs_agents, existing_agents, plugins_map, fingerprints=None):
+    """Sync agents - create new, update changed, mark deleted
+
+    Returns {fingerprint_path: record_id} for every synced agent
+    """
     creates = []
+    create_paths = []
     updates = []
+    record_ids = {}
 
     for agent in fs_agents:
         agent_name = agent['name']
@@ -325,10 +435,12 @@ def sync_agents(fs_agents, existing_agents, plugins_map):
                 'File Path': agent['file_path'],
                 'Purpose': agent['description'],
             })
+            create_paths.append(agent['fingerprint_path'])
             print(f"  ➕ New agent: {agent_name}")
         else:
             # Check if update needed
             existing = existing_agents[agent_name]
+            record_ids[agent['fingerprint_path']] = existing['id']
             needs_update = False
 
             updates_fields = {}
@@ -351,28 +463,33 @@ def sync_agents(fs_agents, existing_agents, plugins_map):
     # Batch create
     if creates:
         print(f"\n  Creating {len(creates)} new agents...")
-        batch_size = 10
-        for i in range(0, len(creates), batch_size):
-            batch = creates[i:i+batch_size]
-            agents_table.batch_create(batch)
-            print(f"    Created {min(i+batch_size, len(creates))}/{len(creates)}")
+        # Upserted on the key agents are looked up by, so a retried create can't duplicate them
+        created = BatchWriter(agents_table, "agents", indent="    ").create(creates, key_fields=["Agent Name"])
+        record_ids.update(zip(create_paths, (rec['id'] for rec in created)))
+        if fingerprints:
+            fingerprints.record_writes(agents_table.name, created)
 
     # Batch update
     if updates:
         print(f"\n  Updating {len(updates)} agents...")
-        batch_size = 10
-        for i in range(0, len(updates), batch_size):
-            batch = updates[i:i+batch_size]
-            agents_table.batch_update(batch)
-            print(f"    Updated {min(i+batch_size, len(updates))}/{len(updates)}")
+        updated = BatchWriter(agents_table, "agents", indent="    ").update(updates)
+        if fingerprints:
+            fingerprints.record_writes(agents_table.name, updated)
 
     if not creates and not updates:
         print("  ✓ All agents up to date")
 
-def sync_commands(fs_commands, existing_commands, plugins_map):
-    """Sync commands - create new, update changed"""
+    return record_ids
+
+def sync_commands(fs_commands, existing_commands, plugins_map, fingerprints=None):
+    """Sync commands - create new, update changed
+
+    Returns {fingerprint_path: record_id} for every synced command
+    """
     creates = []
+    create_paths = []
     updates = []
+    record_ids = {}
 
     for command in fs_commands:
         cmd_name = command['name']
@@ -394,10 +511,12 @@ def sync_commands(fs_commands, existing_commands, plugins_map):
                 'File Path': command['file_path'],
                 'Argument Hint': command['argument_hint'],
             })
+            create_paths.append(command['fingerprint_path'])
             print(f"  ➕ New command: {cmd_name}")
         else:
             # Check if update needed
             existing = existing_commands[cmd_name]
+            record_ids[command['fingerprint_path']] = existing['id']
             needs_update = False
 
             updates_fields = {}
@@ -420,27 +539,31 @@ def sync_commands(fs_commands, existing_commands, plugins_map):
     # Batch create/update (same as agents)
     if creates:
         print(f"\n  Creating {len(creates)} new commands...")
-        batch_size = 10
-        for i in range(0, len(creates), batch_size):
-            batch = creates[i:i+batch_size]
-            commands_table.batch_create(batch)
-            print(f"    Created {min(i+batch_size, len(creates))}/{len(creates)}")
+        created = BatchWriter(commands_table, "commands", indent="    ").create(creates, key_fields=["Command Name"])
+        record_ids.update(zip(create_paths, (rec['id'] for rec in created)))
+        if fingerprints:
+            fingerprints.record_writes(commands_table.name, created)
 
     if updates:
         print(f"\n  Updating {len(updates)} commands...")
-        batch_size = 10
-        for i in range(0, len(updates), batch_size):
-            batch = updates[i:i+batch_size]
-            commands_table.batch_update(batch)
-            print(f"    Updated {min(i+batch_size, len(updates))}/{len(updates)}")
+        updated = BatchWriter(commands_table, "commands", indent="    ").update(updates)
+        if fingerprints:
+            fingerprints.record_writes(commands_table.name, updated)
 
     if not creates and not updates:
         print("  ✓ All commands up to date")
 
-def sync_skills(fs_skills, existing_skills, plugins_map):
-    """Sync skills - create new, update changed"""
+    return record_ids
+
+def sync_skills(fs_skills, existing_skills, plugins_map, fingerprints=None):
+    """Sync skills - create new, update changed
+
+    Returns {fingerprint_path: record_id} for every synced skill
+    """
     creates = []
+    create_paths = []
     updates = []
+    record_ids = {}
     updated_ids = set()  # Track which records we've already updated
 
     for skill in fs_skills:
@@ -469,11 +592,13 @@ def sync_skills(fs_skills, existing_skills, plugins_map):
                 'Has Templates': skill['has_templates'],
                 'Has Examples': skill['has_examples'],
             })
+            create_paths.append(skill['fingerprint_path'])
             print(f"  ➕ New skill: {plugin_name}/{skill_name}")
         else:
             # Check if update needed
             existing = existing_skills[composite_key]
             record_id = existing['id']
+            record_ids[skill['fingerprint_path']] = record_id
 
             # Skip if we've already updated this record
             if record_id in updated_ids:
@@ -501,23 +626,23 @@ def sync_skills(fs_skills, existing_skills, plugins_map):
     # Batch create/update (same as agents)
     if creates:
         print(f"\n  Creating {len(creates)} new skills...")
-        batch_size = 10
-        for i in range(0, len(creates), batch_size):
-            batch = creates[i:i+batch_size]
-            skills_table.batch_create(batch)
-            print(f"    Created {min(i+batch_size, len(creates))}/{len(creates)}")
+        # Skills are keyed on plugin + name, and a linked Plugin field can't be merged on: plain creates
+        created = BatchWriter(skills_table, "skills", indent="    ").create(creates)
+        record_ids.update(zip(create_paths, (rec['id'] for rec in created)))
+        if fingerprints:
+            fingerprints.record_writes(skills_table.name, created)
 
     if updates:
         print(f"\n  Updating {len(updates)} skills...")
-        batch_size = 10
-        for i in range(0, len(updates), batch_size):
-            batch = updates[i:i+batch_size]
-            skills_table.batch_update(batch)
-            print(f"    Updated {min(i+batch_size, len(updates))}/{len(updates)}")
+        updated = BatchWriter(skills_table, "skills", indent="    ").update(updates)
+        if fingerprints:
+            fingerprints.record_writes(skills_table.name, updated)
 
     if not creates and not updates:
         print("  ✓ All skills up to date")
 
+    return record_ids
+
 def resync_relationships():
     """Re-run all relationship linking scripts"""
     print("\n🔗 Re-syncing relationships...")
@@ -543,22 +668,45 @@ def resync_relationships():
 if __name__ == "__main__":
     import sys
 
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    full_sync = '--full' in sys.argv
+    workers = next((int(arg.split('=', 1)[1]) for arg in sys.argv if arg.startswith('--workers=')), None)
+
+    fingerprints = FingerprintStore(FINGERPRINTS_PATH)
+    remote_changed, record_ids = airtable_changed(fingerprints)
+    if full_sync:
+        fingerprints.invalidate()
+    elif remote_changed:
+        print("ℹ️  Airtable edited since last sync - comparing all components")
+        fingerprints.invalidate()
+
     # Check if specific marketplace requested
-    if len(sys.argv) > 1:
-        marketplace_name = sys.argv[1]
+    if args:
+        marketplace_name = args[0]
         if marketplace_name in MARKETPLACES:
-            sync_components(marketplace_name, MARKETPLACES[marketplace_name])
+            selected = {marketplace_name: MARKETPLACES[marketplace_name]}
         else:
             print(f"Unknown marketplace: {marketplace_name}")
             print(f"Available: {', '.join(MARKETPLACES.keys())}")
             sys.exit(1)
     else:
         # Sync all marketplaces
-        for marketplace_name, marketplace_path in MARKETPLACES.items():
-            sync_components(marketplace_name, marketplace_path)
+        selected = MARKETPLACES
+
+    print("\n📂 Scanning filesystem...")
+    scanned = scan_marketplaces(selected, fingerprints, workers)
+
+    # Airtable writes stay sequential: they share one per-base rate limit
+    changed = 0
+    for marketplace_name in selected:
+        changed += sync_components(marketplace_name, scanned[marketplace_name], fingerprints)
+
+    # Re-sync all relationships (agent bodies drive the links, so only when files changed)
+    if changed:
+        resync_relationships()
 
-    # Re-sync all relationships
-    resync_relationships()
+    # Saved only after a complete run; stamped with its start time
+    fingerprints.save(record_ids)
 
     print("\n✅ Full sync complete!")
     print("\nNext steps:")
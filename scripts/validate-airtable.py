@@ -14,10 +14,11 @@ Run this before expanding to other marketplaces.
 """
 
 import os
-import re
 from pathlib import Path
 from pyairtable import Api
-import yaml
+
+from airtable_snapshot import snapshot
+from markdown_frontmatter import read_frontmatter
 
 # Airtable configuration
 AIRTABLE_TOKEN = os.getenv("AIRTABLE_TOKEN")
@@ -26,9 +27,10 @@ if not AIRTABLE_TOKEN:
     print("   Export it: export AIRTABLE_TOKEN=your_key_here")
     exit(1)
 BASE_ID = "appHbSB7WhT1TxEQb"
+AIRTABLE_ENDPOINT_URL = os.getenv("AIRTABLE_ENDPOINT_URL", "https://api.airtable.com")
 
 # Initialize Airtable API
-api = Api(AIRTABLE_TOKEN)
+api = Api(AIRTABLE_TOKEN, endpoint_url=AIRTABLE_ENDPOINT_URL)
 base = api.base(BASE_ID)
 agents_table = base.table("Agents")
 commands_table = base.table("Commands")
@@ -77,13 +79,7 @@ class ValidationReport:
 def extract_frontmatter(file_path):
     """Extract YAML frontmatter from markdown file"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        match = re.match(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
-        if match:
-            return yaml.safe_load(match.group(1))
-        return None
+        return read_frontmatter(file_path)
     except Exception as e:
         return None
 
@@ -91,7 +87,7 @@ def validate_agents(report):
     """Validate all agents"""
     print("\n📋 Validating Agents...")
 
-    agents = agents_table.all()
+    agents = snapshot.all(agents_table)
     print(f"  Found {len(agents)} agents in Airtable")
 
     for agent in agents:
@@ -141,7 +137,7 @@ def validate_commands(report):
     """Validate all commands"""
     print("\n📋 Validating Commands...")
 
-    commands = commands_table.all()
+    commands = snapshot.all(commands_table)
     print(f"  Found {len(commands)} commands in Airtable")
 
     for command in commands:
@@ -179,7 +175,7 @@ def validate_skills(report):
     """Validate all skills"""
     print("\n📋 Validating Skills...")
 
-    skills = skills_table.all()
+    skills = snapshot.all(skills_table)
     print(f"  Found {len(skills)} skills in Airtable")
 
     for skill in skills:
@@ -234,7 +230,7 @@ def validate_relationships(report):
     """Validate relationship links"""
     print("\n🔗 Validating Relationships...")
 
-    agents = agents_table.all()
+    agents = snapshot.all(agents_table)
 
     for agent in agents:
         fields = agent['fields']